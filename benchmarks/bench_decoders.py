@@ -0,0 +1,177 @@
+"""
+bench_decoders — json.loads + цикл Stage-1 против схемных декодеров
+
+Тела ответов:
+• синтетические (по умолчанию) — размер как у реальных полных тикеров
+• записанные с бирж: --record DIR сохраняет, --payload-dir DIR читает
+
+Результаты обоих путей сверяются на равенство, затем печатается время.
+
+    python -m benchmarks.bench_decoders
+    python -m benchmarks.bench_decoders --record payloads/
+    python -m benchmarks.bench_decoders --payload-dir payloads/
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, Callable
+
+from src.exchanges import decoders
+from src.exchanges.http_session import close_sessions
+from src.pipeline import stage_one_price_snapshot_candidates as s1
+
+
+N_SYMBOLS = 3000
+ROUNDS = 20
+
+
+# -------------------------------------------------------------------------
+# baseline: то, что делают fetch_*_raw + _parse_* без декодера
+# -------------------------------------------------------------------------
+
+BASELINE: Dict[str, Callable[[bytes], dict]] = {
+    "binance": lambda b: s1._parse_binance(json.loads(b)),
+    "bybit":   lambda b: s1._parse_bybit(json.loads(b)["result"]["list"]),
+    "okx":     lambda b: s1._parse_okx(json.loads(b)["data"]),
+    "gate":    lambda b: s1._parse_gate(json.loads(b)),
+    "kucoin":  lambda b: s1._parse_kucoin(json.loads(b)["data"]["ticker"]),
+}
+
+# запись — теми же fetch_*_raw, декодер просто возвращает тело ответа
+RECORDERS = {
+    "binance": lambda: s1.fetch_book_tickers_raw(decoder=bytes),
+    "bybit":   lambda: s1.fetch_tickers_raw("spot", decoder=bytes),
+    "okx":     lambda: s1.okx_fetch_tickers_raw(decoder=bytes),
+    "gate":    lambda: s1.gate_fetch_tickers_raw(decoder=bytes),
+    "kucoin":  lambda: s1.kucoin_fetch_tickers_raw(decoder=bytes),
+}
+
+
+# -------------------------------------------------------------------------
+# synthetic payloads (полный набор полей, как у бирж)
+# -------------------------------------------------------------------------
+
+def _px(rnd: random.Random) -> str:
+    return f"{rnd.uniform(0.001, 50000):.6f}"
+
+
+def _synthetic(exchange: str, n: int, seed: int = 1) -> bytes:
+    rnd = random.Random(seed)
+    rows = []
+
+    for i in range(n):
+        base = f"C{i}"
+        bid, ask, q1, q2 = _px(rnd), _px(rnd), _px(rnd), _px(rnd)
+
+        if exchange == "binance":
+            rows.append({"symbol": f"{base}USDT", "bidPrice": bid, "bidQty": q1,
+                         "askPrice": ask, "askQty": q2})
+        elif exchange == "bybit":
+            rows.append({"symbol": f"{base}USDT", "bid1Price": bid, "bid1Size": q1,
+                         "ask1Price": ask, "ask1Size": q2, "lastPrice": bid,
+                         "prevPrice24h": bid, "price24hPcnt": "0.01", "highPrice24h": ask,
+                         "lowPrice24h": bid, "turnover24h": q1, "volume24h": q2,
+                         "usdIndexPrice": bid})
+        elif exchange == "okx":
+            rows.append({"instType": "SPOT", "instId": f"{base}-USDT", "last": bid,
+                         "lastSz": q1, "askPx": ask, "askSz": q2, "bidPx": bid,
+                         "bidSz": q1, "open24h": bid, "high24h": ask, "low24h": bid,
+                         "volCcy24h": q1, "vol24h": q2, "ts": "1700000000000",
+                         "sodUtc0": bid, "sodUtc8": bid})
+        elif exchange == "gate":
+            rows.append({"currency_pair": f"{base}_USDT", "last": bid, "lowest_ask": ask,
+                         "lowest_size": q2, "highest_bid": bid, "highest_size": q1,
+                         "change_percentage": "1.2", "base_volume": q1,
+                         "quote_volume": q2, "high_24h": ask, "low_24h": bid})
+        else:
+            rows.append({"symbol": f"{base}-USDT", "symbolName": f"{base}-USDT",
+                         "buy": bid, "bestBidSize": q1, "sell": ask, "bestAskSize": q2,
+                         "changeRate": "0.01", "changePrice": "0.1", "high": ask,
+                         "low": bid, "vol": q1, "volValue": q2, "last": bid,
+                         "averagePrice": bid, "takerFeeRate": "0.001",
+                         "makerFeeRate": "0.001", "takerCoefficient": "1",
+                         "makerCoefficient": "1"})
+
+    if exchange == "bybit":
+        doc = {"retCode": 0, "result": {"category": "spot", "list": rows}}
+    elif exchange == "okx":
+        doc = {"code": "0", "data": rows}
+    elif exchange == "kucoin":
+        doc = {"code": "200000", "data": {"time": 1700000000000, "ticker": rows}}
+    else:
+        doc = rows
+
+    return json.dumps(doc).encode()
+
+
+# -------------------------------------------------------------------------
+
+async def _record(directory: Path):
+    directory.mkdir(parents=True, exist_ok=True)
+    try:
+        for name, fetch in RECORDERS.items():
+            body = await fetch()
+            (directory / f"{name}.json").write_bytes(body)
+            print(f"recorded {name}: {len(body) / 1024:.0f} KiB")
+    finally:
+        await close_sessions()
+
+
+def _load_payloads(directory: Path | None) -> Dict[str, bytes]:
+    if directory is None:
+        return {name: _synthetic(name, N_SYMBOLS) for name in BASELINE}
+    return {
+        name: (directory / f"{name}.json").read_bytes()
+        for name in BASELINE
+        if (directory / f"{name}.json").exists()
+    }
+
+
+def _time(fn, body: bytes, rounds: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn(body)
+    return (time.perf_counter() - t0) / rounds * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--payload-dir", type=Path)
+    ap.add_argument("--record", type=Path)
+    ap.add_argument("--rounds", type=int, default=ROUNDS)
+    args = ap.parse_args()
+
+    if args.record:
+        asyncio.run(_record(args.record))
+        args.payload_dir = args.record
+
+    if not decoders.AVAILABLE:
+        print("[WARN] msgspec / orjson не установлены — fast-путь = json.loads")
+
+    backend = "msgspec" if decoders.msgspec else ("orjson" if decoders.orjson else "json")
+    print(f"backend: {backend}\n")
+    print(f"{'exchange':<9} {'KiB':>7} {'rows':>6} {'json ms':>9} {'fast ms':>9} {'x':>6}")
+
+    for name, body in _load_payloads(args.payload_dir).items():
+        fast = decoders.QUOTE_DECODERS[name]
+        base = BASELINE[name]
+
+        ref, got = base(body), fast(body)
+        if ref != got:
+            raise SystemExit(f"{name}: результаты не совпадают")
+
+        t_base = _time(base, body, args.rounds)
+        t_fast = _time(fast, body, args.rounds)
+
+        print(
+            f"{name:<9} {len(body) / 1024:>7.0f} {len(ref):>6} "
+            f"{t_base:>9.2f} {t_fast:>9.2f} {t_base / t_fast:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+bench_ipc — Manager.Queue против shared memory (src/ipc/)
+
+Сигналы: N штук put → get через Manager.Queue и SignalMailbox
+(в ящике — по сигналу на 100 пар: большая часть заменяется, не дочитавшись).
+
+    python -m benchmarks.bench_ipc
+"""
+
+import multiprocessing as mp
+import time
+
+from src.ipc.records import EXCHANGES
+from src.ipc.signal_mailbox import SignalMailbox
+
+
+N_SIGNALS = 10_000
+
+
+def _signal(i: int) -> dict:
+    return {
+        "pair": f"C{i}_USDT",
+        "spread_pct": 0.75,
+        "buy_exchange": EXCHANGES[i % 5],
+        "sell_exchange": EXCHANGES[(i + 1) % 5],
+        "ts": time.time(),
+    }
+
+
+def bench_signals(manager):
+    signals = [_signal(i) for i in range(N_SIGNALS)]
+
+    queue = manager.Queue()
+    t0 = time.perf_counter()
+    for s in signals:
+        queue.put(s)
+    for _ in signals:
+        queue.get()
+    t_queue = (time.perf_counter() - t0) * 1000
+
+    box = SignalMailbox.create(capacity=N_SIGNALS)
+    reader = SignalMailbox.attach(box.name)
+    try:
+        t0 = time.perf_counter()
+        for i, s in enumerate(signals):
+            box.put({**s, "pair": f"C{i % 100}_USDT"})
+        while reader.get_nowait() is not None:
+            pass
+        t_box = (time.perf_counter() - t0) * 1000
+        coalesced = box.coalesced
+    finally:
+        reader.close()
+        box.close()
+
+    print(f"signals x{N_SIGNALS}: manager queue {t_queue:.1f} ms "
+          f"({t_queue / N_SIGNALS * 1000:.1f} us/sig), "
+          f"mailbox {t_box:.1f} ms ({t_box / N_SIGNALS * 1000:.1f} us/sig, "
+          f"coalesced {coalesced})")
+
+
+def main():
+    with mp.Manager() as manager:
+        bench_signals(manager)
+
+
+if __name__ == "__main__":
+    main()
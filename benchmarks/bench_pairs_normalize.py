@@ -0,0 +1,112 @@
+"""
+bench_pairs_normalize — Stage-0: построчная нормализация против колоночной (pandas)
+
+Синтетические 24h-тикеры всех пяти бирж (полный набор полей, часть символов
+не в USDT, пустые / нулевые обороты, дубли ключей), N_SYMBOLS строк на биржу.
+Результаты путей сверяются на равенство, затем печатается время: таблица пар
+(normalize_pairs) и ноги с оборотом (leg_volumes — то, что Stage-0 отдаёт
+PairsUniverse; колоночный путь — STAGE0_NORMALIZER = "columnar").
+
+    python -m benchmarks.bench_pairs_normalize
+"""
+
+import random
+import time
+
+from src.config import MIN_24H_VOLUME_USDT
+from src.utils.pairs_normalize import EXCHANGES, normalize_pairs, leg_volumes
+from src.utils.pairs_normalize_pandas import normalize_pairs_pandas, leg_volumes_pandas
+
+
+SYMBOL_COUNTS = (1_000, 3_000, 10_000)
+ROUNDS = 10
+
+
+def _vol(rnd: random.Random) -> str:
+    # около половины ног проходит порог, часть — пустые и нулевые
+    r = rnd.random()
+    if r < 0.05:
+        return ""
+    if r < 0.10:
+        return "0"
+    return f"{MIN_24H_VOLUME_USDT * rnd.uniform(0.01, 20):.4f}"
+
+
+def _symbol(exchange: str, base: str, quote: str) -> str:
+    if exchange in ("okx", "kucoin"):
+        return f"{base}-{quote}"
+    if exchange == "gate":
+        return f"{base}_{quote}"
+    return f"{base}{quote}"
+
+
+def _tickers(exchange: str, n: int, seed: int = 1) -> list:
+    rnd = random.Random(f"{exchange}:{seed}")
+    rows = []
+
+    for i in range(n):
+        quote = "USDT" if rnd.random() < 0.7 else "BTC"
+        # ~2% — второй символ того же ключа (дубль)
+        base = f"C{i - 1}" if i and rnd.random() < 0.02 else f"C{i}"
+        sym = _symbol(exchange, base, quote)
+        px = f"{rnd.uniform(0.001, 50000):.6f}"
+
+        if exchange == "binance":
+            rows.append({"symbol": sym, "priceChange": px, "lastPrice": px,
+                         "bidPrice": px, "askPrice": px, "volume": px,
+                         "quoteVolume": _vol(rnd), "openTime": 0, "closeTime": 0,
+                         "count": 1})
+        elif exchange == "bybit":
+            rows.append({"symbol": sym, "bid1Price": px, "ask1Price": px,
+                         "lastPrice": px, "turnover24h": _vol(rnd), "volume24h": px})
+        elif exchange == "okx":
+            row = {"instType": "SPOT", "instId": sym, "last": px, "bidPx": px,
+                   "askPx": px, "vol24h": _vol(rnd), "ts": "0"}
+            if rnd.random() < 0.8:
+                row["volCcy24h"] = _vol(rnd)
+            rows.append(row)
+        elif exchange == "gate":
+            rows.append({"currency_pair": sym, "last": px, "lowest_ask": px,
+                         "highest_bid": px, "base_volume": px,
+                         "quote_volume": _vol(rnd)})
+        else:
+            rows.append({"symbol": sym, "symbolName": sym, "buy": px, "sell": px,
+                         "vol": px, "volValue": _vol(rnd), "last": px})
+
+    return rows
+
+
+def _timeit(fn, raws) -> float:
+    fn(raws)
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(raws)
+    return (time.perf_counter() - t0) / ROUNDS * 1000
+
+
+PATHS = (
+    ("pairs", normalize_pairs, normalize_pairs_pandas),
+    ("legs", leg_volumes, leg_volumes_pandas),
+)
+
+
+def main():
+    print(f"{'rows/ex':>8} {'path':>6} {'rows':>7} {'loop ms':>9} {'pandas ms':>10} {'speedup':>8}")
+
+    for n in SYMBOL_COUNTS:
+        raws = [_tickers(name, n) for name in EXCHANGES]
+
+        for label, loop_fn, pandas_fn in PATHS:
+            ref = loop_fn(raws)
+            got = pandas_fn(raws)
+            assert got == ref, f"{label}: pandas result differs from loop result"
+
+            loop_ms = _timeit(loop_fn, raws)
+            pandas_ms = _timeit(pandas_fn, raws)
+
+            print(f"{n:>8} {label:>6} {len(ref):>7} {loop_ms:>9.2f} {pandas_ms:>10.2f} "
+                  f"{loop_ms / pandas_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+bench_quote_memory — память: dict-of-dicts против SymbolTable + ColumnarQuotes
+
+Считается (tracemalloc) всё, что Stage-1 держит на цикл:
+• dict-of-dicts — таблица пар Stage-0 + книги {exchange: {symbol: quote dict}}
+• columnar      — SymbolTable (интернированные пары) + столбцы котировок
+
+Плюс время построения и число живых блоков памяти (≈ объектов для GC / аллокатора).
+
+    python -m benchmarks.bench_quote_memory
+"""
+
+import gc
+import time
+import tracemalloc
+
+from benchmarks.bench_spread_matrix import _books
+from src.pipeline.symbol_table import SymbolTable
+from src.pipeline.columnar_quotes import ColumnarQuotes
+
+
+PAIR_COUNTS = (2_000, 10_000)
+N_EXCHANGES = 5
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    keep = build()
+    elapsed = (time.perf_counter() - t0) * 1000
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = snapshot.statistics("filename")
+    size = sum(s.size for s in stats)
+    blocks = sum(s.count for s in stats)
+    return keep, size / 2**20, elapsed, blocks
+
+
+def main():
+    print(f"{'pairs':>6} {'layout':<14} {'MiB':>7} {'build ms':>9} {'blocks':>8}")
+
+    for n in PAIR_COUNTS:
+        now = time.time()
+        src_pairs, src_exchanges = _books(n, N_EXCHANGES, now)
+
+        def dict_layout():
+            # копия в том виде, в каком её строят Stage-0 и загрузчики Stage-1
+            pairs = {k: dict(m) for k, m in src_pairs.items()}
+            books = {name: {s: dict(q) for s, q in book.items()}
+                     for name, book, _ in src_exchanges}
+            return pairs, books
+
+        def columnar_layout():
+            table = SymbolTable([name for name, _, _ in src_exchanges])
+            table.update(src_pairs)
+            store = ColumnarQuotes(table, capacity=n)
+            for name, book, ts in src_exchanges:
+                store.load_book(name, book, ts)
+            return table, store
+
+        for label, build in (("dict-of-dicts", dict_layout), ("columnar", columnar_layout)):
+            keep, mib, ms, blocks = _measure(build)
+            print(f"{n:>6} {label:<14} {mib:>7.2f} {ms:>9.1f} {blocks:>8}")
+            del keep
+
+
+if __name__ == "__main__":
+    main()
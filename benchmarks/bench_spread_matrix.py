@@ -0,0 +1,144 @@
+"""
+bench_spread_matrix — движки Stage-1: Python-цикл, NumPy-матрица, route tracker
+
+Синтетические книги: 500 / 2k / 10k пар × 5 / 10 / 15 бирж,
+часть ног отсутствует, цены на сетке (чтобы встречались равные спреды).
+NumPy сверяется с циклом на точное равенство, tracker — по лучшему спреду
+(при равных спредах он может выбрать другой маршрут). Сверка — и без издержек
+(NO_COSTS: чистый спред равен «грязному»), и с синтетической RouteCostMatrix
+(комиссии по биржам, переопределения по парам, буфер): tracker тогда
+сравнивается по net_spread_pct. Порог — STAGE1_MIN_NET_PROFIT_PCT, замеры
+времени — с синтетическими издержками.
+
+«tracker upd» — инкрементальный режим: 1% котировок изменились с прошлого цикла.
+
+    python -m benchmarks.bench_spread_matrix
+"""
+
+import random
+import time
+
+from src.config import STAGE1_MAX_QUOTE_AGE_S, STAGE1_MIN_NET_PROFIT_PCT
+from src.pipeline.route_costs import RouteCostMatrix, NO_COSTS
+from src.pipeline.stage_one_price_snapshot_candidates import _candidates_python
+from src.pipeline.spread_matrix import candidates_numpy
+from src.pipeline.route_tracker import RouteTracker, candidates_tracker
+
+
+PAIR_COUNTS = (500, 2_000, 10_000)
+EXCHANGE_COUNTS = (5, 10, 15)
+ROUNDS = 3
+PRESENCE = 0.7
+
+
+def _books(n_pairs: int, n_ex: int, now: float, seed: int = 7):
+    rnd = random.Random(seed)
+    names = [f"ex{e}" for e in range(n_ex)]
+    books = {name: {} for name in names}
+    pairs = {}
+
+    for p in range(n_pairs):
+        key = f"C{p}_USDT"
+        mid = rnd.choice((0.01, 1.0, 100.0))
+        mapping = {}
+
+        for name in names:
+            if rnd.random() > PRESENCE:
+                mapping[name] = None
+                continue
+            sym = f"C{p}{name}"
+            mapping[name] = sym
+            ticks = rnd.randint(-10, 10)
+            bid = round(mid * (1 + ticks * 0.001), 6)
+            books[name][sym] = {
+                "bid": bid,
+                "ask": round(bid * 1.0005, 6),
+                "bid_size": 1.0,
+                "ask_size": 1.0,
+            }
+
+        pairs[key] = mapping
+
+    exchanges = [(name, books[name], now) for name in names]
+    return pairs, exchanges
+
+
+def _costs(pairs, n_ex: int, seed: int = 11) -> RouteCostMatrix:
+    rnd = random.Random(seed)
+    fees = {f"ex{e}": rnd.choice((0.02, 0.05, 0.075, 0.1)) for e in range(n_ex)}
+    overrides = {
+        (f"ex{rnd.randrange(n_ex)}", key): rnd.choice((0.0, 0.01, 0.2))
+        for key in rnd.sample(sorted(pairs), len(pairs) // 10)
+    }
+    return RouteCostMatrix(fees=fees, buffer_pct=0.05, overrides=overrides)
+
+
+def _check(pairs, exchanges, now, costs: RouteCostMatrix):
+    args = (pairs, exchanges, now, STAGE1_MAX_QUOTE_AGE_S, STAGE1_MIN_NET_PROFIT_PCT, costs)
+    field = "best_spread_pct" if costs is NO_COSTS else "net_spread_pct"
+
+    ref = _candidates_python(*args)
+    got = candidates_numpy(*args)
+    if ref != got:
+        bad = next(k for k in ref.keys() | got.keys() if ref.get(k) != got.get(k))
+        raise SystemExit(f"mismatch {bad}: {ref.get(bad)} != {got.get(bad)}")
+
+    tracked = candidates_tracker(*args)
+    if {k: v[field] for k, v in ref.items()} != {k: v[field] for k, v in tracked.items()}:
+        raise SystemExit(f"tracker: {field} differ")
+    return ref
+
+
+def _incremental_ms(pairs, exchanges, now, costs: RouteCostMatrix) -> float:
+    """
+    Трекер засеян заранее; цикл = 1% обновлений котировок + сбор кандидатов.
+    """
+    tracker = RouteTracker([name for name, _, _ in exchanges], costs)
+    tracker.set_pairs(pairs)
+    tracker.load_books(exchanges)
+    tracker.candidates(now, STAGE1_MAX_QUOTE_AGE_S, STAGE1_MIN_NET_PROFIT_PCT)
+
+    legs = [(name, sym, q) for name, book, _ in exchanges for sym, q in book.items()]
+    rnd = random.Random(1)
+    n_updates = max(1, len(legs) // 100)
+
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        for name, sym, q in rnd.sample(legs, n_updates):
+            tracker.on_quote(name, sym, dict(q, ts=now))
+        tracker.candidates(now, STAGE1_MAX_QUOTE_AGE_S, STAGE1_MIN_NET_PROFIT_PCT)
+    return (time.perf_counter() - t0) / ROUNDS * 1000
+
+
+def _ms(fn, *args) -> float:
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(*args)
+    return (time.perf_counter() - t0) / ROUNDS * 1000
+
+
+def main():
+    print(f"{'pairs':>6} {'ex':>3} {'routes':>7} {'python ms':>10} {'numpy ms':>9} "
+          f"{'tracker ms':>11} {'tracker upd':>12}")
+
+    for n_ex in EXCHANGE_COUNTS:
+        for n_pairs in PAIR_COUNTS:
+            now = time.time()
+            pairs, exchanges = _books(n_pairs, n_ex, now)
+            costs = _costs(pairs, n_ex)
+            args = (pairs, exchanges, now, STAGE1_MAX_QUOTE_AGE_S, STAGE1_MIN_NET_PROFIT_PCT, costs)
+
+            _check(pairs, exchanges, now, NO_COSTS)
+            ref = _check(pairs, exchanges, now, costs)
+
+            t_py = _ms(_candidates_python, *args)
+            t_np = _ms(candidates_numpy, *args)
+            t_tr = _ms(candidates_tracker, *args)
+            t_upd = _incremental_ms(pairs, exchanges, now, costs)
+
+            print(f"{n_pairs:>6} {n_ex:>3} {len(ref):>7} {t_py:>10.1f} {t_np:>9.1f} "
+                  f"{t_tr:>11.1f} {t_upd:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
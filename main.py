@@ -1,99 +1,410 @@
 import time
+import queue
 import asyncio
 import multiprocessing as mp
 import traceback
-from datetime import datetime
 
-from src.utils.pairs_normalize import build_normalized_pairs
-from src.pipeline.stage_one_price_snapshot_candidates import build_stage_one_snapshot
-from src.config import MIN_PROFIT_PCT
+from src.utils.pairs_normalize import fetch_leg_volumes
+from src.utils.metrics import CycleMetrics, Distribution
+from src.utils.runtime import run_worker
+from src.exchanges.ticker_cache import TickerCache
+from src.exchanges.orderbook_cache import OrderbookCache
+from src.exchanges.rate_limit import remaining_budget, set_process_share
+from src.ipc.signal_mailbox import SignalMailbox
+from src.pipeline.stage_one_price_snapshot_candidates import (
+    EXCHANGES,
+    build_stage_one_snapshot,
+    build_stage_one_events,
+)
+from src.pipeline.stage_one_incremental import IncrementalStageOne
+from src.pipeline.stage_two_depth_check import process_stage_two_batch, stage_two_stats, signal_legs
+from src.pipeline.route_tracker import RouteTracker
+from src.pipeline.route_costs import ROUTE_COSTS, binance_fee_overrides
+from src.pipeline.pairs_universe import PairsUniverse, follow
+from src.pipeline.universe_cache import load_universe, write_state
+from src.streams import ws_connection
+from src.streams.quote_store import QuoteStore
+from src.streams.ws_quotes import update_quote_streams
+from src.streams.orderbook_l2 import L2BookManager
+from src.streams.hot_set import HotDepthSet
+from src.transfers.collectors.binance.fees_networks_binance import fetch_binance_trade_fees_raw
+from src.config import (
+    PAIRS_REFRESH_INTERVAL_S,
+    ROUTE_COSTS_REFRESH_S,
+    STAGE1_CYCLE_INTERVAL_S,
+    STAGE1_MODE,
+    STAGE1_SOURCE,
+    STAGE2_BATCH_MAX_SIZE,
+    STAGE2_BATCH_MAX_WAIT_MS,
+    STAGE2_RESULTS_QUEUE_SIZE,
+    STAGE2_L2_HOT_SET,
+    RATE_LIMIT_PROCESS_SHARES,
+)
 
 
 # ======================================================================
-# Stage-0 — Pairs Normalizer
+# Stage-0 — Pairs Normalizer (работает в процессе Stage-1, см. market_data)
 # ======================================================================
 
-def process_pairs_normalizer(shared):
-    try:
-        while True:
+async def pairs_normalizer(universe: PairsUniverse, tickers: TickerCache):
+    metrics = CycleMetrics("PairsNormalizer")
+
+    while True:
+        try:
+            with metrics.cycle():
+                diff = universe.update(await fetch_leg_volumes(tickers))
+
+            if diff is not None:
+                print(
+                    f"[PairsNormalizer] v{diff['version']}: pairs={len(universe)} "
+                    f"+{len(diff['added'])} -{len(diff['removed'])} tiers={len(diff['tiers'])}"
+                )
+
+            # тёплый старт следующего запуска; метка времени обновляется каждый цикл
             try:
-                pairs = asyncio.run(build_normalized_pairs())
-                shared["pairs"] = pairs
-                time.sleep(60)
+                await asyncio.to_thread(write_state, universe.state())
+            except OSError as e:
+                print(f"[PairsNormalizer][WARN] universe cache: {e}")
 
-            except Exception:
-                print("[PairsNormalizer][ERROR]")
-                traceback.print_exc()
-                time.sleep(5)
+            metrics.report()
+            await asyncio.sleep(PAIRS_REFRESH_INTERVAL_S)
 
-    finally:
-        print("[PairsNormalizer] stopped")
+        except Exception:
+            print("[PairsNormalizer][ERROR]")
+            traceback.print_exc()
+            await asyncio.sleep(5)
 
 
 # ======================================================================
 # Stage-1 — Spread Snapshot → Signals (producer)
 # ======================================================================
 
-def process_stage1_producer(shared, queue):
+def _put_signal(mailbox: SignalMailbox, pair: str, v: dict, event: str = "opened"):
+    a, b = v["best_direction"].split("→")
+
+    # L1 ног маршрута — для быстрого подтверждения в Stage-2 без стаканов
+    prices = {v["a"]: v["a_prices"], v["b"]: v["b_prices"]}
+    buy, sell = prices[a], prices[b]
+
+    # комиссии ног — те же, по которым Stage-1 считал чистый спред
+    mults = ROUTE_COSTS.pair_mults(pair)
+
+    mailbox.put({
+        "pair": pair,
+        "event": event,
+        "spread_pct": v["best_spread_pct"],
+        "buy_exchange": a,
+        "sell_exchange": b,
+        "ts": time.time(),
+        "buy_ask": buy["ask"],
+        "buy_ask_size": buy.get("ask_size", 0.0),
+        "sell_bid": sell["bid"],
+        "sell_bid_size": sell.get("bid_size", 0.0),
+        "buy_mult": ROUTE_COSTS.buy_mult(a, mults),
+        "sell_mult": ROUTE_COSTS.sell_mult(b, mults),
+    })
+
+
+async def _snapshot_cycle(
+    pairs: dict,
+    mailbox: SignalMailbox,
+    tickers: TickerCache,
+    store: QuoteStore | None = None,
+    tracker: RouteTracker | None = None,
+):
+    snapshot = await build_stage_one_snapshot(
+        pairs, quote_store=store, route_tracker=tracker, ticker_cache=tickers,
+    )
+    for pair, v in snapshot.items():
+        _put_signal(mailbox, pair, v)
+    return snapshot
+
+
+async def _incremental_cycle(
+    pairs: dict,
+    mailbox: SignalMailbox,
+    incremental: IncrementalStageOne,
+    tickers: TickerCache,
+    store: QuoteStore | None = None,
+):
+    events = await build_stage_one_events(
+        pairs, incremental, quote_store=store, ticker_cache=tickers,
+    )
+    for ev in events:
+        _put_signal(mailbox, ev["pair"], ev["candidate"], ev["event"])
+    return events
+
+
+async def stage1_producer(
+    universe: PairsUniverse,
+    mailbox: SignalMailbox,
+    tickers: TickerCache,
+    started: float,
+    store: QuoteStore | None = None,
+):
+    metrics = CycleMetrics("Stage1Producer")
+    incremental = IncrementalStageOne(EXCHANGES) if STAGE1_MODE == "incremental" else None
+
+    # стрим: движок Stage-1 — слушатель QuoteStore, котировки приходят сами
+    tracker = None
+    if store is not None:
+        if incremental is not None:
+            store.add_listener(incremental)
+        else:
+            tracker = RouteTracker(EXCHANGES, ROUTE_COSTS)
+            store.add_listener(tracker)
+
+    version = 0
+    first_signal = True
+
+    while True:
+        try:
+            pairs = universe.pairs
+            if not pairs:
+                await asyncio.sleep(1)
+                continue
+
+            # смена вселенной — диффами, полный снимок только при расхождении версий
+            if incremental is not None:
+                version = follow(universe, incremental, version, store=store)
+
+            with metrics.cycle():
+                if incremental is not None:
+                    result = await _incremental_cycle(pairs, mailbox, incremental, tickers, store)
+                else:
+                    result = await _snapshot_cycle(pairs, mailbox, tickers, store, tracker)
+            if metrics.report():
+                print(f"[Stage1Producer][METRICS] process_rate_budget={remaining_budget()}")
+
+            if first_signal and result:
+                first_signal = False
+                print(f"[Stage1Producer] time-to-first-signal: {time.monotonic() - started:.2f}s")
+
+            degraded = result.degraded()
+            if degraded:
+                print(f"[Stage1Producer][WARN] sources: {degraded}")
+
+            await asyncio.sleep(STAGE1_CYCLE_INTERVAL_S)
+
+        except Exception:
+            print("[Stage1Producer][ERROR]")
+            traceback.print_exc()
+            await asyncio.sleep(2)
+
+
+async def quote_streams(universe: PairsUniverse, store: QuoteStore):
+    # WS top-of-book по вселенной Stage-0; подписки следуют за её версиями
+    streams = {}
+    version = None
+
+    while True:
+        try:
+            if universe.version != version and universe.pairs:
+                version = universe.version
+                await update_quote_streams(streams, universe.pairs, store)
+                print(f"[QuoteStreams] v{version}: {sorted(streams)}")
+
+            await asyncio.sleep(1)
+
+        except Exception:
+            print("[QuoteStreams][ERROR]")
+            traceback.print_exc()
+            await asyncio.sleep(5)
+
+
+async def route_costs_refresher():
+    # комиссии по парам поверх таблицы конфига; Stage-1 подхватит их по ROUTE_COSTS.version
+    while True:
+        try:
+            raw = await fetch_binance_trade_fees_raw()
+            if ROUTE_COSTS.update(overrides=binance_fee_overrides(raw)):
+                print(f"[RouteCosts] {ROUTE_COSTS.stats()['overrides']} pair fee overrides")
+
+        except RuntimeError as e:
+            # нет API-ключей — остаёмся на комиссиях из конфига
+            print(f"[RouteCosts] pair fees disabled: {e}")
+            return
+
+        except Exception:
+            print("[RouteCosts][ERROR]")
+            traceback.print_exc()
+
+        await asyncio.sleep(ROUTE_COSTS_REFRESH_S)
+
+
+async def market_data(mailbox: SignalMailbox):
+    # Stage-0 и Stage-1 в одном loop: общий кэш тикеров — один запрос на биржу за тик,
+    # вселенная пар передаётся диффами в памяти процесса
+    started = time.monotonic()
+    tickers = TickerCache()
+    universe = PairsUniverse(EXCHANGES)
+
+    # тёплый старт: Stage-1 работает сразу, Stage-0 обновит вселенную в фоне
+    age = load_universe(universe)
+    if age is not None:
+        print(f"[MarketData] warm start: {len(universe)} pairs, snapshot age {age:.0f}s")
+    else:
+        print("[MarketData] cold start: waiting for Stage-0")
+
+    workers = [pairs_normalizer(universe, tickers), route_costs_refresher()]
+
+    # STAGE1_SOURCE="ws": Stage-1 читает котировки из стримов, а не REST-тикеров
+    store = None
+    if STAGE1_SOURCE == "ws":
+        store = QuoteStore()
+        workers.append(quote_streams(universe, store))
+
+    await asyncio.gather(
+        stage1_producer(universe, mailbox, tickers, started, store),
+        *workers,
+    )
+
+
+def process_stage1_producer(mailbox_name: str):
+    set_process_share(RATE_LIMIT_PROCESS_SHARES["Stage1Producer"])
+    mailbox = SignalMailbox.attach(mailbox_name)
     try:
-        while True:
-            try:
-                pairs = shared.get("pairs")
-                if not pairs:
-                    time.sleep(1)
-                    continue
-
-                snapshot = asyncio.run(build_stage_one_snapshot(pairs))
-                if not snapshot:
-                    time.sleep(2)
-                    continue
-
-                for pair, v in snapshot.items():
-                    direction = v["best_direction"]
-                    a, b = direction.split("→")
-
-                    queue.put({
-                        "pair": pair,
-                        "direction": direction,
-                        "spread_pct": v["best_spread_pct"],
-                        "buy_exchange": a,
-                        "sell_exchange": b,
-                        "ts": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-                    })
-
-                time.sleep(3)
+        run_worker("Stage1Producer", market_data(mailbox))
+    finally:
+        mailbox.close()
 
-            except Exception:
-                print("[Stage1Producer][ERROR]")
-                traceback.print_exc()
-                time.sleep(2)
 
+# ======================================================================
+# Stage-2 — micro-batched depth check (consumer)
+# ======================================================================
+
+async def _next_batch(mailbox: SignalMailbox) -> list[dict]:
+    """
+    Ждёт первый сигнал, затем добирает до STAGE2_BATCH_MAX_SIZE
+    не дольше STAGE2_BATCH_MAX_WAIT_MS.
+    """
+    batch = [await mailbox.get_async()]
+    deadline = time.monotonic() + STAGE2_BATCH_MAX_WAIT_MS / 1000
+
+    while len(batch) < STAGE2_BATCH_MAX_SIZE:
+        sig = mailbox.get_nowait()
+        if sig is None:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            sig = await mailbox.get_async(timeout=left)
+            if sig is None:
+                break
+        batch.append(sig)
+
+    return batch
+
+
+def _hot_depth_set() -> HotDepthSet | None:
+    """
+    Локальные L2-стаканы ног, по которым идут сигналы (None — только REST).
+    """
+    if not STAGE2_L2_HOT_SET:
+        return None
+
+    if not ws_connection.AVAILABLE:
+        print("[Stage2Worker][WARN] STAGE2_L2_HOT_SET: websockets not installed, REST orderbooks only")
+        return None
+
+    return HotDepthSet(L2BookManager())
+
+
+async def stage2_worker(mailbox: SignalMailbox, results: mp.Queue):
+    metrics = CycleMetrics("Stage2Worker")
+    batch_sizes = Distribution()
+    queue_wait_ms = Distribution()     # запись сигнала → начало батча
+    latency_ms = Distribution()        # запись сигнала → результат
+    ob_cache = OrderbookCache()
+    hot = _hot_depth_set()
+    dropped = 0
+
+    while True:
+        try:
+            batch = await _next_batch(mailbox)
+
+            # закрытый маршрут стакан не проверяет
+            signals = [
+                {**sig, "best_spread_pct": sig["spread_pct"]}
+                for sig in batch
+                if sig["event"] != "closed"
+            ]
+            if not signals:
+                continue
+
+            started = time.time()
+            batch_sizes.add(len(signals))
+            for sig in signals:
+                queue_wait_ms.add((started - sig["sent_at"]) * 1000)
+
+            if hot is not None:
+                await hot.touch(signal_legs(signals))
+
+            with metrics.cycle():
+                out = await process_stage_two_batch(signals, books=hot, ob_cache=ob_cache)
+
+            done = time.time()
+            for sig, res in zip(signals, out):
+                latency_ms.add((done - sig["sent_at"]) * 1000)
+                try:
+                    results.put_nowait(res)
+                except queue.Full:
+                    dropped += 1
+
+            if metrics.report():
+                print(
+                    f"[Stage2Worker][METRICS] batch {batch_sizes.format()} | "
+                    f"queue_wait_ms {queue_wait_ms.format()} | "
+                    f"e2e_ms {latency_ms.format()} | dropped={dropped}"
+                )
+                print(f"[Stage2Worker][METRICS] {stage_two_stats()} ob_cache={ob_cache.stats()}")
+                print(f"[Stage2Worker][METRICS] mailbox={mailbox.stats()}")
+                print(f"[Stage2Worker][METRICS] process_rate_budget={remaining_budget()}")
+                if hot is not None:
+                    print(f"[Stage2Worker][METRICS] hot_set={hot.stats()} l2={hot.books.stats()}")
+
+        except Exception:
+            print("[Stage2Worker][ERROR]")
+            traceback.print_exc()
+            await asyncio.sleep(1)
+
+
+def process_stage2_worker(mailbox_name: str, results: mp.Queue):
+    set_process_share(RATE_LIMIT_PROCESS_SHARES["Stage2Worker"])
+    mailbox = SignalMailbox.attach(mailbox_name)
+    try:
+        run_worker("Stage2Worker", stage2_worker(mailbox, results))
     finally:
-        print("[Stage1Producer] stopped")
+        mailbox.close()
 
 
 # ======================================================================
-# Stage-1 Consumer — prints signals only
+# Stage-2 results — prints confirmed / rejected
 # ======================================================================
 
-def process_stage1_consumer(queue):
+def process_stage2_results(results: mp.Queue):
     try:
         while True:
-            sig = queue.get()
+            r = results.get()
 
             try:
-                print(
-                    f"[SIGNAL] {sig['pair']} | "
-                    f"{sig['buy_exchange']} → {sig['sell_exchange']} | "
-                    f"{sig['spread_pct']}% | {sig['direction']}"
-                )
+                if r["status"] == "confirmed":
+                    print(
+                        f"[CONFIRMED:{r.get('source', 'depth')}] {r['pair']} | "
+                        f"{r['direction']} | net {r['exec_spread_pct']:.3f}% | "
+                        f"max {r['max_notional_usdt']:.0f} USDT"
+                    )
+                else:
+                    print(f"[REJECTED] {r['pair']} | {r['direction']} | {r['reason']}")
 
             except Exception:
-                print("[Stage1Consumer][ERROR] bad signal payload")
+                print("[Stage2Results][ERROR] bad result payload")
                 traceback.print_exc()
 
+    except KeyboardInterrupt:
+        pass
+
     finally:
-        print("[Stage1Consumer] stopped")
+        print("[Stage2Results] stopped")
 
 
 # ======================================================================
@@ -107,19 +418,19 @@ def start_process(target, name, *args):
 
 
 if __name__ == "__main__":
-    manager = mp.Manager()
-    shared = manager.dict()
-    queue = manager.Queue()
+    # сегмент shared memory живёт у супервизора и переживает рестарт воркеров
+    mailbox = SignalMailbox.create()
+    results = mp.Queue(maxsize=STAGE2_RESULTS_QUEUE_SIZE)
 
     processes = {
-        "PairsNormalizer": lambda: start_process(
-            process_pairs_normalizer, "PairsNormalizer", shared
-        ),
         "Stage1Producer": lambda: start_process(
-            process_stage1_producer, "Stage1Producer", shared, queue
+            process_stage1_producer, "Stage1Producer", mailbox.name
         ),
-        "Stage1Consumer": lambda: start_process(
-            process_stage1_consumer, "Stage1Consumer", queue
+        "Stage2Worker": lambda: start_process(
+            process_stage2_worker, "Stage2Worker", mailbox.name, results
+        ),
+        "Stage2Results": lambda: start_process(
+            process_stage2_results, "Stage2Results", results
         ),
     }
 
@@ -142,3 +453,5 @@ if __name__ == "__main__":
             if p.is_alive():
                 p.terminate()
                 p.join()
+
+        mailbox.close()
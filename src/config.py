@@ -13,20 +13,98 @@ Project configuration module.
 # Глубина стакана, используемая на Stage-2 (единая для всех бирж)
 ORDERBOOK_DEPTH = 10
 
+# Быстрые схемные декодеры ответов (нужен msgspec или orjson)
+FAST_DECODE_ENABLED = True
+
 # Минимальный суточный оборот пары в USDT.
 # Если оборот ниже — пара считается отсутствующей на данной бирже.
 MIN_24H_VOLUME_USDT = 300_000.0
 
+# Версионируемая вселенная Stage-0 (src/pipeline/pairs_universe.py).
+# Гистерезис: нога входит при обороте >= порога, выходит только ниже
+# порог * UNIVERSE_EXIT_RATIO. Тиры оборота — нижние границы, по возрастанию.
+UNIVERSE_EXIT_RATIO = 0.8
+UNIVERSE_VOLUME_TIERS_USDT = (
+    MIN_24H_VOLUME_USDT,
+    MIN_24H_VOLUME_USDT * 10,
+    MIN_24H_VOLUME_USDT * 100,
+)
+UNIVERSE_DIFF_HISTORY = 32           # диффов в памяти для догоняющих потребителей
+
+# Разбор тикеров Stage-0: "loop" (построчно, src/utils/pairs_normalize.py)
+# | "columnar" (pandas, src/utils/pairs_normalize_pandas.py; результат тот же,
+# на list[dict] без pyarrow медленнее — см. benchmarks/bench_pairs_normalize.py)
+STAGE0_NORMALIZER = "loop"
+
+# Тёплый старт: последняя вселенная на диске; при запуске берётся,
+# если моложе UNIVERSE_CACHE_MAX_AGE_S, и обновляется в фоне
+UNIVERSE_CACHE_PATH = ".cache/universe.json"
+UNIVERSE_CACHE_MAX_AGE_S = 6 * 3600.0
+
 # Stage-1: Price-spread candidates (по тикерам)
 # Порог по спреду в процентах — тестовый «жёсткий».
 MIN_PROFIT_PCT = 0.60   #
 TARGET_NET_PROFIT_PCT = 0.20 # чистая цель после комиссий и буфера
 
+# Порог Stage-1 по ЧИСТОМУ спреду L1 (комиссии taker + SAFETY_FEE_BUFFER_PCT,
+# src/pipeline/route_costs.py): ниже него Stage-2 сигнал всё равно отклонит
+STAGE1_MIN_NET_PROFIT_PCT = TARGET_NET_PROFIT_PCT
+
+# Период обновления комиссий по парам (Binance /sapi/v1/asset/tradeFee,
+# нужны BINANCE_API_KEY / BINANCE_API_SECRET; без ключей — комиссии из таблицы)
+ROUTE_COSTS_REFRESH_S = 3600.0
+
+# Дедлайн цикла Stage-1: биржа, не ответившая за это время,
+# участвует последними известными котировками (если они ещё свежие)
+STAGE1_DEADLINE_S = 2.5
+# Окно свежести: ноги с котировками старше в спреды не попадают
+STAGE1_MAX_QUOTE_AGE_S = 10.0
+# Режим воркера Stage-1: "snapshot" (полный срез) | "incremental" (события)
+STAGE1_MODE = "incremental"
+# Источник котировок Stage-1: "rest" (тикеры бирж каждый цикл) | "ws"
+# (WebSocket top-of-book в QuoteStore, src/streams/ws_quotes.py; extra "streams")
+STAGE1_SOURCE = "rest"
+
+# Расчёт кандидатов: "numpy" (spread_matrix) | "columnar" (columnar_quotes)
+# | "tracker" (route_tracker)
+# | "python" (эталонный цикл)
+STAGE1_SPREAD_ENGINE = "numpy"
+
 # Stage-2: Executable liquidity checks
 MIN_EXECUTION_NOTIONAL_USDT = 500.0
 MAX_BOOK_DEPTH_LEVELS = 10
 MAX_SLIPPAGE_PCT = 0.20   # %
 
+# Кэш REST-стаканов Stage-2 (src/exchanges/orderbook_cache.py):
+# TTL по биржам (секунды) и предел числа стаканов в памяти (LRU)
+STAGE2_ORDERBOOK_TTL_S = {
+    "binance": 1.0,
+    "bybit":   1.0,
+    "okx":     1.0,
+    "gate":    2.0,
+    "kucoin":  2.0,
+}
+STAGE2_ORDERBOOK_CACHE_SIZE = 512
+
+# Быстрое подтверждение по L1: объём лучших уровней обеих ног покрывает
+# MIN_EXECUTION_NOTIONAL_USDT и чистый спред L1 >= TARGET_NET_PROFIT_PCT —
+# сигнал подтверждается без загрузки стаканов
+STAGE2_L1_FAST_CONFIRM = True
+
+# Ступени глубины REST-стаканов Stage-2 (src/pipeline/depth_tiers.py):
+# начинаем с самой дешёвой, следующая — только если накопленного объёма
+# не хватило на MIN_EXECUTION_NOTIONAL_USDT. Значения — допустимые limit API.
+STAGE2_DEPTH_TIERS = {
+    "binance": (5, 20, 100, 500),    # вес 5 до limit=100, 25 до 500
+    "bybit":   (1, 50, 200),
+    "okx":     (1, 20, 100, 400),
+    "gate":    (5, 20, 100),
+    "kucoin":  (20, 100),            # только level2_20 / level2_100
+}
+
+# Кривая «прибыль от объёма» в результатах Stage-2 (объёмы покупки, USDT)
+STAGE2_CURVE_NOTIONALS_USDT = (100, 250, 500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000)
+
 # Safety buffer (будет использоваться позже в расчётах)
 SAFETY_FEE_BUFFER_PCT = 0.30
 
@@ -45,6 +123,120 @@ EXCHANGE_TAKER_FEES = {
 
 
 
+# =======================================================================
+# --- RUNTIME (воркер-процессы main.py) ---------------------------------
+# =======================================================================
+
+# Event loop воркеров: "auto" (uvloop, если установлен) | "uvloop" | "asyncio"
+EVENT_LOOP_BACKEND = "auto"
+
+# Периоды циклов воркеров (секунды)
+PAIRS_REFRESH_INTERVAL_S = 60.0
+STAGE1_CYCLE_INTERVAL_S = 3.0
+
+# Общий кэш полных тикеров Stage-0 / Stage-1 (src/exchanges/ticker_cache.py):
+# максимальный возраст переиспользуемого снимка для каждой стадии
+TICKER_CACHE_STAGE0_MAX_AGE_S = 30.0
+TICKER_CACHE_STAGE1_MAX_AGE_S = 1.0
+
+# Метрики времени цикла: размер окна и период печати сводки
+METRICS_WINDOW = 500
+METRICS_REPORT_INTERVAL_S = 60.0
+
+# IPC между воркерами (shared memory, src/ipc/)
+IPC_SIGNAL_MAILBOX_CAPACITY = 4096   # пар в почтовом ящике Stage-1 → Stage-2
+IPC_RING_POLL_MAX_S = 0.05           # максимальная пауза опроса кольца
+
+# Stage-2 воркер (main.py): микро-батч — до STAGE2_BATCH_MAX_SIZE сигналов
+# или STAGE2_BATCH_MAX_WAIT_MS после первого, что наступит раньше;
+# стаканы всего батча грузятся параллельно
+STAGE2_BATCH_MAX_SIZE = 32
+STAGE2_BATCH_MAX_WAIT_MS = 20.0
+STAGE2_RESULTS_QUEUE_SIZE = 1024     # результатов Stage-2 → вывод (лишние отбрасываются)
+
+
+
+# =======================================================================
+# --- HTTP TRANSPORT (пул сессий бирж) ----------------------------------
+# =======================================================================
+
+# Лимиты пула соединений на ОДНУ биржу
+HTTP_POOL_MAX_CONNECTIONS = 20
+HTTP_POOL_MAX_KEEPALIVE = 10
+HTTP_KEEPALIVE_EXPIRY_S = 60.0
+
+# Таймауты (секунды)
+HTTP_CONNECT_TIMEOUT_S = 5.0
+HTTP_TIMEOUT_S = 10.0
+
+# HTTP/2 — включается только если установлен пакет h2
+HTTP2_ENABLED = True
+
+# Прогрев соединений при старте процесса
+HTTP_WARMUP_ON_START = True
+
+# Лимиты запросов бирж (token bucket на клиенте):
+# exchange → bucket → (ёмкость в единицах веса, пополнение в секунду)
+EXCHANGE_RATE_LIMITS = {
+    # 6000 weight / мин на IP; /sapi — отдельный лимит 12000 / мин
+    "binance": {"ip": (6000, 100.0), "sapi": (12000, 200.0)},
+
+    # 600 запросов / 5 сек на IP
+    "bybit":   {"ip": (600, 120.0)},
+
+    # OKX — лимит на каждый эндпоинт отдельно (запросов / 2 сек)
+    "okx":     {"tickers": (20, 10.0), "books": (40, 20.0), "time": (10, 5.0)},
+
+    # Gate — 200 запросов / 10 сек на эндпоинт
+    "gate":    {"tickers": (200, 20.0), "order_book": (200, 20.0), "time": (200, 20.0)},
+
+    # KuCoin — общий публичный пул 2000 weight / 30 сек
+    "kucoin":  {"public": (2000, 66.0)},
+}
+
+# Какую долю биржевого лимита разрешаем себе использовать
+RATE_LIMIT_HEADROOM = 0.9
+
+# Лимитер у каждого воркер-процесса свой (src/exchanges/rate_limit.py),
+# поэтому бюджет биржи (с HEADROOM) делится между процессами явно; сумма <= 1.
+# Заголовки расхода бирж (USAGE_HEADERS) всё равно общие на IP и урезают
+# локальный бюджет, если соседний процесс потратил больше своей доли.
+RATE_LIMIT_PROCESS_SHARES = {
+    "Stage1Producer": 0.5,    # Stage-0 + тикеры Stage-1 + комиссии
+    "Stage2Worker":   0.5,    # REST-стаканы Stage-2 и снимки L2
+}
+
+
+
+# =======================================================================
+# --- WEBSOCKET STREAMS --------------------------------------------------
+# =======================================================================
+
+# Переподключение: экспоненциальная пауза между попытками (секунды)
+WS_RECONNECT_MIN_DELAY_S = 1.0
+WS_RECONNECT_MAX_DELAY_S = 30.0
+
+# Если по соединению нет сообщений дольше — считаем его мёртвым
+WS_IDLE_TIMEOUT_S = 60.0
+
+
+# Локальные L2-стаканы (Stage-2 без REST)
+# глубина REST-снимка для засева стакана
+L2_SNAPSHOT_DEPTH = 100
+# сколько уровней на сторону держим в памяти (дальние обрезаются)
+L2_MAX_LEVELS = 200
+
+# Hot-set: depth-стримы только для ног, которые отмечает Stage-1
+# сколько держим ногу подписанной после последнего сигнала (секунды)
+HOT_SET_TTL_S = 120.0
+# максимум одновременных depth-подписок (LRU-вытеснение сверх лимита)
+HOT_SET_MAX_SUBSCRIPTIONS = 100
+# Stage-2 берёт стаканы ног сигналов из hot-set (extra "streams");
+# False — только REST (OrderbookCache)
+STAGE2_L2_HOT_SET = False
+
+
+
 # =======================================================================
 # --- BINANCE ------------------------------------------------------------
 # =======================================================================
@@ -61,6 +253,9 @@ BINANCE_TICKERS_ENDPOINT = "/api/v3/ticker/24hr"
 # Orderbook (Stage-2 depth-check)
 BINANCE_ORDERBOOK_ENDPOINT = "/api/v3/depth"
 
+# Лёгкий эндпоинт для прогрева соединения
+BINANCE_PING_ENDPOINT = "/api/v3/ping"
+
 # Fees / networks / withdrawals
 BINANCE_FEES_ENDPOINT = "/sapi/v1/asset/tradeFee"
 BINANCE_COIN_INFO_ENDPOINT = "/sapi/v1/capital/config/getall"
@@ -80,6 +275,9 @@ BYBIT_TICKERS_ENDPOINT = "/v5/market/tickers"
 # Orderbook (Stage-2 depth-check)
 BYBIT_ORDERBOOK_ENDPOINT = "/v5/market/orderbook"
 
+# Лёгкий эндпоинт для прогрева соединения
+BYBIT_PING_ENDPOINT = "/v5/market/time"
+
 # Fees / networks / withdrawals
 BYBIT_FEES_ENDPOINT = "/v5/account/fee-rate"
 BYBIT_COIN_INFO_ENDPOINT = "/v5/asset/coin/query-info"
@@ -99,6 +297,9 @@ OKX_TICKERS_ENDPOINT = "/api/v5/market/tickers"
 # Orderbook (Stage-2 depth-check)
 OKX_ORDERBOOK_ENDPOINT = "/api/v5/market/books"
 
+# Лёгкий эндпоинт для прогрева соединения
+OKX_PING_ENDPOINT = "/api/v5/public/time"
+
 
 
 # =======================================================================
@@ -114,6 +315,9 @@ GATE_TICKERS_ENDPOINT = "/spot/tickers"
 # Orderbook (Stage-2 depth-check)
 GATE_ORDERBOOK_ENDPOINT = "/spot/order_book"
 
+# Лёгкий эндпоинт для прогрева соединения
+GATE_PING_ENDPOINT = "/spot/time"
+
 
 
 # =======================================================================
@@ -128,3 +332,11 @@ KUCOIN_TICKERS_ENDPOINT = "/api/v1/market/allTickers"
 
 # Orderbook (Stage-2 depth-check)
 KUCOIN_ORDERBOOK_ENDPOINT = "/api/v1/market/orderbook/level2_20"
+KUCOIN_ORDERBOOK_100_ENDPOINT = "/api/v1/market/orderbook/level2_100"
+
+# Лёгкий эндпоинт для прогрева соединения
+KUCOIN_PING_ENDPOINT = "/api/v1/timestamp"
+
+# Публичный токен + адрес WebSocket-сервера
+KUCOIN_BULLET_PUBLIC_ENDPOINT = "/api/v1/bullet-public"
+
@@ -1,5 +1,5 @@
 import asyncio
-import httpx
+from typing import Any, Callable
 
 from src.config import (
     BINANCE_BASE_REST_URL,
@@ -8,22 +8,38 @@ from src.config import (
     BINANCE_ORDERBOOK_ENDPOINT,   # эндпоинт depth
     ORDERBOOK_DEPTH,              # ← единая глубина стакана
 )
+from src.exchanges.rate_limit import (
+    limited_request,
+    binance_depth_weight,
+    PRIORITY_STAGE1,
+    PRIORITY_STAGE2,
+    PRIORITY_BACKGROUND,
+)
 
 
 # ----------------------------------------------------------------------
 # bookTicker (bid/ask, без объёма)
 # ----------------------------------------------------------------------
 
-async def fetch_book_tickers_raw() -> list:
+async def fetch_book_tickers_raw(
+    priority: int = PRIORITY_STAGE1,
+    decoder: Callable[[bytes], Any] | None = None,
+) -> list:
     """
     Возвращает сырые Binance bookTicker (bid/ask) без изменений.
+    decoder — быстрый декодер тела ответа (src/exchanges/decoders.py).
     """
     url = f"{BINANCE_BASE_REST_URL}{BINANCE_BOOK_TICKER_ENDPOINT}"
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url)
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await limited_request(
+        "binance", BINANCE_BOOK_TICKER_ENDPOINT, url, priority=priority,
+    )
+    resp.raise_for_status()
+
+    if decoder is not None:
+        return decoder(resp.content)
+
+    data = resp.json()
 
     return data if isinstance(data, list) else []
 
@@ -32,17 +48,18 @@ async def fetch_book_tickers_raw() -> list:
 # 24h tickers (источник объёма: quoteVolume)
 # ----------------------------------------------------------------------
 
-async def fetch_tickers_24h_raw() -> list:
+async def fetch_tickers_24h_raw(priority: int = PRIORITY_BACKGROUND) -> list:
     """
     Возвращает сырые Binance 24h tickers.
     Здесь есть поле quoteVolume — используем для фильтра ликвидности.
     """
     url = f"{BINANCE_BASE_REST_URL}{BINANCE_TICKERS_ENDPOINT}"
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url)
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await limited_request(
+        "binance", BINANCE_TICKERS_ENDPOINT, url, priority=priority,
+    )
+    resp.raise_for_status()
+    data = resp.json()
 
     return data if isinstance(data, list) else []
 
@@ -51,10 +68,16 @@ async def fetch_tickers_24h_raw() -> list:
 # Orderbook / depth
 # ----------------------------------------------------------------------
 
-async def fetch_orderbook_raw(symbol: str, limit: int | None = None) -> dict:
+async def fetch_orderbook_raw(
+    symbol: str,
+    limit: int | None = None,
+    priority: int = PRIORITY_STAGE2,
+    decoder: Callable[[bytes], Any] | None = None,
+) -> dict:
     """
     Возвращает стакан Binance (bids / asks) для символа.
     limit — глубина (число уровней), по умолчанию берём из общего конфига.
+    decoder — быстрый декодер тела ответа (src/exchanges/decoders.py).
     """
     if limit is None:
         limit = ORDERBOOK_DEPTH
@@ -66,10 +89,16 @@ async def fetch_orderbook_raw(symbol: str, limit: int | None = None) -> dict:
         "limit": limit,
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await limited_request(
+        "binance", BINANCE_ORDERBOOK_ENDPOINT, url,
+        params=params, priority=priority, weight=binance_depth_weight(limit),
+    )
+    resp.raise_for_status()
+
+    if decoder is not None:
+        return decoder(resp.content)
+
+    data = resp.json()
 
     return data or {}
 
@@ -0,0 +1,106 @@
+"""
+Binance WebSocket — bookTicker (best bid / ask в реальном времени).
+
+Модуль только формирует сообщения подписки и разбирает входящие пакеты.
+Соединение, переподключение и хранение котировок — в src/streams/.
+"""
+
+from src.config import BINANCE_BASE_WS_URL
+
+
+# Binance: не более 5 входящих сообщений в секунду на соединение
+SUBSCRIBE_CHUNK = 200
+SUBSCRIBE_DELAY_S = 0.25
+
+# Binance сам шлёт ping — библиотека websockets отвечает pong автоматически
+PING_INTERVAL_S = None
+
+
+async def ws_url() -> str:
+    return BINANCE_BASE_WS_URL
+
+
+def ping_message():
+    return None
+
+
+# ----------------------------------------------------------------------
+# bookTicker
+# ----------------------------------------------------------------------
+
+def build_ticker_subscribe(symbols: list[str], unsubscribe: bool = False) -> list:
+    """
+    Сообщения SUBSCRIBE / UNSUBSCRIBE на <symbol>@bookTicker.
+    """
+    method = "UNSUBSCRIBE" if unsubscribe else "SUBSCRIBE"
+    out = []
+
+    for i in range(0, len(symbols), SUBSCRIBE_CHUNK):
+        chunk = symbols[i:i + SUBSCRIBE_CHUNK]
+        out.append({
+            "method": method,
+            "params": [f"{s.lower()}@bookTicker" for s in chunk],
+            "id": i // SUBSCRIBE_CHUNK + 1,
+        })
+
+    return out
+
+
+def parse_ticker_message(msg) -> list:
+    """
+    {"u":400900217,"s":"BNBUSDT","b":"25.35","B":"31.21","a":"25.36","A":"40.66"}
+    → [(symbol, bid, ask, bid_size, ask_size)]
+    """
+    if not isinstance(msg, dict) or "s" not in msg or "b" not in msg:
+        return []
+
+    return [(
+        msg["s"],
+        float(msg["b"]),
+        float(msg["a"]),
+        float(msg["B"]),
+        float(msg["A"]),
+    )]
+
+
+# ----------------------------------------------------------------------
+# diff depth (<symbol>@depth@100ms) — локальный L2 стакан
+# ----------------------------------------------------------------------
+
+# Стакан засевается REST-снимком /api/v3/depth (lastUpdateId)
+DEPTH_WS_SNAPSHOTS = False
+
+
+def build_depth_subscribe(symbols: list[str], unsubscribe: bool = False) -> list:
+    method = "UNSUBSCRIBE" if unsubscribe else "SUBSCRIBE"
+
+    return [
+        {
+            "method": method,
+            "params": [f"{s.lower()}@depth@100ms" for s in symbols[i:i + SUBSCRIBE_CHUNK]],
+            "id": i // SUBSCRIBE_CHUNK + 1,
+        }
+        for i in range(0, len(symbols), SUBSCRIBE_CHUNK)
+    ]
+
+
+def parse_depth_message(msg) -> list:
+    """
+    {"e":"depthUpdate","s":"BNBBTC","U":157,"u":160,"b":[["p","q"]],"a":[["p","q"]]}
+    """
+    if not isinstance(msg, dict) or msg.get("e") != "depthUpdate":
+        return []
+
+    return [{
+        "symbol": msg["s"],
+        "snapshot": False,
+        "bids": msg.get("b") or [],
+        "asks": msg.get("a") or [],
+        "first_id": int(msg["U"]),
+        "last_id": int(msg["u"]),
+    }]
+
+
+def rest_snapshot_id(ob: dict) -> int | None:
+    v = ob.get("lastUpdateId")
+    return int(v) if v is not None else None
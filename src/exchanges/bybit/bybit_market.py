@@ -1,5 +1,5 @@
 import asyncio
-import httpx
+from typing import Any, Callable
 
 from src.config import (
     BYBIT_BASE_REST_URL,
@@ -7,16 +7,26 @@ from src.config import (
     BYBIT_ORDERBOOK_ENDPOINT,
     ORDERBOOK_DEPTH,          # ← единая глубина стакана
 )
+from src.exchanges.rate_limit import (
+    limited_request,
+    PRIORITY_STAGE1,
+    PRIORITY_STAGE2,
+)
 
 
 # ----------------------------------------------------------------------
 # 24h tickers (turnover24h / volume)
 # ----------------------------------------------------------------------
 
-async def fetch_tickers_raw(category: str = "spot") -> list:
+async def fetch_tickers_raw(
+    category: str = "spot",
+    priority: int = PRIORITY_STAGE1,
+    decoder: Callable[[bytes], Any] | None = None,
+) -> list:
     """
     Возвращает сырые Bybit tickers.
     Важные поля: bid1Price / ask1Price / turnover24h.
+    decoder — быстрый декодер тела ответа (src/exchanges/decoders.py).
     """
     url = f"{BYBIT_BASE_REST_URL}{BYBIT_TICKERS_ENDPOINT}"
 
@@ -24,10 +34,15 @@ async def fetch_tickers_raw(category: str = "spot") -> list:
         "category": category,
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        payload = resp.json()
+    resp = await limited_request(
+        "bybit", BYBIT_TICKERS_ENDPOINT, url, params=params, priority=priority,
+    )
+    resp.raise_for_status()
+
+    if decoder is not None:
+        return decoder(resp.content)
+
+    payload = resp.json()
 
     data = payload.get("result", {}).get("list", [])
     return data if isinstance(data, list) else []
@@ -37,10 +52,16 @@ async def fetch_tickers_raw(category: str = "spot") -> list:
 # Orderbook / depth
 # ----------------------------------------------------------------------
 
-async def fetch_orderbook_raw(symbol: str, limit: int | None = None) -> dict:
+async def fetch_orderbook_raw(
+    symbol: str,
+    limit: int | None = None,
+    priority: int = PRIORITY_STAGE2,
+    decoder: Callable[[bytes], Any] | None = None,
+) -> dict:
     """
     Возвращает стакан Bybit (bids / asks) для символа.
     limit — глубина, по умолчанию берём из общего конфига.
+    decoder — быстрый декодер тела ответа (src/exchanges/decoders.py).
     """
     if limit is None:
         limit = ORDERBOOK_DEPTH
@@ -53,10 +74,15 @@ async def fetch_orderbook_raw(symbol: str, limit: int | None = None) -> dict:
             "limit": limit,
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        payload = resp.json()
+    resp = await limited_request(
+        "bybit", BYBIT_ORDERBOOK_ENDPOINT, url, params=params, priority=priority,
+    )
+    resp.raise_for_status()
+
+    if decoder is not None:
+        return decoder(resp.content)
+
+    payload = resp.json()
 
     data = payload.get("result", {})
     return data or {}
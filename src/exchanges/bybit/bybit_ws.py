@@ -0,0 +1,112 @@
+"""
+Bybit WebSocket — orderbook.1 (best bid / ask в реальном времени).
+
+Spot-канал tickers у Bybit не содержит bid/ask,
+поэтому top-of-book берём из стакана глубины 1.
+"""
+
+from src.config import BYBIT_BASE_WS_URL
+
+
+# Bybit spot: не более 10 топиков в одном запросе подписки
+SUBSCRIBE_CHUNK = 10
+SUBSCRIBE_DELAY_S = 0.0
+
+# Bybit рекомендует ping каждые 20 секунд
+PING_INTERVAL_S = 20.0
+
+
+async def ws_url() -> str:
+    return BYBIT_BASE_WS_URL
+
+
+def ping_message():
+    return {"op": "ping"}
+
+
+# ----------------------------------------------------------------------
+# orderbook.1
+# ----------------------------------------------------------------------
+
+def build_ticker_subscribe(symbols: list[str], unsubscribe: bool = False) -> list:
+    op = "unsubscribe" if unsubscribe else "subscribe"
+
+    return [
+        {"op": op, "args": [f"orderbook.1.{s}" for s in symbols[i:i + SUBSCRIBE_CHUNK]]}
+        for i in range(0, len(symbols), SUBSCRIBE_CHUNK)
+    ]
+
+
+def parse_ticker_message(msg) -> list:
+    """
+    {"topic":"orderbook.1.BTCUSDT","type":"snapshot",
+     "data":{"s":"BTCUSDT","b":[["p","q"]],"a":[["p","q"]],"u":..,"seq":..}}
+    """
+    if not isinstance(msg, dict):
+        return []
+
+    topic = msg.get("topic") or ""
+    if not topic.startswith("orderbook.1."):
+        return []
+
+    data = msg.get("data") or {}
+    bids = data.get("b") or []
+    asks = data.get("a") or []
+    if not bids or not asks:
+        return []
+
+    return [(
+        data.get("s") or topic[len("orderbook.1."):],
+        float(bids[0][0]),
+        float(asks[0][0]),
+        float(bids[0][1]),
+        float(asks[0][1]),
+    )]
+
+
+# ----------------------------------------------------------------------
+# orderbook.50 — локальный L2 стакан (snapshot + delta)
+# ----------------------------------------------------------------------
+
+# Bybit сам присылает snapshot при подписке (и при рестарте сервиса: u=1)
+DEPTH_WS_SNAPSHOTS = True
+DEPTH_LEVELS = 50
+
+
+def build_depth_subscribe(symbols: list[str], unsubscribe: bool = False) -> list:
+    op = "unsubscribe" if unsubscribe else "subscribe"
+
+    return [
+        {"op": op, "args": [f"orderbook.{DEPTH_LEVELS}.{s}" for s in symbols[i:i + SUBSCRIBE_CHUNK]]}
+        for i in range(0, len(symbols), SUBSCRIBE_CHUNK)
+    ]
+
+
+def parse_depth_message(msg) -> list:
+    """
+    {"topic":"orderbook.50.BTCUSDT","type":"snapshot"|"delta",
+     "data":{"s":"BTCUSDT","b":[..],"a":[..],"u":18521288,"seq":7961638724}}
+
+    u — номер обновления (каждая delta = предыдущий u + 1),
+    seq — сквозной номер биржи (только растёт).
+    """
+    if not isinstance(msg, dict):
+        return []
+
+    prefix = f"orderbook.{DEPTH_LEVELS}."
+    topic = msg.get("topic") or ""
+    if not topic.startswith(prefix):
+        return []
+
+    data = msg.get("data") or {}
+    u = int(data.get("u", 0))
+
+    return [{
+        "symbol": data.get("s") or topic[len(prefix):],
+        "snapshot": msg.get("type") == "snapshot" or u == 1,
+        "bids": data.get("b") or [],
+        "asks": data.get("a") or [],
+        "first_id": u,
+        "last_id": u,
+        "seq": int(data.get("seq", 0)),
+    }]
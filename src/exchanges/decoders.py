@@ -0,0 +1,344 @@
+"""
+decoders — быстрые схемные декодеры тикеров и стаканов
+
+Полные тикеры Binance / KuCoin — тысячи объектов по 15–20 полей.
+resp.json() строит из них полноценные dict, из которых Stage-1 берёт 4 поля.
+
+Здесь под каждую биржу описаны типизированные структуры только с нужными
+полями (symbol, bid, ask, размеры), лишнее пропускается ещё при разборе.
+
+• msgspec установлен  → msgspec.Struct + Decoder (основной путь)
+• только orjson       → orjson.loads + выборка полей
+• ничего              → json.loads (результат тот же, выигрыша нет)
+
+Декодеры передаются в fetch_*_raw(decoder=...) и получают тело ответа (bytes).
+universe — символы активной вселенной Stage-0: остальные строки отбрасываются
+до перевода в float и до создания dict котировки.
+Сравнение с текущим путём: python -m benchmarks.bench_decoders
+"""
+
+import json
+from typing import Dict, Any, Callable, Container, Optional, List
+
+try:
+    import msgspec
+except ImportError:  # опциональная зависимость (extra "fast")
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # опциональная зависимость (extra "fast")
+    orjson = None
+
+
+AVAILABLE = msgspec is not None or orjson is not None
+
+_loads: Callable[[bytes], Any] = orjson.loads if orjson is not None else json.loads
+
+
+def _f(v) -> float:
+    return float(v or 0)
+
+
+def _quote(bid, ask, bid_size, ask_size) -> Dict[str, float]:
+    return {
+        "bid": float(bid),
+        "ask": float(ask),
+        "bid_size": _f(bid_size),
+        "ask_size": _f(ask_size),
+    }
+
+
+# =========================================================================
+# msgspec structs — только используемые поля
+# =========================================================================
+
+if msgspec is not None:
+
+    # --- tickers ---------------------------------------------------------
+
+    class _BinanceBookTicker(msgspec.Struct):
+        symbol: str = ""
+        bidPrice: str = "0"
+        bidQty: str = "0"
+        askPrice: str = "0"
+        askQty: str = "0"
+
+    class _BybitTicker(msgspec.Struct):
+        symbol: str = ""
+        bid1Price: str = ""
+        bid1Size: str = ""
+        ask1Price: str = ""
+        ask1Size: str = ""
+
+    class _BybitResult(msgspec.Struct):
+        list: List[_BybitTicker] = []
+
+    class _BybitTickers(msgspec.Struct):
+        result: Optional[_BybitResult] = None
+
+    class _OkxTicker(msgspec.Struct):
+        instId: str = ""
+        bidPx: str = ""
+        bidSz: str = ""
+        askPx: str = ""
+        askSz: str = ""
+
+    class _OkxTickers(msgspec.Struct):
+        data: List[_OkxTicker] = []
+
+    class _GateTicker(msgspec.Struct):
+        currency_pair: str = ""
+        highest_bid: Optional[str] = None
+        lowest_ask: Optional[str] = None
+        highest_size: Optional[str] = None      # объём лучшего bid (база)
+        lowest_size: Optional[str] = None       # объём лучшего ask (база)
+
+    class _KucoinTicker(msgspec.Struct):
+        symbol: str = ""
+        buy: Optional[str] = None
+        sell: Optional[str] = None
+        bestBidSize: Optional[str] = None
+        bestAskSize: Optional[str] = None
+
+    class _KucoinTickerList(msgspec.Struct):
+        ticker: List[_KucoinTicker] = []
+
+    class _KucoinTickers(msgspec.Struct):
+        data: Optional[_KucoinTickerList] = None
+
+    # --- orderbooks ------------------------------------------------------
+
+    class _PlainBook(msgspec.Struct):                 # Binance / Gate
+        bids: List[List[str]] = []
+        asks: List[List[str]] = []
+
+    class _BybitBookResult(msgspec.Struct):
+        b: List[List[str]] = []
+        a: List[List[str]] = []
+
+    class _BybitBook(msgspec.Struct):
+        result: Optional[_BybitBookResult] = None
+
+    class _OkxBooks(msgspec.Struct):
+        data: List[_PlainBook] = []
+
+    class _KucoinBook(msgspec.Struct):
+        data: Optional[_PlainBook] = None
+
+    _dec_binance_tickers = msgspec.json.Decoder(List[_BinanceBookTicker])
+    _dec_bybit_tickers = msgspec.json.Decoder(_BybitTickers)
+    _dec_okx_tickers = msgspec.json.Decoder(_OkxTickers)
+    _dec_gate_tickers = msgspec.json.Decoder(List[_GateTicker])
+    _dec_kucoin_tickers = msgspec.json.Decoder(_KucoinTickers)
+
+    _dec_plain_book = msgspec.json.Decoder(_PlainBook)
+    _dec_bybit_book = msgspec.json.Decoder(_BybitBook)
+    _dec_okx_book = msgspec.json.Decoder(_OkxBooks)
+    _dec_kucoin_book = msgspec.json.Decoder(_KucoinBook)
+
+
+# =========================================================================
+# tickers → {native symbol: {"bid", "ask", "bid_size", "ask_size"}}
+# =========================================================================
+
+def decode_binance_quotes(
+    body: bytes,
+    universe: Container[str] | None = None,
+) -> Dict[str, Dict[str, float]]:
+    if msgspec is not None:
+        return {
+            r.symbol: _quote(r.bidPrice, r.askPrice, r.bidQty, r.askQty)
+            for r in _dec_binance_tickers.decode(body)
+            if r.symbol and (universe is None or r.symbol in universe)
+        }
+
+    return {
+        it["symbol"]: _quote(it["bidPrice"], it["askPrice"], it["bidQty"], it["askQty"])
+        for it in _loads(body)
+        if it.get("symbol") and (universe is None or it["symbol"] in universe)
+    }
+
+
+def decode_bybit_quotes(
+    body: bytes,
+    universe: Container[str] | None = None,
+) -> Dict[str, Dict[str, float]]:
+    if msgspec is not None:
+        result = _dec_bybit_tickers.decode(body).result
+        rows = result.list if result else []
+        return {
+            r.symbol: _quote(r.bid1Price, r.ask1Price, r.bid1Size, r.ask1Size)
+            for r in rows
+            if r.symbol and r.bid1Price and r.ask1Price
+            and (universe is None or r.symbol in universe)
+        }
+
+    rows = (_loads(body).get("result") or {}).get("list") or []
+    return {
+        it["symbol"]: _quote(it["bid1Price"], it["ask1Price"], it.get("bid1Size"), it.get("ask1Size"))
+        for it in rows
+        if it.get("symbol") and it.get("bid1Price") and it.get("ask1Price")
+        and (universe is None or it["symbol"] in universe)
+    }
+
+
+def decode_okx_quotes(
+    body: bytes,
+    universe: Container[str] | None = None,
+) -> Dict[str, Dict[str, float]]:
+    if msgspec is not None:
+        return {
+            r.instId: _quote(r.bidPx, r.askPx, r.bidSz, r.askSz)
+            for r in _dec_okx_tickers.decode(body).data
+            if r.instId and r.bidPx and r.askPx
+            and (universe is None or r.instId in universe)
+        }
+
+    return {
+        it["instId"]: _quote(it["bidPx"], it["askPx"], it.get("bidSz"), it.get("askSz"))
+        for it in _loads(body).get("data") or []
+        if it.get("instId") and it.get("bidPx") and it.get("askPx")
+        and (universe is None or it["instId"] in universe)
+    }
+
+
+def decode_gate_quotes(
+    body: bytes,
+    universe: Container[str] | None = None,
+) -> Dict[str, Dict[str, float]]:
+    if msgspec is not None:
+        return {
+            r.currency_pair: _quote(r.highest_bid, r.lowest_ask, r.highest_size, r.lowest_size)
+            for r in _dec_gate_tickers.decode(body)
+            if r.currency_pair and r.highest_bid and r.lowest_ask
+            and (universe is None or r.currency_pair in universe)
+        }
+
+    return {
+        it["currency_pair"]: _quote(
+            it["highest_bid"], it["lowest_ask"], it.get("highest_size"), it.get("lowest_size"),
+        )
+        for it in _loads(body)
+        if it.get("currency_pair") and it.get("highest_bid") and it.get("lowest_ask")
+        and (universe is None or it["currency_pair"] in universe)
+    }
+
+
+def decode_kucoin_quotes(
+    body: bytes,
+    universe: Container[str] | None = None,
+) -> Dict[str, Dict[str, float]]:
+    if msgspec is not None:
+        data = _dec_kucoin_tickers.decode(body).data
+        rows = data.ticker if data else []
+        return {
+            r.symbol: _quote(r.buy, r.sell, r.bestBidSize, r.bestAskSize)
+            for r in rows
+            if r.symbol and r.buy is not None and r.sell is not None
+            and (universe is None or r.symbol in universe)
+        }
+
+    rows = (_loads(body).get("data") or {}).get("ticker") or []
+    return {
+        it["symbol"]: _quote(it["buy"], it["sell"], it.get("bestBidSize"), it.get("bestAskSize"))
+        for it in rows
+        if it.get("symbol") and it.get("buy") is not None and it.get("sell") is not None
+        and (universe is None or it["symbol"] in universe)
+    }
+
+
+QUOTE_DECODERS = {
+    "binance": decode_binance_quotes,
+    "bybit":   decode_bybit_quotes,
+    "okx":     decode_okx_quotes,
+    "gate":    decode_gate_quotes,
+    "kucoin":  decode_kucoin_quotes,
+}
+
+
+# =========================================================================
+# tickers → сырые строки (list[dict]) — как fetch_*_raw без декодера
+# =========================================================================
+
+def _rows(data) -> list:
+    return data if isinstance(data, list) else []
+
+
+def decode_bybit_tickers(body: bytes) -> list:
+    return _rows((_loads(body).get("result") or {}).get("list"))
+
+
+def decode_okx_tickers(body: bytes) -> list:
+    return _rows(_loads(body).get("data"))
+
+
+def decode_gate_tickers(body: bytes) -> list:
+    return _rows(_loads(body))
+
+
+def decode_kucoin_tickers(body: bytes) -> list:
+    return _rows((_loads(body).get("data") or {}).get("ticker"))
+
+
+# Binance нет: bookTicker без объёмов, объёмы — отдельный /ticker/24hr
+TICKER_DECODERS = {
+    "bybit":   decode_bybit_tickers,
+    "okx":     decode_okx_tickers,
+    "gate":    decode_gate_tickers,
+    "kucoin":  decode_kucoin_tickers,
+}
+
+
+# =========================================================================
+# orderbooks → (bids, asks) как [[price, qty], ...] float
+# =========================================================================
+
+def _levels(rows) -> list:
+    return [[float(r[0]), float(r[1])] for r in rows]
+
+
+def decode_binance_orderbook(body: bytes) -> tuple[list, list]:
+    if msgspec is not None:
+        ob = _dec_plain_book.decode(body)
+        return _levels(ob.bids), _levels(ob.asks)
+
+    ob = _loads(body) or {}
+    return _levels(ob.get("bids") or []), _levels(ob.get("asks") or [])
+
+
+def decode_bybit_orderbook(body: bytes) -> tuple[list, list]:
+    if msgspec is not None:
+        ob = _dec_bybit_book.decode(body).result
+        return (_levels(ob.b), _levels(ob.a)) if ob else ([], [])
+
+    ob = _loads(body).get("result") or {}
+    return _levels(ob.get("b") or []), _levels(ob.get("a") or [])
+
+
+def decode_okx_orderbook(body: bytes) -> tuple[list, list]:
+    if msgspec is not None:
+        data = _dec_okx_book.decode(body).data
+        return (_levels(data[0].bids), _levels(data[0].asks)) if data else ([], [])
+
+    data = _loads(body).get("data") or []
+    ob = data[0] if data else {}
+    return _levels(ob.get("bids") or []), _levels(ob.get("asks") or [])
+
+
+def decode_kucoin_orderbook(body: bytes) -> tuple[list, list]:
+    if msgspec is not None:
+        ob = _dec_kucoin_book.decode(body).data
+        return (_levels(ob.bids), _levels(ob.asks)) if ob else ([], [])
+
+    ob = _loads(body).get("data") or {}
+    return _levels(ob.get("bids") or []), _levels(ob.get("asks") or [])
+
+
+ORDERBOOK_DECODERS = {
+    "binance": decode_binance_orderbook,
+    "bybit":   decode_bybit_orderbook,
+    "okx":     decode_okx_orderbook,
+    "gate":    decode_binance_orderbook,      # та же схема bids / asks
+    "kucoin":  decode_kucoin_orderbook,
+}
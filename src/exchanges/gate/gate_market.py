@@ -1,5 +1,5 @@
 import asyncio
-import httpx
+from typing import Any, Callable
 
 from src.config import (
     GATE_BASE_REST_URL,
@@ -7,23 +7,37 @@ from src.config import (
     GATE_ORDERBOOK_ENDPOINT,
     MAX_BOOK_DEPTH_LEVELS,
 )
+from src.exchanges.rate_limit import (
+    limited_request,
+    PRIORITY_STAGE1,
+    PRIORITY_STAGE2,
+)
 
 
 # ----------------------------------------------------------------------
 # Tickers (bid/ask + 24h stats)
 # ----------------------------------------------------------------------
 
-async def fetch_tickers_raw() -> list:
+async def fetch_tickers_raw(
+    priority: int = PRIORITY_STAGE1,
+    decoder: Callable[[bytes], Any] | None = None,
+) -> list:
     """
     Возвращает сырые Gate.io spot tickers.
     Данные включают best bid / best ask + 24h статистику.
+    decoder — быстрый декодер тела ответа (src/exchanges/decoders.py).
     """
     url = f"{GATE_BASE_REST_URL}{GATE_TICKERS_ENDPOINT}"
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url)
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await limited_request(
+        "gate", GATE_TICKERS_ENDPOINT, url, priority=priority,
+    )
+    resp.raise_for_status()
+
+    if decoder is not None:
+        return decoder(resp.content)
+
+    data = resp.json()
 
     return data if isinstance(data, list) else []
 
@@ -32,11 +46,19 @@ async def fetch_tickers_raw() -> list:
 # Orderbook / depth
 # ----------------------------------------------------------------------
 
-async def fetch_orderbook_raw(currency_pair: str, limit: int | None = None) -> dict:
+async def fetch_orderbook_raw(
+    currency_pair: str,
+    limit: int | None = None,
+    with_id: bool = False,
+    priority: int = PRIORITY_STAGE2,
+    decoder: Callable[[bytes], Any] | None = None,
+) -> dict:
     """
     Возвращает стакан Gate.io (bids / asks) для пары.
     currency_pair — формат вида 'BTC_USDT'
     limit — глубина стакана, по умолчанию берём из конфига.
+    with_id — вернуть id снимка (нужен для склейки с WS-диффами).
+    decoder — быстрый декодер тела ответа (src/exchanges/decoders.py).
     """
     if limit is None:
         limit = MAX_BOOK_DEPTH_LEVELS
@@ -47,11 +69,18 @@ async def fetch_orderbook_raw(currency_pair: str, limit: int | None = None) -> d
         "currency_pair": currency_pair,
         "limit": limit,
     }
+    if with_id:
+        params["with_id"] = "true"
+
+    resp = await limited_request(
+        "gate", GATE_ORDERBOOK_ENDPOINT, url, params=params, priority=priority,
+    )
+    resp.raise_for_status()
+
+    if decoder is not None:
+        return decoder(resp.content)
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        data = resp.json()
+    data = resp.json()
 
     return data or {}
 
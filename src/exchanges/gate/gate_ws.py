@@ -0,0 +1,116 @@
+"""
+Gate.io WebSocket — канал spot.book_ticker (best bid / ask + размеры).
+"""
+
+import time
+
+from src.config import GATE_BASE_WS_URL
+
+
+SUBSCRIBE_CHUNK = 100
+SUBSCRIBE_DELAY_S = 0.0
+
+PING_INTERVAL_S = 20.0
+
+
+async def ws_url() -> str:
+    return GATE_BASE_WS_URL
+
+
+def ping_message():
+    return {"time": int(time.time()), "channel": "spot.ping"}
+
+
+# ----------------------------------------------------------------------
+# spot.book_ticker
+# ----------------------------------------------------------------------
+
+def build_ticker_subscribe(symbols: list[str], unsubscribe: bool = False) -> list:
+    event = "unsubscribe" if unsubscribe else "subscribe"
+
+    return [
+        {
+            "time": int(time.time()),
+            "channel": "spot.book_ticker",
+            "event": event,
+            "payload": symbols[i:i + SUBSCRIBE_CHUNK],
+        }
+        for i in range(0, len(symbols), SUBSCRIBE_CHUNK)
+    ]
+
+
+def parse_ticker_message(msg) -> list:
+    """
+    {"channel":"spot.book_ticker","event":"update",
+     "result":{"s":"BTC_USDT","b":"..","B":"..","a":"..","A":".."}}
+    """
+    if not isinstance(msg, dict):
+        return []
+
+    if msg.get("channel") != "spot.book_ticker" or msg.get("event") != "update":
+        return []
+
+    r = msg.get("result") or {}
+    if not r.get("b") or not r.get("a"):
+        return []
+
+    return [(
+        r["s"],
+        float(r["b"]),
+        float(r["a"]),
+        float(r.get("B", 0) or 0),
+        float(r.get("A", 0) or 0),
+    )]
+
+
+# ----------------------------------------------------------------------
+# spot.order_book_update — локальный L2 стакан
+# ----------------------------------------------------------------------
+
+# Стакан засевается REST-снимком /spot/order_book?with_id=true (id)
+DEPTH_WS_SNAPSHOTS = False
+
+
+def build_depth_subscribe(symbols: list[str], unsubscribe: bool = False) -> list:
+    """
+    Gate: одна пара на сообщение — payload [pair, interval].
+    """
+    event = "unsubscribe" if unsubscribe else "subscribe"
+
+    return [
+        {
+            "time": int(time.time()),
+            "channel": "spot.order_book_update",
+            "event": event,
+            "payload": [s, "100ms"],
+        }
+        for s in symbols
+    ]
+
+
+def parse_depth_message(msg) -> list:
+    """
+    {"channel":"spot.order_book_update","event":"update",
+     "result":{"s":"BTC_USDT","U":48776301,"u":48776306,"b":[..],"a":[..]}}
+    """
+    if not isinstance(msg, dict):
+        return []
+
+    if msg.get("channel") != "spot.order_book_update" or msg.get("event") != "update":
+        return []
+
+    r = msg.get("result") or {}
+
+    return [{
+        "symbol": r["s"],
+        "snapshot": False,
+        "bids": r.get("b") or [],
+        "asks": r.get("a") or [],
+        "first_id": int(r["U"]),
+        "last_id": int(r["u"]),
+    }]
+
+
+def rest_snapshot_id(ob: dict) -> int | None:
+    v = ob.get("id")
+    return int(v) if v is not None else None
@@ -0,0 +1,182 @@
+"""
+http_session — реестр долгоживущих HTTP-сессий бирж
+
+• один keep-alive httpx.AsyncClient на биржу
+• DNS / TCP / TLS — один раз, дальше соединения переиспользуются
+• опционально HTTP/2 (только если установлен пакет h2)
+• лимиты пула и таймауты берутся из src/config.py
+• прогрев соединений при старте процесса (warmup_sessions)
+
+Клиент httpx привязан к event loop, в котором создан.
+Если вызывающий код работает уже в другом loop — клиент пересоздаётся,
+старый закрывается (в своём loop, если он ещё жив, иначе — в текущем).
+"""
+
+import asyncio
+import importlib.util
+from typing import Dict, Tuple
+
+import httpx
+
+from src.config import (
+    HTTP_POOL_MAX_CONNECTIONS,
+    HTTP_POOL_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY_S,
+    HTTP_CONNECT_TIMEOUT_S,
+    HTTP_TIMEOUT_S,
+    HTTP2_ENABLED,
+    BINANCE_BASE_REST_URL,
+    BINANCE_PING_ENDPOINT,
+    BYBIT_BASE_REST_URL,
+    BYBIT_PING_ENDPOINT,
+    OKX_BASE_REST_URL,
+    OKX_PING_ENDPOINT,
+    GATE_BASE_REST_URL,
+    GATE_PING_ENDPOINT,
+    KUCOIN_BASE_REST_URL,
+    KUCOIN_PING_ENDPOINT,
+)
+
+
+# ----------------------------------------------------------------------
+# Прогрев: лёгкие эндпоинты по биржам
+# ----------------------------------------------------------------------
+
+WARMUP_URLS = {
+    "binance": f"{BINANCE_BASE_REST_URL}{BINANCE_PING_ENDPOINT}",
+    "bybit":   f"{BYBIT_BASE_REST_URL}{BYBIT_PING_ENDPOINT}",
+    "okx":     f"{OKX_BASE_REST_URL}{OKX_PING_ENDPOINT}",
+    "gate":    f"{GATE_BASE_REST_URL}{GATE_PING_ENDPOINT}",
+    "kucoin":  f"{KUCOIN_BASE_REST_URL}{KUCOIN_PING_ENDPOINT}",
+}
+
+
+# exchange → (loop, client)
+_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+# задачи закрытия заменённых клиентов (ссылка — чтобы задачу не собрал GC)
+_closing: set = set()
+
+
+def _http2_available() -> bool:
+    return HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def _new_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_S,
+    )
+    timeout = httpx.Timeout(HTTP_TIMEOUT_S, connect=HTTP_CONNECT_TIMEOUT_S)
+
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=timeout,
+        http2=_http2_available(),
+    )
+
+
+async def _aclose_quietly(client: httpx.AsyncClient):
+    try:
+        await client.aclose()
+    except Exception:
+        # соединения мёртвого loop закрыть чисто нельзя — только отпустить
+        pass
+
+
+def _retire(client_loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+    """
+    Закрывает заменённый клиент, не блокируя текущий loop.
+    """
+    if client.is_closed:
+        return
+
+    if client_loop.is_running() and not client_loop.is_closed():
+        # loop жив (другой поток) — закрываем там, где живут соединения
+        asyncio.run_coroutine_threadsafe(_aclose_quietly(client), client_loop)
+        return
+
+    task = asyncio.get_running_loop().create_task(_aclose_quietly(client))
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+# ----------------------------------------------------------------------
+# Public API
+# ----------------------------------------------------------------------
+
+def get_client(exchange: str) -> httpx.AsyncClient:
+    """
+    Возвращает общий keep-alive клиент биржи.
+    Вызывать только из корутины (нужен работающий event loop).
+    """
+    loop = asyncio.get_running_loop()
+
+    entry = _clients.get(exchange)
+    if entry:
+        client_loop, client = entry
+        if client_loop is loop and not client.is_closed:
+            return client
+        _retire(client_loop, client)
+
+    client = _new_client()
+    _clients[exchange] = (loop, client)
+    return client
+
+
+async def warmup_sessions(exchanges: list[str] | None = None) -> Dict[str, bool]:
+    """
+    Открывает соединения заранее (DNS + TCP + TLS) лёгким GET-запросом.
+    Ошибки прогрева не фатальны — возвращаем статус по каждой бирже.
+    """
+    names = exchanges or list(WARMUP_URLS)
+
+    async def _one(name: str) -> bool:
+        url = WARMUP_URLS.get(name)
+        if not url:
+            return False
+        try:
+            resp = await get_client(name).get(url)
+            return resp.status_code < 500
+        except Exception:
+            return False
+
+    statuses = await asyncio.gather(*(_one(n) for n in names))
+    return dict(zip(names, statuses))
+
+
+async def close_sessions():
+    """
+    Закрывает все клиенты текущего event loop.
+    """
+    loop = asyncio.get_running_loop()
+
+    for name, (client_loop, client) in list(_clients.items()):
+        if client_loop is loop:
+            await client.aclose()
+        _clients.pop(name, None)
+
+
+# ----------------------------------------------------------------------
+# Demo
+# ----------------------------------------------------------------------
+
+async def _demo():
+    import time
+
+    t0 = time.perf_counter()
+    statuses = await warmup_sessions()
+    t1 = time.perf_counter()
+    print(f"[demo] warmup: {statuses} ({(t1 - t0) * 1000:.1f} ms)")
+
+    t0 = time.perf_counter()
+    await warmup_sessions()
+    t1 = time.perf_counter()
+    print(f"[demo] second round (warm): {(t1 - t0) * 1000:.1f} ms")
+
+    await close_sessions()
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
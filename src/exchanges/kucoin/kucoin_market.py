@@ -1,29 +1,44 @@
 import asyncio
-import httpx
+from typing import Any, Callable
 
 from src.config import (
     KUCOIN_BASE_REST_URL,
     KUCOIN_TICKERS_ENDPOINT,
     KUCOIN_ORDERBOOK_ENDPOINT,
+    KUCOIN_ORDERBOOK_100_ENDPOINT,
     MAX_BOOK_DEPTH_LEVELS,
 )
+from src.exchanges.rate_limit import (
+    limited_request,
+    PRIORITY_STAGE1,
+    PRIORITY_STAGE2,
+)
 
 
 # ----------------------------------------------------------------------
 # Tickers (best bid / best ask + 24h stats)
 # ----------------------------------------------------------------------
 
-async def fetch_tickers_raw() -> list:
+async def fetch_tickers_raw(
+    priority: int = PRIORITY_STAGE1,
+    decoder: Callable[[bytes], Any] | None = None,
+) -> list:
     """
     Возвращает сырые KuCoin tickers.
     Источник best bid/ask + 24h статистики.
+    decoder — быстрый декодер тела ответа (src/exchanges/decoders.py).
     """
     url = f"{KUCOIN_BASE_REST_URL}{KUCOIN_TICKERS_ENDPOINT}"
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url)
-        resp.raise_for_status()
-        payload = resp.json()
+    resp = await limited_request(
+        "kucoin", KUCOIN_TICKERS_ENDPOINT, url, priority=priority,
+    )
+    resp.raise_for_status()
+
+    if decoder is not None:
+        return decoder(resp.content)
+
+    payload = resp.json()
 
     data = payload.get("data", {}).get("ticker", [])
     return data if isinstance(data, list) else []
@@ -33,25 +48,40 @@ async def fetch_tickers_raw() -> list:
 # Orderbook / depth
 # ----------------------------------------------------------------------
 
-async def fetch_orderbook_raw(symbol: str, limit: int | None = None) -> dict:
+async def fetch_orderbook_raw(
+    symbol: str,
+    limit: int | None = None,
+    priority: int = PRIORITY_STAGE2,
+    decoder: Callable[[bytes], Any] | None = None,
+) -> dict:
     """
     Возвращает стакан KuCoin (bids / asks) для символа.
     symbol — формат вида 'BTC-USDT'
     limit — глубина стакана, по умолчанию из конфига.
+
+    KuCoin отдаёт фиксированные срезы: level2_20 / level2_100,
+    limit > 20 переключает на level2_100.
+    decoder — быстрый декодер тела ответа (src/exchanges/decoders.py).
     """
     if limit is None:
         limit = MAX_BOOK_DEPTH_LEVELS
 
-    url = f"{KUCOIN_BASE_REST_URL}{KUCOIN_ORDERBOOK_ENDPOINT}"
+    endpoint = KUCOIN_ORDERBOOK_ENDPOINT if limit <= 20 else KUCOIN_ORDERBOOK_100_ENDPOINT
+    url = f"{KUCOIN_BASE_REST_URL}{endpoint}"
 
     params = {
         "symbol": symbol,
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        payload = resp.json()
+    resp = await limited_request(
+        "kucoin", endpoint, url, params=params, priority=priority,
+    )
+    resp.raise_for_status()
+
+    if decoder is not None:
+        return decoder(resp.content)
+
+    payload = resp.json()
 
     data = payload.get("data", {})
     return data
@@ -0,0 +1,148 @@
+"""
+KuCoin WebSocket — топик /market/ticker (best bid / ask + размеры).
+
+Адрес соединения выдаёт REST /api/v1/bullet-public (endpoint + token),
+KUCOIN_BASE_WS_URL используется только как запасной вариант.
+"""
+
+import time
+import uuid
+
+from src.config import (
+    KUCOIN_BASE_REST_URL,
+    KUCOIN_BASE_WS_URL,
+    KUCOIN_BULLET_PUBLIC_ENDPOINT,
+)
+from src.exchanges.rate_limit import limited_request
+
+
+# KuCoin: до 100 символов в одном топике
+SUBSCRIBE_CHUNK = 100
+SUBSCRIBE_DELAY_S = 0.0
+
+PING_INTERVAL_S = 18.0
+
+
+async def ws_url() -> str:
+    """
+    Получает публичный токен и адрес instance-сервера.
+    """
+    url = f"{KUCOIN_BASE_REST_URL}{KUCOIN_BULLET_PUBLIC_ENDPOINT}"
+
+    resp = await limited_request(
+        "kucoin", KUCOIN_BULLET_PUBLIC_ENDPOINT, url, method="POST",
+    )
+    resp.raise_for_status()
+    data = resp.json().get("data", {})
+
+    token = data.get("token")
+    servers = data.get("instanceServers") or []
+    endpoint = servers[0]["endpoint"] if servers else KUCOIN_BASE_WS_URL
+
+    return f"{endpoint}?token={token}&connectId={uuid.uuid4().hex}"
+
+
+def ping_message():
+    return {"id": str(int(time.time() * 1000)), "type": "ping"}
+
+
+# ----------------------------------------------------------------------
+# /market/ticker
+# ----------------------------------------------------------------------
+
+def build_ticker_subscribe(symbols: list[str], unsubscribe: bool = False) -> list:
+    kind = "unsubscribe" if unsubscribe else "subscribe"
+
+    return [
+        {
+            "id": str(i // SUBSCRIBE_CHUNK + 1),
+            "type": kind,
+            "topic": "/market/ticker:" + ",".join(symbols[i:i + SUBSCRIBE_CHUNK]),
+            "response": True,
+        }
+        for i in range(0, len(symbols), SUBSCRIBE_CHUNK)
+    ]
+
+
+def parse_ticker_message(msg) -> list:
+    """
+    {"type":"message","topic":"/market/ticker:BTC-USDT","subject":"trade.ticker",
+     "data":{"bestBid":"..","bestBidSize":"..","bestAsk":"..","bestAskSize":".."}}
+    """
+    if not isinstance(msg, dict) or msg.get("type") != "message":
+        return []
+
+    topic = msg.get("topic") or ""
+    if not topic.startswith("/market/ticker:"):
+        return []
+
+    d = msg.get("data") or {}
+    bid = d.get("bestBid")
+    ask = d.get("bestAsk")
+    if bid is None or ask is None:
+        return []
+
+    return [(
+        topic.split(":", 1)[1],
+        float(bid),
+        float(ask),
+        float(d.get("bestBidSize", 0) or 0),
+        float(d.get("bestAskSize", 0) or 0),
+    )]
+
+
+# ----------------------------------------------------------------------
+# /market/level2 — локальный L2 стакан
+# ----------------------------------------------------------------------
+
+# Стакан засевается REST-снимком level2_100 (sequence)
+DEPTH_WS_SNAPSHOTS = False
+
+
+def build_depth_subscribe(symbols: list[str], unsubscribe: bool = False) -> list:
+    kind = "unsubscribe" if unsubscribe else "subscribe"
+
+    return [
+        {
+            "id": str(i // SUBSCRIBE_CHUNK + 1),
+            "type": kind,
+            "topic": "/market/level2:" + ",".join(symbols[i:i + SUBSCRIBE_CHUNK]),
+            "response": True,
+        }
+        for i in range(0, len(symbols), SUBSCRIBE_CHUNK)
+    ]
+
+
+def parse_depth_message(msg) -> list:
+    """
+    {"type":"message","topic":"/market/level2:BTC-USDT","subject":"trade.l2update",
+     "data":{"changes":{"asks":[["p","sz","seq"]],"bids":[..]},
+             "sequenceStart":..,"sequenceEnd":..,"symbol":"BTC-USDT"}}
+
+    Цена "0" — служебное сообщение без изменения стакана.
+    Уровни — [price, size, seq]: у каждого изменения своя последовательность
+    (level_ids), сообщение может накрывать sequence REST-снимка.
+    """
+    if not isinstance(msg, dict) or msg.get("type") != "message":
+        return []
+
+    if msg.get("subject") != "trade.l2update":
+        return []
+
+    d = msg.get("data") or {}
+    changes = d.get("changes") or {}
+
+    return [{
+        "symbol": d.get("symbol") or (msg.get("topic") or "").split(":", 1)[-1],
+        "snapshot": False,
+        "bids": [[p, sz, int(seq)] for p, sz, seq in changes.get("bids") or [] if p != "0"],
+        "asks": [[p, sz, int(seq)] for p, sz, seq in changes.get("asks") or [] if p != "0"],
+        "first_id": int(d["sequenceStart"]),
+        "last_id": int(d["sequenceEnd"]),
+        "level_ids": True,
+    }]
+
+
+def rest_snapshot_id(ob: dict) -> int | None:
+    v = ob.get("sequence")
+    return int(v) if v is not None else None
@@ -1,5 +1,5 @@
 import asyncio
-import httpx
+from typing import Any, Callable
 
 from src.config import (
     OKX_BASE_REST_URL,
@@ -7,25 +7,39 @@ from src.config import (
     OKX_ORDERBOOK_ENDPOINT,
     MAX_BOOK_DEPTH_LEVELS,
 )
+from src.exchanges.rate_limit import (
+    limited_request,
+    PRIORITY_STAGE1,
+    PRIORITY_STAGE2,
+)
 
 
 # ----------------------------------------------------------------------
 # Tickers (best bid / best ask + 24h stats)
 # ----------------------------------------------------------------------
 
-async def fetch_tickers_raw() -> list:
+async def fetch_tickers_raw(
+    priority: int = PRIORITY_STAGE1,
+    decoder: Callable[[bytes], Any] | None = None,
+) -> list:
     """
     Возвращает сырые OKX spot tickers.
     Аналог Binance bookTicker + 24h данные.
+    decoder — быстрый декодер тела ответа (src/exchanges/decoders.py).
     """
     url = f"{OKX_BASE_REST_URL}{OKX_TICKERS_ENDPOINT}"
 
     params = {"instType": "SPOT"}
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        payload = resp.json()
+    resp = await limited_request(
+        "okx", OKX_TICKERS_ENDPOINT, url, params=params, priority=priority,
+    )
+    resp.raise_for_status()
+
+    if decoder is not None:
+        return decoder(resp.content)
+
+    payload = resp.json()
 
     data = payload.get("data", [])
     return data if isinstance(data, list) else []
@@ -35,11 +49,17 @@ async def fetch_tickers_raw() -> list:
 # Orderbook / depth
 # ----------------------------------------------------------------------
 
-async def fetch_orderbook_raw(inst_id: str, limit: int | None = None) -> dict:
+async def fetch_orderbook_raw(
+    inst_id: str,
+    limit: int | None = None,
+    priority: int = PRIORITY_STAGE2,
+    decoder: Callable[[bytes], Any] | None = None,
+) -> dict:
     """
     Возвращает стакан OKX (bids / asks) для инструмента.
     inst_id — формат вида 'BTC-USDT'
     limit — глубина стакана, по умолчанию из конфига.
+    decoder — быстрый декодер тела ответа (src/exchanges/decoders.py).
     """
     if limit is None:
         limit = MAX_BOOK_DEPTH_LEVELS
@@ -51,10 +71,15 @@ async def fetch_orderbook_raw(inst_id: str, limit: int | None = None) -> dict:
         "sz": limit,
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        payload = resp.json()
+    resp = await limited_request(
+        "okx", OKX_ORDERBOOK_ENDPOINT, url, params=params, priority=priority,
+    )
+    resp.raise_for_status()
+
+    if decoder is not None:
+        return decoder(resp.content)
+
+    payload = resp.json()
 
     data = payload.get("data", [])
     return data[0] if data else {}
@@ -0,0 +1,125 @@
+"""
+OKX WebSocket — канал tickers (best bid / ask + размеры).
+"""
+
+from src.config import OKX_BASE_WS_URL
+
+
+SUBSCRIBE_CHUNK = 100
+SUBSCRIBE_DELAY_S = 0.0
+
+# OKX закрывает соединение после 30 секунд тишины — шлём текстовый "ping"
+PING_INTERVAL_S = 20.0
+
+
+async def ws_url() -> str:
+    return OKX_BASE_WS_URL
+
+
+def ping_message():
+    return "ping"
+
+
+# ----------------------------------------------------------------------
+# tickers
+# ----------------------------------------------------------------------
+
+def build_ticker_subscribe(symbols: list[str], unsubscribe: bool = False) -> list:
+    op = "unsubscribe" if unsubscribe else "subscribe"
+
+    return [
+        {
+            "op": op,
+            "args": [
+                {"channel": "tickers", "instId": s}
+                for s in symbols[i:i + SUBSCRIBE_CHUNK]
+            ],
+        }
+        for i in range(0, len(symbols), SUBSCRIBE_CHUNK)
+    ]
+
+
+def parse_ticker_message(msg) -> list:
+    """
+    {"arg":{"channel":"tickers","instId":"BTC-USDT"},
+     "data":[{"instId":"BTC-USDT","bidPx":"..","bidSz":"..","askPx":"..","askSz":".."}]}
+    """
+    if not isinstance(msg, dict):
+        return []
+
+    if (msg.get("arg") or {}).get("channel") != "tickers":
+        return []
+
+    out = []
+    for it in msg.get("data") or []:
+        bid = it.get("bidPx")
+        ask = it.get("askPx")
+        if not bid or not ask:
+            continue
+
+        out.append((
+            it["instId"],
+            float(bid),
+            float(ask),
+            float(it.get("bidSz", 0) or 0),
+            float(it.get("askSz", 0) or 0),
+        ))
+
+    return out
+
+
+# ----------------------------------------------------------------------
+# books — локальный L2 стакан (snapshot + update, checksum)
+# ----------------------------------------------------------------------
+
+# OKX сам присылает snapshot при подписке; целостность — по checksum
+DEPTH_WS_SNAPSHOTS = True
+CHECKSUM_LEVELS = 25
+
+
+def build_depth_subscribe(symbols: list[str], unsubscribe: bool = False) -> list:
+    op = "unsubscribe" if unsubscribe else "subscribe"
+
+    return [
+        {
+            "op": op,
+            "args": [
+                {"channel": "books", "instId": s}
+                for s in symbols[i:i + SUBSCRIBE_CHUNK]
+            ],
+        }
+        for i in range(0, len(symbols), SUBSCRIBE_CHUNK)
+    ]
+
+
+def parse_depth_message(msg) -> list:
+    """
+    {"arg":{"channel":"books","instId":"BTC-USDT"},"action":"snapshot"|"update",
+     "data":[{"bids":[["p","sz","0","n"]],"asks":[..],"checksum":-855196043,
+              "seqId":123,"prevSeqId":122}]}
+    """
+    if not isinstance(msg, dict):
+        return []
+
+    arg = msg.get("arg") or {}
+    if arg.get("channel") != "books":
+        return []
+
+    snapshot = msg.get("action") == "snapshot"
+    out = []
+
+    for it in msg.get("data") or []:
+        seq = int(it.get("seqId", 0))
+        prev = int(it.get("prevSeqId", -1))
+        out.append({
+            "symbol": arg["instId"],
+            "snapshot": snapshot,
+            "bids": [lvl[:2] for lvl in it.get("bids") or []],
+            "asks": [lvl[:2] for lvl in it.get("asks") or []],
+            "first_id": seq,
+            "last_id": seq,
+            "prev_id": None if snapshot else prev,
+            "checksum": it.get("checksum"),
+        })
+
+    return out
@@ -0,0 +1,126 @@
+"""
+orderbook_cache — REST-стаканы Stage-2 с TTL и single-flight
+
+Stage-2 внутри батча уже не дублирует запросы (exchange, symbol), но соседние
+батчи и параллельные вызовы снова грузят одни и те же горячие стаканы.
+Здесь:
+
+• ключ — (exchange, native symbol), TTL — по бирже (STAGE2_ORDERBOOK_TTL_S)
+• глубина: запись отдаётся, если её хватает на запрошенный depth
+  (стакан короче запрошенного при загрузке — полный, подходит любому depth)
+• одновременные промахи по одному ключу ждут один и тот же запрос
+• память ограничена: не более STAGE2_ORDERBOOK_CACHE_SIZE стаканов (LRU)
+• пустой ответ (ошибка загрузки) не кэшируется — следующий вызов повторит
+• каждый отданный стакан идёт с возрастом в секундах (маркер свежести)
+• hits / misses / coalesced — счётчики для метрик
+
+Кэш привязан к одному event loop (как http_session и ticker_cache).
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, Any, Awaitable, Callable, Tuple
+
+from src.config import STAGE2_ORDERBOOK_TTL_S, STAGE2_ORDERBOOK_CACHE_SIZE
+
+
+Book = Tuple[list, list]                         # (bids, asks)
+Fetcher = Callable[[str, str, int], Awaitable[Book]]
+
+_FULL = float("inf")    # глубина стакана, который короче запрошенного
+
+
+class OrderbookCache:
+
+    def __init__(
+        self,
+        ttl_s: Dict[str, float] = STAGE2_ORDERBOOK_TTL_S,
+        max_entries: int = STAGE2_ORDERBOOK_CACHE_SIZE,
+        default_ttl_s: float = 1.0,
+    ):
+        self.ttl_s = dict(ttl_s)
+        self.default_ttl_s = default_ttl_s
+        self.max_entries = max_entries
+
+        # (exchange, symbol) → (время получения, (bids, asks), глубина); порядок — LRU
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Book, float]] = OrderedDict()
+        # (exchange, symbol, depth) → запрос
+        self._inflight: Dict[tuple[str, str, int], asyncio.Task] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0          # промах, дождавшийся чужого запроса
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _ttl(self, exchange: str) -> float:
+        return self.ttl_s.get(exchange, self.default_ttl_s)
+
+    async def get(
+        self,
+        exchange: str,
+        symbol: str,
+        fetch: Fetcher,
+        depth: int,
+    ) -> tuple[Book, float]:
+        """
+        ((bids, asks), возраст в секундах) глубиной не меньше depth.
+        fetch(exchange, symbol, depth) → (bids, asks).
+        """
+        key = (exchange, symbol)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] >= depth:
+            age = time.time() - entry[0]
+            if age <= self._ttl(exchange):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], age
+
+        flight = (exchange, symbol, depth)
+        task = self._inflight.get(flight)
+        loop = asyncio.get_running_loop()
+        if task is None or task.done() or task.get_loop() is not loop:
+            self.misses += 1
+            task = loop.create_task(self._fetch(key, fetch, depth))
+            task.add_done_callback(partial(self._on_done, flight))
+            self._inflight[flight] = task
+        else:
+            self.coalesced += 1
+
+        # отмена одного ожидающего не обрывает общий запрос
+        ts, book = await asyncio.shield(task)
+        return book, time.time() - ts
+
+    async def _fetch(self, key: tuple[str, str], fetch: Fetcher, depth: int) -> tuple[float, Book]:
+        book = await fetch(*key, depth)
+        ts = time.time()
+
+        bids, asks = book
+        if bids and asks:
+            full = len(bids) < depth and len(asks) < depth
+            self._entries[key] = (ts, book, _FULL if full else depth)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return ts, book
+
+    def _on_done(self, key: tuple[str, str, int], task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,345 @@
+"""
+rate_limit — планировщик запросов с учётом лимитов бирж
+
+• token bucket на каждый лимит биржи (IP / эндпоинт / пул) — EXCHANGE_RATE_LIMITS
+• вес каждого эндпоинта (Binance depth зависит от limit)
+• приоритеты: Stage-2 проверки > Stage-1 тикеры > фоновые обновления
+• живая синхронизация по заголовкам ответа (X-MBX-USED-WEIGHT-1M и аналоги)
+• 429 / 418 + Retry-After → бакет блокируется до указанного времени
+• remaining_budget() — остаток бюджета по биржам (метрика этого процесса)
+• лимитеры живут в процессе: set_process_share() отдаёт процессу его долю
+  биржевого лимита (RATE_LIMIT_PROCESS_SHARES), иначе воркеры вместе
+  превысят лимит биржи
+
+Все REST-запросы бирж идут через limited_request().
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, Any
+
+import httpx
+
+from src.config import (
+    EXCHANGE_RATE_LIMITS,
+    RATE_LIMIT_HEADROOM,
+    BINANCE_BOOK_TICKER_ENDPOINT,
+    BINANCE_TICKERS_ENDPOINT,
+    BINANCE_ORDERBOOK_ENDPOINT,
+    BINANCE_PING_ENDPOINT,
+    BINANCE_FEES_ENDPOINT,
+    BINANCE_COIN_INFO_ENDPOINT,
+    BYBIT_TICKERS_ENDPOINT,
+    BYBIT_ORDERBOOK_ENDPOINT,
+    BYBIT_PING_ENDPOINT,
+    OKX_TICKERS_ENDPOINT,
+    OKX_ORDERBOOK_ENDPOINT,
+    OKX_PING_ENDPOINT,
+    GATE_TICKERS_ENDPOINT,
+    GATE_ORDERBOOK_ENDPOINT,
+    GATE_PING_ENDPOINT,
+    KUCOIN_TICKERS_ENDPOINT,
+    KUCOIN_ORDERBOOK_ENDPOINT,
+    KUCOIN_ORDERBOOK_100_ENDPOINT,
+    KUCOIN_PING_ENDPOINT,
+    KUCOIN_BULLET_PUBLIC_ENDPOINT,
+)
+from src.exchanges.http_session import get_client
+
+
+# ----------------------------------------------------------------------
+# Приоритеты (меньше — раньше)
+# ----------------------------------------------------------------------
+
+PRIORITY_STAGE2 = 0        # стаканы под конкретный сигнал
+PRIORITY_STAGE1 = 1        # периодический ценовой срез
+PRIORITY_BACKGROUND = 2    # Stage-0, комиссии, прогрев
+
+
+# ----------------------------------------------------------------------
+# Вес эндпоинтов: exchange → endpoint → (bucket, weight)
+# ----------------------------------------------------------------------
+
+ENDPOINT_WEIGHTS = {
+    "binance": {
+        BINANCE_BOOK_TICKER_ENDPOINT: ("ip", 4),     # без symbol
+        BINANCE_TICKERS_ENDPOINT:     ("ip", 80),    # без symbol
+        BINANCE_ORDERBOOK_ENDPOINT:   ("ip", 5),     # см. binance_depth_weight()
+        BINANCE_PING_ENDPOINT:        ("ip", 1),
+        BINANCE_FEES_ENDPOINT:        ("sapi", 1),
+        BINANCE_COIN_INFO_ENDPOINT:   ("sapi", 10),
+    },
+    "bybit": {
+        BYBIT_TICKERS_ENDPOINT:   ("ip", 1),
+        BYBIT_ORDERBOOK_ENDPOINT: ("ip", 1),
+        BYBIT_PING_ENDPOINT:      ("ip", 1),
+    },
+    "okx": {
+        OKX_TICKERS_ENDPOINT:   ("tickers", 1),
+        OKX_ORDERBOOK_ENDPOINT: ("books", 1),
+        OKX_PING_ENDPOINT:      ("time", 1),
+    },
+    "gate": {
+        GATE_TICKERS_ENDPOINT:   ("tickers", 1),
+        GATE_ORDERBOOK_ENDPOINT: ("order_book", 1),
+        GATE_PING_ENDPOINT:      ("time", 1),
+    },
+    "kucoin": {
+        KUCOIN_TICKERS_ENDPOINT:         ("public", 15),
+        KUCOIN_ORDERBOOK_ENDPOINT:       ("public", 2),
+        KUCOIN_ORDERBOOK_100_ENDPOINT:   ("public", 4),
+        KUCOIN_PING_ENDPOINT:            ("public", 1),
+        KUCOIN_BULLET_PUBLIC_ENDPOINT:   ("public", 10),
+    },
+}
+
+
+def binance_depth_weight(limit: int) -> int:
+    if limit <= 100:
+        return 5
+    if limit <= 500:
+        return 25
+    if limit <= 1000:
+        return 50
+    return 250
+
+
+# Заголовки с фактическим расходом лимита:
+# exchange → (header, bucket, "used" | "remaining")
+USAGE_HEADERS = {
+    "binance": ("x-mbx-used-weight-1m", "ip", "used"),
+    "bybit":   ("x-bapi-limit-status", "ip", "remaining"),
+    "gate":    ("x-gate-ratelimit-requests-remain", None, "remaining"),
+    "kucoin":  ("gw-ratelimit-remaining", "public", "remaining"),
+}
+
+
+# ----------------------------------------------------------------------
+# token bucket с приоритетной очередью
+# ----------------------------------------------------------------------
+
+_seq = itertools.count()
+
+
+class TokenBucket:
+
+    def __init__(self, capacity: float, refill_per_s: float, share: float = 1.0):
+        self.limit = capacity
+        self.capacity = capacity * RATE_LIMIT_HEADROOM * share
+        self.rate = refill_per_s * RATE_LIMIT_HEADROOM * share
+
+        self.tokens = self.capacity
+        self._ts = time.monotonic()
+        self._blocked_until = 0.0
+
+        # (priority, seq, weight, future)
+        self._waiters: list = []
+        self._timer: asyncio.TimerHandle | None = None
+
+        self.throttled = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        if now < self._blocked_until:
+            self._ts = now
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def _grant(self):
+        self._timer = None
+        self._refill()
+
+        while self._waiters:
+            _, _, weight, fut = self._waiters[0]
+            if fut.done():                    # отменённый запрос
+                heapq.heappop(self._waiters)
+                continue
+            if self.tokens < weight:
+                break
+            heapq.heappop(self._waiters)
+            self.tokens -= weight
+            fut.set_result(None)
+
+        if self._waiters and self._timer is None:
+            weight = self._waiters[0][2]
+            wait = max((weight - self.tokens) / self.rate, 0.0)
+            wait = max(wait, self._blocked_until - time.monotonic(), 0.001)
+            self._timer = asyncio.get_running_loop().call_later(wait, self._grant)
+
+    async def acquire(self, weight: float, priority: int = PRIORITY_BACKGROUND):
+        weight = min(weight, self.capacity)
+        self._refill()
+
+        if not self._waiters and self.tokens >= weight:
+            self.tokens -= weight
+            return
+
+        self.throttled += 1
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(_seq), weight, fut))
+
+        if self._timer is None:
+            self._grant()
+
+        await fut
+
+    # --- синхронизация с биржей ---------------------------------------
+
+    def sync_remaining(self, remaining: float):
+        """
+        Биржа сообщила остаток — локальный бюджет не может быть больше.
+        """
+        self._refill()
+        self.tokens = min(self.tokens, remaining * RATE_LIMIT_HEADROOM)
+
+    def block(self, seconds: float):
+        self.tokens = 0.0
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    @property
+    def remaining(self) -> float:
+        self._refill()
+        return self.tokens
+
+
+class ExchangeRateLimiter:
+
+    def __init__(self, exchange: str, share: float = 1.0):
+        self.exchange = exchange
+        self.share = share
+        self.buckets = {
+            name: TokenBucket(cap, rate, share)
+            for name, (cap, rate) in EXCHANGE_RATE_LIMITS.get(exchange, {}).items()
+        }
+        self.endpoints = ENDPOINT_WEIGHTS.get(exchange, {})
+
+        self.requests = 0
+        self.rejected = 0     # 429 / 418
+
+    def _route(self, endpoint: str, weight: float | None) -> tuple[TokenBucket | None, float]:
+        bucket_name, default_weight = self.endpoints.get(endpoint, (None, 1))
+        if bucket_name is None:
+            bucket_name = next(iter(self.buckets), None)
+
+        bucket = self.buckets.get(bucket_name) if bucket_name else None
+        return bucket, (weight if weight is not None else default_weight)
+
+    async def acquire(self, endpoint: str, priority: int, weight: float | None = None):
+        bucket, w = self._route(endpoint, weight)
+        if bucket is not None:
+            await bucket.acquire(w, priority)
+        self.requests += 1
+
+    def observe(self, endpoint: str, resp: httpx.Response):
+        bucket, _ = self._route(endpoint, None)
+        if bucket is None:
+            return
+
+        if resp.status_code in (418, 429):
+            self.rejected += 1
+            retry = resp.headers.get("retry-after")
+            try:
+                bucket.block(float(retry) if retry else 1.0)
+            except ValueError:
+                bucket.block(1.0)
+            return
+
+        spec = USAGE_HEADERS.get(self.exchange)
+        if not spec:
+            return
+
+        header, bucket_name, kind = spec
+        raw = resp.headers.get(header)
+        if raw is None:
+            return
+
+        target = self.buckets.get(bucket_name) if bucket_name else bucket
+        if target is None:
+            return
+
+        try:
+            value = float(raw)
+        except ValueError:
+            return
+
+        if kind == "used":
+            value = target.limit - value
+
+        target.sync_remaining(value)
+
+    def remaining(self) -> Dict[str, float]:
+        return {name: round(b.remaining, 1) for name, b in self.buckets.items()}
+
+
+# ----------------------------------------------------------------------
+# Public API
+# ----------------------------------------------------------------------
+
+_limiters: Dict[str, ExchangeRateLimiter] = {}
+
+# доля биржевого лимита, которую расходует этот процесс
+_process_share = 1.0
+
+
+def set_process_share(share: float):
+    """
+    Доля лимитов бирж для текущего процесса; вызывать до первого запроса.
+    """
+    global _process_share
+    _process_share = share
+    _limiters.clear()
+
+
+def get_limiter(exchange: str) -> ExchangeRateLimiter:
+    limiter = _limiters.get(exchange)
+    if limiter is None:
+        limiter = _limiters[exchange] = ExchangeRateLimiter(exchange, _process_share)
+    return limiter
+
+
+async def limited_request(
+    exchange: str,
+    endpoint: str,
+    url: str,
+    *,
+    method: str = "GET",
+    params: dict | None = None,
+    headers: dict | None = None,
+    priority: int = PRIORITY_BACKGROUND,
+    weight: float | None = None,
+    timeout: float | None = None,
+) -> httpx.Response:
+    """
+    Запрос через общий клиент биржи после получения бюджета лимита.
+    raise_for_status — на стороне вызывающего.
+    """
+    limiter = get_limiter(exchange)
+    await limiter.acquire(endpoint, priority, weight)
+
+    kwargs: Dict[str, Any] = {"params": params, "headers": headers}
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    resp = await get_client(exchange).request(method, url, **kwargs)
+    limiter.observe(endpoint, resp)
+    return resp
+
+
+def remaining_budget() -> Dict[str, Dict[str, Any]]:
+    """
+    Метрика процесса: остаток его доли бюджета (share), число запросов /
+    ожиданий / отказов по биржам.
+    """
+    return {
+        name: {
+            "share": lim.share,
+            "remaining": lim.remaining(),
+            "requests": lim.requests,
+            "throttled": sum(b.throttled for b in lim.buckets.values()),
+            "rejected": lim.rejected,
+        }
+        for name, lim in _limiters.items()
+    }
@@ -0,0 +1,105 @@
+"""
+ticker_cache — общий снимок полных тикеров для Stage-0 и Stage-1
+
+Bybit /v5/market/tickers, OKX /market/tickers, Gate /spot/tickers и
+KuCoin allTickers отдают в одном ответе и 24h-объём, и лучший bid/ask.
+Stage-0 (фильтр по объёму) и Stage-1 (снимок цен) читают один и тот же
+ответ — один запрос на биржу за тик вместо двух.
+
+• хранится тело ответа (bytes) + время получения; каждая стадия
+  разбирает его своим декодером (src/exchanges/decoders.py)
+• get(exchange, max_age_s) — снимок не старше max_age_s, иначе новый запрос
+• одновременные промахи по одной бирже ждут один и тот же запрос
+• Binance здесь нет: bookTicker не содержит объёмов, а /ticker/24hr
+  слишком тяжёлый по весу для опроса каждый цикл
+
+Кэш живёт в одном процессе и одном event loop — Stage-0 и Stage-1
+должны работать в одном воркере (main.py).
+"""
+
+import asyncio
+import time
+from functools import partial
+from typing import Dict, Any, Awaitable, Callable
+
+from src.exchanges.bybit.bybit_market import fetch_tickers_raw as bybit_fetch_tickers_raw
+from src.exchanges.okx.okx_market import fetch_tickers_raw as okx_fetch_tickers_raw
+from src.exchanges.gate.gate_market import fetch_tickers_raw as gate_fetch_tickers_raw
+from src.exchanges.kucoin.kucoin_market import fetch_tickers_raw as kucoin_fetch_tickers_raw
+from src.exchanges.rate_limit import PRIORITY_STAGE1
+
+
+# exchange → fetch_tickers_raw(priority=..., decoder=...)
+TICKER_FETCHERS: Dict[str, Callable[..., Awaitable[Any]]] = {
+    "bybit":   partial(bybit_fetch_tickers_raw, "spot"),
+    "okx":     okx_fetch_tickers_raw,
+    "gate":    gate_fetch_tickers_raw,
+    "kucoin":  kucoin_fetch_tickers_raw,
+}
+
+
+TickerEntry = tuple[float, bytes]     # (время получения, тело ответа)
+
+
+class TickerCache:
+    """
+    Последний ответ тикеров по биржам с переиспользованием по возрасту.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, TickerEntry] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.fetches: Dict[str, int] = {}       # запросов к бирже
+        self.hits: Dict[str, int] = {}          # отдано из кэша без запроса
+
+    @property
+    def exchanges(self) -> tuple[str, ...]:
+        return tuple(TICKER_FETCHERS)
+
+    def peek(self, exchange: str) -> TickerEntry | None:
+        return self._entries.get(exchange)
+
+    async def get(
+        self,
+        exchange: str,
+        max_age_s: float,
+        priority: int = PRIORITY_STAGE1,
+    ) -> TickerEntry:
+        """
+        (ts, body) не старше max_age_s.
+        При промахе — новый запрос или уже идущий (его priority — у первого).
+        """
+        entry = self._entries.get(exchange)
+        if entry is not None and time.time() - entry[0] <= max_age_s:
+            self.hits[exchange] = self.hits.get(exchange, 0) + 1
+            return entry
+
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(exchange)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch(exchange, priority))
+            task.add_done_callback(partial(self._on_done, exchange))
+            self._inflight[exchange] = task
+
+        # отмена одного ожидающего не обрывает общий запрос
+        return await asyncio.shield(task)
+
+    async def _fetch(self, exchange: str, priority: int) -> TickerEntry:
+        self.fetches[exchange] = self.fetches.get(exchange, 0) + 1
+        body = await TICKER_FETCHERS[exchange](priority=priority, decoder=bytes)
+        entry = (time.time(), body)
+        self._entries[exchange] = entry
+        return entry
+
+    def _on_done(self, exchange: str, task: asyncio.Task):
+        if self._inflight.get(exchange) is task:
+            del self._inflight[exchange]
+        # исключение забирают ожидающие; здесь — только чтобы не было warning
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            ex: {"fetches": self.fetches.get(ex, 0), "hits": self.hits.get(ex, 0)}
+            for ex in TICKER_FETCHERS
+        }
@@ -0,0 +1,84 @@
+"""
+records — запись сигнала Stage-1 фиксированного размера для shared memory
+
+• SIGNAL_DTYPE — numpy structured dtype записи, без pickle
+• encode_signal / decode_signal — dict сигнала ↔ tuple записи
+• биржи и тип события хранятся индексами (EXCHANGES, SIGNAL_EVENTS)
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any
+
+import numpy as np
+
+
+# порядок бирж в записи
+EXCHANGES = ("binance", "bybit", "okx", "gate", "kucoin")
+
+SYMBOL_BYTES = 32
+
+# тип события сигнала (инкрементальный Stage-1); полный срез — всегда opened
+SIGNAL_EVENTS = ("opened", "updated", "closed")
+
+SIGNAL_DTYPE = np.dtype([
+    ("pair", f"S{SYMBOL_BYTES}"),
+    ("event", np.uint8),             # индекс в SIGNAL_EVENTS
+    ("buy", np.uint8),               # индекс в EXCHANGES
+    ("sell", np.uint8),
+    ("spread_pct", np.float64),
+    ("ts", np.float64),              # unix time
+    # L1 маршрута: ask / объём на покупке, bid / объём на продаже (0 — нет)
+    ("buy_ask", np.float64),
+    ("buy_ask_size", np.float64),
+    ("sell_bid", np.float64),
+    ("sell_bid_size", np.float64),
+    # множители комиссий ног из RouteCostMatrix Stage-1 (0 — нет)
+    ("buy_mult", np.float64),
+    ("sell_mult", np.float64),
+])
+
+_ROUTE_FIELDS = ("buy_ask", "buy_ask_size", "sell_bid", "sell_bid_size", "buy_mult", "sell_mult")
+
+_EX_INDEX = {name: i for i, name in enumerate(EXCHANGES)}
+_EVENT_INDEX = {name: i for i, name in enumerate(SIGNAL_EVENTS)}
+
+
+def encode_signal(sig: Dict[str, Any]) -> tuple:
+    """
+    sig — {"pair", "buy_exchange", "sell_exchange", "spread_pct"[, "event", "ts",
+           "buy_ask", "buy_ask_size", "sell_bid", "sell_bid_size",
+           "buy_mult", "sell_mult"]}.
+    """
+    return (
+        sig["pair"].encode(),
+        _EVENT_INDEX[sig.get("event", "opened")],
+        _EX_INDEX[sig["buy_exchange"]],
+        _EX_INDEX[sig["sell_exchange"]],
+        sig["spread_pct"],
+        sig.get("ts") or time.time(),
+        sig.get("buy_ask", 0.0),
+        sig.get("buy_ask_size", 0.0),
+        sig.get("sell_bid", 0.0),
+        sig.get("sell_bid_size", 0.0),
+        sig.get("buy_mult", 0.0),
+        sig.get("sell_mult", 0.0),
+    )
+
+
+def decode_signal(rec: tuple) -> Dict[str, Any]:
+    pair, event_idx, buy_idx, sell_idx, spread_pct, ts, *route = rec
+    buy = EXCHANGES[buy_idx]
+    sell = EXCHANGES[sell_idx]
+
+    return {
+        "pair": pair.decode(),
+        "event": SIGNAL_EVENTS[event_idx],
+        "direction": f"{buy}→{sell}",
+        "spread_pct": spread_pct,
+        "buy_exchange": buy,
+        "sell_exchange": sell,
+        "ts": datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        "sent_at": ts,                   # unix time записи — для задержек
+        **dict(zip(_ROUTE_FIELDS, route)),
+    }
@@ -0,0 +1,263 @@
+"""
+signal_mailbox — последний сигнал на пару в shared memory (Stage-1 → Stage-2)
+
+Очередь отдаёт каждый сигнал по порядку: Stage-1 раз в цикл пишет сигнал
+по каждой паре, и если консьюмер отстал, он разбирает устаревшие сигналы.
+Здесь:
+
+• слот на пару: новый сигнал по паре заменяет ещё не прочитанный (coalesced)
+• кольцо уведомлений — номера слотов с непрочитанным сигналом; слот в нём
+  не больше одного раза, поэтому кольцо не переполняется
+• консьюмер всегда читает текущее содержимое слота — самое свежее состояние
+• слотов capacity; новая пара при заполнении занимает слот самой давно
+  обновлённой, её непрочитанный сигнал считается в dropped (drop-oldest)
+• один писатель (Stage1Producer), один читатель — SPSC, без блокировок;
+  слот пишется под seqlock (нечётный seq — идёт запись)
+
+Протокол: писатель пишет запись, затем, если pending слота 0, ставит 1 и
+кладёт номер в кольцо. Читатель снимает номер, сбрасывает pending, затем
+читает запись — обновление после сброса снова попадёт в кольцо; повтор той же
+версии слота (seq) пропускается.
+
+Layout буфера:
+    header  uint64[8]: head, tail, capacity, dropped, coalesced, puts
+    seq     uint64[capacity]
+    pending uint8[capacity]
+    notify  uint32[capacity]
+    records SIGNAL_DTYPE[capacity]
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Dict, Any
+
+import numpy as np
+
+from src.config import IPC_SIGNAL_MAILBOX_CAPACITY, IPC_RING_POLL_MAX_S
+from src.ipc.records import SIGNAL_DTYPE, encode_signal, decode_signal
+
+
+_HEADER_WORDS = 8
+_HEADER_BYTES = _HEADER_WORDS * 8
+
+_HEAD, _TAIL, _CAPACITY, _DROPPED, _COALESCED, _PUTS = range(6)
+
+
+def _layout(capacity: int) -> tuple[int, int, int, int, int]:
+    """
+    (offset seq, offset pending, offset notify, offset records, размер).
+    """
+    seq = _HEADER_BYTES
+    pending = seq + capacity * 8
+    notify = pending + capacity
+    notify += -notify % 4
+    records = notify + capacity * 4
+    records += -records % 8
+    return seq, pending, notify, records, records + capacity * SIGNAL_DTYPE.itemsize
+
+
+class SignalMailbox:
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+
+        self._header = np.ndarray((_HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        self._cap = cap = int(self._header[_CAPACITY])
+
+        seq, pending, notify, records, _ = _layout(cap)
+        self._seq = np.ndarray((cap,), dtype=np.uint64, buffer=shm.buf, offset=seq)
+        self._pending = np.ndarray((cap,), dtype=np.uint8, buffer=shm.buf, offset=pending)
+        self._notify = np.ndarray((cap,), dtype=np.uint32, buffer=shm.buf, offset=notify)
+        self._records = np.ndarray((cap,), dtype=SIGNAL_DTYPE, buffer=shm.buf, offset=records)
+
+        # писатель: pair → слот, порядок — от давно обновлённых (строится при первом put)
+        self._slots: OrderedDict[bytes, int] | None = None
+        # читатель: версия слота, отданная последней
+        self._seen = np.zeros(cap, dtype=np.uint64)
+
+    @classmethod
+    def create(cls, capacity: int = IPC_SIGNAL_MAILBOX_CAPACITY) -> "SignalMailbox":
+        shm = shared_memory.SharedMemory(create=True, size=_layout(capacity)[-1])
+
+        header = np.ndarray((_HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        header[:] = 0
+        header[_CAPACITY] = capacity
+        del header
+
+        box = cls(shm, owner=True)
+        box._seq[:] = 0
+        box._pending[:] = 0
+        return box
+
+    @classmethod
+    def attach(cls, name: str) -> "SignalMailbox":
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def dropped(self) -> int:
+        return int(self._header[_DROPPED])
+
+    @property
+    def coalesced(self) -> int:
+        return int(self._header[_COALESCED])
+
+    def __len__(self) -> int:
+        """
+        Слотов с непрочитанным сигналом (глубина очереди).
+        """
+        return int(self._header[_HEAD] - self._header[_TAIL])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self),
+            "puts": int(self._header[_PUTS]),
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+        }
+
+    # ------------------------------------------------------------------
+    # producer
+    # ------------------------------------------------------------------
+
+    def _index(self) -> OrderedDict:
+        # рестарт писателя: слоты восстанавливаются из уже записанных пар
+        if self._slots is None:
+            used = np.flatnonzero(self._seq)
+            order = used[np.argsort(self._records["ts"][used], kind="stable")]
+            self._slots = OrderedDict(
+                (self._records["pair"][i].tobytes().rstrip(b"\0"), int(i)) for i in order
+            )
+        return self._slots
+
+    def _slot(self, pair: bytes) -> tuple[int, bool]:
+        """
+        (слот пары, True — вытеснен непрочитанный сигнал другой пары).
+        """
+        slots = self._index()
+
+        i = slots.get(pair)
+        if i is not None:
+            slots.move_to_end(pair)
+            return i, False
+
+        evicted = False
+        if len(slots) < self._cap:
+            i = len(slots)
+        else:
+            # занимаем слот самой давно обновлённой пары
+            _, i = slots.popitem(last=False)
+            evicted = bool(self._pending[i])
+
+        slots[pair] = i
+        return i, evicted
+
+    def put(self, sig: Dict[str, Any]) -> bool:
+        """
+        sig — как у encode_signal(). False — заменён непрочитанный сигнал
+        (этой пары — coalesced, вытесненной — dropped).
+        """
+        rec = encode_signal(sig)
+        i, evicted = self._slot(rec[0])
+
+        h = self._header
+        h[_PUTS] += 1
+
+        self._seq[i] += 1                # нечётный — запись идёт
+        self._records[i] = rec
+        self._seq[i] += 1
+
+        if self._pending[i]:
+            h[_DROPPED if evicted else _COALESCED] += 1
+            return False
+
+        self._pending[i] = 1
+        head = int(h[_HEAD])
+        self._notify[head % self._cap] = i
+        h[_HEAD] = head + 1              # публикация — после записи данных
+        return True
+
+    # ------------------------------------------------------------------
+    # consumer
+    # ------------------------------------------------------------------
+
+    def _read(self, i: int) -> tuple[int, tuple]:
+        while True:
+            v = int(self._seq[i])
+            if v & 1:
+                continue
+            rec = self._records[i].item()              # копия как tuple
+            if int(self._seq[i]) == v:
+                return v, rec
+
+    def get_nowait(self) -> Dict[str, Any] | None:
+        h = self._header
+
+        while True:
+            tail = int(h[_TAIL])
+            if tail == int(h[_HEAD]):
+                return None
+
+            i = int(self._notify[tail % self._cap])
+            h[_TAIL] = tail + 1
+            self._pending[i] = 0
+
+            v, rec = self._read(i)
+            if v == self._seen[i]:
+                continue                 # эту версию уже отдали
+            self._seen[i] = v
+
+            return decode_signal(rec)
+
+    def get(self, timeout: float | None = None) -> Dict[str, Any] | None:
+        """
+        Ждёт сигнал (опрос с нарастающей паузой). None — истёк timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pause = 0.0005
+
+        while True:
+            sig = self.get_nowait()
+            if sig is not None:
+                return sig
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+
+            time.sleep(pause)
+            pause = min(pause * 2, IPC_RING_POLL_MAX_S)
+
+    async def get_async(self, timeout: float | None = None) -> Dict[str, Any] | None:
+        """
+        То же, что get(), но пауза опроса не блокирует event loop.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pause = 0.0005
+
+        while True:
+            sig = self.get_nowait()
+            if sig is not None:
+                return sig
+
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                return None
+
+            wait = pause if deadline is None else min(pause, deadline - now)
+            await asyncio.sleep(wait)
+            pause = min(pause * 2, IPC_RING_POLL_MAX_S)
+
+    # ------------------------------------------------------------------
+
+    def close(self):
+        self._header = None
+        self._seq = self._pending = self._notify = self._records = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -0,0 +1,241 @@
+"""
+depth_engine — векторный расчёт исполнения по стакану (NumPy) для Stage-2
+
+Сторона стакана один раз переводится в float-массивы с накопленными суммами:
+
+    cum_notional[i] — USDT, потраченные на уровни 0..i
+    cum_qty[i]      — базовый актив уровней 0..i
+
+После этого VWAP для любого объёма — searchsorted по накопленной сумме,
+O(log уровней), и сразу для массива объёмов.
+
+Маршрут «купить на A по ask → продать на B по bid» считается по количеству:
+на X USDT покупается q(X) базового актива, ровно q продаётся по bid B.
+
+    net_spread(X) = (S(q)(1 - fee_sell) - X(1 + fee_buy)) / (X(1 + fee_buy)) * 100
+                    - SAFETY_FEE_BUFFER_PCT
+
+q(X) и выручка S(q) кусочно-линейны, прибыль вогнута по X, поэтому
+max_notional — точное решение на отрезке между точками излома обеих сторон:
+наибольший X, при котором net_spread(X) >= TARGET_NET_PROFIT_PCT.
+
+profit_curve — net_spread и чистая прибыль в USDT (от затрат с комиссией)
+на сетке STAGE2_CURVE_NOTIONALS_USDT (только объёмы, которые вмещает стакан).
+"""
+
+from typing import Dict, Any, Sequence
+
+import numpy as np
+
+from src.config import (
+    MAX_BOOK_DEPTH_LEVELS,
+    SAFETY_FEE_BUFFER_PCT,
+    TARGET_NET_PROFIT_PCT,
+    STAGE2_CURVE_NOTIONALS_USDT,
+)
+
+
+# объём ровно на всю глубину: допуск на округление накопленных сумм
+_EDGE = 1 + 1e-12
+
+
+# -------------------------------------------------------------------------
+# one side
+# -------------------------------------------------------------------------
+
+class DepthSide:
+
+    __slots__ = ("price", "qty", "cum_notional", "cum_qty")
+
+    def __init__(self, levels, max_levels: int = MAX_BOOK_DEPTH_LEVELS):
+        """
+        levels — [[price, qty, ...], ...] (строки или float), лучший уровень первым.
+        """
+        # у OKX в уровне 4 поля — берутся только цена и объём
+        arr = np.asarray([lv[:2] for lv in levels[:max_levels]], dtype=np.float64).reshape(-1, 2)
+        arr = arr[(arr[:, 0] > 0) & (arr[:, 1] > 0)]
+
+        self.price = np.ascontiguousarray(arr[:, 0])
+        self.qty = np.ascontiguousarray(arr[:, 1])
+        self.cum_notional = np.cumsum(self.price * self.qty)
+        self.cum_qty = np.cumsum(self.qty)
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    @property
+    def total_notional(self) -> float:
+        return float(self.cum_notional[-1]) if len(self) else 0.0
+
+    @property
+    def total_qty(self) -> float:
+        return float(self.cum_qty[-1]) if len(self) else 0.0
+
+    # --- объём → количество / выручка (векторно) ------------------------
+
+    def qty_for_notional(self, notional) -> np.ndarray:
+        """
+        Количество, полученное за notional USDT (NaN — глубины не хватает).
+        """
+        x = np.asarray(notional, dtype=np.float64)
+        i = np.searchsorted(self.cum_notional, x, side="left")
+        ok = (i < len(self)) | (x <= self.cum_notional[-1] * _EDGE)
+        i = np.minimum(i, len(self) - 1)
+
+        prev_n = np.where(i > 0, self.cum_notional[i - 1], 0.0)
+        prev_q = np.where(i > 0, self.cum_qty[i - 1], 0.0)
+        q = prev_q + (x - prev_n) / self.price[i]
+        return np.where(ok, q, np.nan)
+
+    def notional_for_qty(self, qty) -> np.ndarray:
+        """
+        USDT за количество qty (NaN — глубины не хватает).
+        """
+        q = np.asarray(qty, dtype=np.float64)
+        i = np.searchsorted(self.cum_qty, q, side="left")
+        ok = (i < len(self)) | (q <= self.cum_qty[-1] * _EDGE)
+        i = np.minimum(i, len(self) - 1)
+
+        prev_n = np.where(i > 0, self.cum_notional[i - 1], 0.0)
+        prev_q = np.where(i > 0, self.cum_qty[i - 1], 0.0)
+        n = prev_n + (q - prev_q) * self.price[i]
+        return np.where(ok, n, np.nan)
+
+    # --- сколько уровней съедает объём ----------------------------------
+
+    def levels_for_notional(self, notional: float) -> int:
+        return min(int(np.searchsorted(self.cum_notional, notional / _EDGE)) + 1, len(self))
+
+    def levels_for_qty(self, qty: float) -> int:
+        return min(int(np.searchsorted(self.cum_qty, qty / _EDGE)) + 1, len(self))
+
+    def vwap(self, notional: float) -> float | None:
+        """
+        Средняя цена исполнения на notional USDT или None — глубины не хватает.
+        """
+        if not len(self) or notional <= 0:
+            return None
+        q = float(self.qty_for_notional(notional))
+        if q != q:
+            return None
+        return notional / q
+
+
+# -------------------------------------------------------------------------
+# route: buy on asks → sell on bids
+# -------------------------------------------------------------------------
+
+class DepthRoute:
+
+    def __init__(
+        self,
+        asks: DepthSide,
+        bids: DepthSide,
+        fee_buy_pct: float,
+        fee_sell_pct: float,
+        buffer_pct: float = SAFETY_FEE_BUFFER_PCT,
+    ):
+        self.asks = asks
+        self.bids = bids
+        self.buy_mult = 1 + fee_buy_pct / 100
+        self.sell_mult = 1 - fee_sell_pct / 100
+        self.buffer_pct = buffer_pct
+
+    @classmethod
+    def from_mults(
+        cls,
+        asks: DepthSide,
+        bids: DepthSide,
+        buy_mult: float,
+        sell_mult: float,
+        buffer_pct: float = SAFETY_FEE_BUFFER_PCT,
+    ) -> "DepthRoute":
+        """
+        Маршрут с готовыми множителями ног (src/pipeline/route_costs.py).
+        """
+        route = cls(asks, bids, 0.0, 0.0, buffer_pct)
+        route.buy_mult = buy_mult
+        route.sell_mult = sell_mult
+        return route
+
+    @property
+    def max_depth_notional(self) -> float:
+        """
+        Наибольший объём покупки, который вмещают обе стороны.
+        """
+        if not len(self.asks) or not len(self.bids):
+            return 0.0
+        by_bids = float(self.asks.notional_for_qty(min(self.bids.total_qty, self.asks.total_qty)))
+        return min(self.asks.total_notional, by_bids)
+
+    def evaluate(self, notional) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (buy_vwap, sell_vwap, net_spread_pct) для объёмов покупки notional (USDT).
+        NaN — объём больше доступной глубины.
+        """
+        x = np.asarray(notional, dtype=np.float64)
+        q = self.asks.qty_for_notional(x)
+        proceeds = self.bids.notional_for_qty(q)
+
+        cost = x * self.buy_mult
+        net = (proceeds * self.sell_mult - cost) / cost * 100 - self.buffer_pct
+        return x / q, proceeds / q, net
+
+    def max_notional(self, target_pct: float = TARGET_NET_PROFIT_PCT) -> float:
+        """
+        Наибольший объём покупки (USDT) с net_spread >= target_pct; 0 — ни при каком.
+        """
+        limit = self.max_depth_notional
+        if limit <= 0:
+            return 0.0
+
+        # f(X) = S(q(X)) * sell_mult - k * X >= 0, f вогнута и кусочно-линейна
+        k = self.buy_mult * (1 + (target_pct + self.buffer_pct) / 100)
+
+        breaks = np.concatenate((
+            self.asks.cum_notional,
+            self.asks.notional_for_qty(self.bids.cum_qty),
+        ))
+        breaks = np.unique(breaks[(breaks > 0) & (breaks < limit)])
+        points = np.append(breaks, limit)
+
+        f = self.bids.notional_for_qty(self.asks.qty_for_notional(points)) * self.sell_mult - k * points
+
+        # наклон на первом отрезке: лучшие цены
+        if self.bids.price[0] * self.sell_mult / self.asks.price[0] < k:
+            return 0.0
+
+        bad = np.flatnonzero(~(f >= 0))
+        if not len(bad):
+            return limit
+
+        j = bad[0]
+        x0, f0 = (points[j - 1], f[j - 1]) if j > 0 else (0.0, 0.0)
+        x1, f1 = points[j], f[j]
+        # f линейна на [x0, x1]: корень f = 0
+        return float(x0 + (x1 - x0) * f0 / (f0 - f1)) if f0 > f1 else float(x0)
+
+    def profit_curve(
+        self,
+        notionals: Sequence[float] = STAGE2_CURVE_NOTIONALS_USDT,
+    ) -> list[Dict[str, float]]:
+        """
+        [{"notional", "buy_price", "sell_price", "net_spread_pct", "net_profit_usdt"}]
+        по объёмам, которые вмещает стакан.
+        """
+        x = np.asarray(notionals, dtype=np.float64)
+        x = x[x <= self.max_depth_notional]
+        if not len(x):
+            return []
+
+        buy, sell, net = self.evaluate(x)
+        return [
+            {
+                "notional": float(n),
+                "buy_price": float(b),
+                "sell_price": float(s),
+                "net_spread_pct": round(float(p), 4),
+                "net_profit_usdt": round(float(n * self.buy_mult * p / 100), 4),
+            }
+            for n, b, s, p in zip(x, buy, sell, net)
+        ]
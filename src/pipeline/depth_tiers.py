@@ -0,0 +1,71 @@
+"""
+depth_tiers — ступени глубины REST-стаканов Stage-2 с памятью по ногам
+
+Фиксированные 10 уровней — лишние байты для ликвидных пар (объём покрывает
+первый уровень) и слишком мало для тонких (ложный insufficient_depth).
+Здесь:
+
+• у каждой биржи — лестница допустимых limit (STAGE2_DEPTH_TIERS), от дешёвой
+• depth() — с какой ступени начинать ногу (exchange, symbol): с той, что
+  хватила в прошлый раз, для новой ноги — с первой
+• deeper() — следующая ступень, если накопленного объёма не хватило
+• record() — сколько уровней нога реально потребовала; следующая проверка
+  начнётся с наименьшей ступени, которая их вмещает (в т.ч. вниз)
+• escalations — счётчик дозагрузок для метрик (ведёт Stage-2)
+"""
+
+from bisect import bisect_left
+from typing import Dict, Any, Sequence
+
+from src.config import STAGE2_DEPTH_TIERS, MAX_BOOK_DEPTH_LEVELS
+
+
+class DepthTiers:
+
+    def __init__(self, tiers: Dict[str, Sequence[int]] = STAGE2_DEPTH_TIERS):
+        self.tiers = {ex: tuple(sorted(t)) for ex, t in tiers.items()}
+
+        # (exchange, symbol) → индекс ступени
+        self._legs: Dict[tuple[str, str], int] = {}
+
+        self.escalations = 0        # ноги, догруженные следующей ступенью
+
+    def __len__(self) -> int:
+        return len(self._legs)
+
+    def _ladder(self, exchange: str) -> tuple[int, ...]:
+        return self.tiers.get(exchange) or (MAX_BOOK_DEPTH_LEVELS,)
+
+    def depth(self, exchange: str, symbol: str) -> int:
+        """
+        Глубина первой загрузки ноги.
+        """
+        return self._ladder(exchange)[self._legs.get((exchange, symbol), 0)]
+
+    def max_depth(self, exchange: str) -> int:
+        return self._ladder(exchange)[-1]
+
+    def deeper(self, exchange: str, depth: int) -> int | None:
+        """
+        Следующая ступень после depth или None — глубже некуда.
+        """
+        ladder = self._ladder(exchange)
+        i = bisect_left(ladder, depth + 1)
+        return ladder[i] if i < len(ladder) else None
+
+    def record(self, exchange: str, symbol: str, levels: int):
+        """
+        Нога потребовала levels уровней — запоминаем наименьшую ступень под них.
+        """
+        ladder = self._ladder(exchange)
+        i = min(bisect_left(ladder, levels), len(ladder) - 1)
+        if i:
+            self._legs[(exchange, symbol)] = i
+        else:
+            self._legs.pop((exchange, symbol), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "legs": len(self._legs),
+            "escalations": self.escalations,
+        }
@@ -0,0 +1,214 @@
+"""
+pairs_universe — версионируемая вселенная Stage-0 и компактные диффы
+
+Stage-0 раз в PAIRS_REFRESH_INTERVAL_S строит таблицу пар заново, и каждый
+потребитель переиндексирует её целиком, не зная, что изменилось. Здесь:
+
+• PairsUniverse держит таблицу пар, тиры оборота ног и номер версии
+• update(legs) применяет свежие обороты ног и возвращает дифф
+  (None — ничего не изменилось):
+
+    {"version": 7, "base": 6,
+     "added":   [(key, exchange, symbol), ...],
+     "removed": [(key, exchange, symbol), ...],
+     "tiers":   [(key, exchange, tier), ...]}
+
+• гистерезис: нога входит при обороте >= MIN_24H_VOLUME_USDT, а выходит
+  только ниже MIN_24H_VOLUME_USDT * UNIVERSE_EXIT_RATIO; тир понижается
+  по тому же правилу — пары у порога не мигают
+• таблица copy-on-write: новая версия — новый dict верхнего уровня,
+  неизменённые пары разделяют вложенные dict с прошлой версией;
+  изменились только тиры — таблица та же
+• diffs_since(version) — диффы для догоняющего потребителя, None — история
+  уже не покрывает его версию, нужен полный снимок
+• follow() доводит потребителя до текущей версии: apply_diff() по диффам,
+  при расхождении — set_pairs() полным снимком
+
+Потребители с apply_diff: RouteTracker, IncrementalStageOne.
+state() / restore() — тёплый старт с диска (src/pipeline/universe_cache.py).
+"""
+
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, Any, Sequence
+
+from src.config import (
+    UNIVERSE_EXIT_RATIO,
+    UNIVERSE_VOLUME_TIERS_USDT,
+    UNIVERSE_DIFF_HISTORY,
+)
+
+
+Leg = tuple[str, str, str]            # (key, exchange, symbol)
+
+
+class PairsUniverse:
+
+    def __init__(
+        self,
+        exchanges: Sequence[str],
+        tiers: Sequence[float] = UNIVERSE_VOLUME_TIERS_USDT,
+        exit_ratio: float = UNIVERSE_EXIT_RATIO,
+        history: int = UNIVERSE_DIFF_HISTORY,
+    ):
+        self.exchanges: tuple[str, ...] = tuple(exchanges)
+        self.bounds: tuple[float, ...] = tuple(tiers)
+        self.exit_ratio = exit_ratio
+
+        self.pairs: Dict[str, Dict[str, Any]] = {}
+        self.version = 0
+
+        # (key, exchange) → тир оборота ноги в таблице
+        self._tiers: Dict[tuple[str, str], int] = {}
+        self._history: deque[Dict[str, Any]] = deque(maxlen=history)
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def tier(self, key: str, exchange: str) -> int | None:
+        return self._tiers.get((key, exchange))
+
+    # ------------------------------------------------------------------
+
+    def _tier(self, volume: float, prev: int | None) -> int:
+        tier = bisect_right(self.bounds, volume) - 1
+        if prev is not None and tier < prev and volume >= self.bounds[prev] * self.exit_ratio:
+            return prev
+        return max(tier, 0)
+
+    def update(self, legs: Dict[str, Dict[str, tuple[str, float]]]) -> Dict[str, Any] | None:
+        """
+        legs — key → exchange → (native symbol, 24h-оборот USDT), без порога
+        (src/utils/pairs_normalize.py: fetch_leg_volumes).
+        """
+        enter = self.bounds[0]
+        leave = enter * self.exit_ratio
+
+        added: list[Leg] = []
+        removed: list[Leg] = []
+        tiers: list[tuple[str, str, int]] = []
+
+        # key → новая копия вложенного dict (copy-on-write)
+        changed: Dict[str, Dict[str, Any]] = {}
+
+        def mapping(key: str) -> Dict[str, Any]:
+            m = changed.get(key)
+            if m is None:
+                m = changed[key] = dict(self.pairs.get(key) or dict.fromkeys(self.exchanges))
+            return m
+
+        # --- ноги в таблице: остаются, выходят, меняют тир --------------
+        for (key, ex), prev in list(self._tiers.items()):
+            sym = self.pairs[key][ex]
+            leg = legs.get(key, {}).get(ex)
+
+            if leg is None or leg[0] != sym or leg[1] < leave:
+                del self._tiers[(key, ex)]
+                mapping(key)[ex] = None
+                removed.append((key, ex, sym))
+                continue
+
+            tier = self._tier(leg[1], prev)
+            if tier != prev:
+                self._tiers[(key, ex)] = tier
+                tiers.append((key, ex, tier))
+
+        # --- новые ноги ----------------------------------------------------
+        for key, by_ex in legs.items():
+            for ex, (sym, volume) in by_ex.items():
+                if volume < enter or (key, ex) in self._tiers or ex not in self.exchanges:
+                    continue
+
+                self._tiers[(key, ex)] = self._tier(volume, None)
+                mapping(key)[ex] = sym
+                added.append((key, ex, sym))
+
+        if not (added or removed or tiers):
+            return None
+
+        if changed:
+            pairs = dict(self.pairs)
+            for key, m in changed.items():
+                if any(m.values()):
+                    pairs[key] = m
+                else:
+                    pairs.pop(key, None)
+            self.pairs = pairs
+
+        self.version += 1
+        diff = {
+            "version": self.version,
+            "base": self.version - 1,
+            "added": added,
+            "removed": removed,
+            "tiers": tiers,
+        }
+        self._history.append(diff)
+        return diff
+
+    # ------------------------------------------------------------------
+    # persistence (src/pipeline/universe_cache.py)
+    # ------------------------------------------------------------------
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Компактное состояние: exchange → [[key, symbol, tier], ...].
+        """
+        legs: Dict[str, list] = {ex: [] for ex in self.exchanges}
+        for (key, ex), tier in self._tiers.items():
+            legs[ex].append([key, self.pairs[key][ex], tier])
+        return {"version": self.version, "legs": legs}
+
+    def restore(self, state: Dict[str, Any]):
+        """
+        Состояние из state(). История диффов сбрасывается —
+        потребители получат полный снимок (follow → set_pairs).
+        """
+        version = int(state["version"])
+        pairs: Dict[str, Dict[str, Any]] = {}
+        tiers: Dict[tuple[str, str], int] = {}
+
+        # всё разбирается до присваивания — битое состояние не меняет вселенную
+        for ex, rows in state["legs"].items():
+            if ex not in self.exchanges:
+                continue
+            for key, sym, tier in rows:
+                pairs.setdefault(key, dict.fromkeys(self.exchanges))[ex] = sym
+                tiers[(key, ex)] = int(tier)
+
+        self.pairs = pairs
+        self._tiers = tiers
+        self._history.clear()
+        self.version = version
+
+    def diffs_since(self, version: int) -> list[Dict[str, Any]] | None:
+        """
+        Диффы после version по порядку; None — нужен полный снимок.
+        """
+        if version == self.version:
+            return []
+        if not self._history or not self._history[0]["base"] <= version < self.version:
+            return None
+        return [d for d in self._history if d["version"] > version]
+
+
+# -------------------------------------------------------------------------
+# consumers
+# -------------------------------------------------------------------------
+
+def follow(universe: PairsUniverse, consumer, version: int, **kwargs) -> int:
+    """
+    Доводит consumer (set_pairs / apply_diff) от version до universe.version.
+    kwargs — для обоих методов (например store=QuoteStore).
+    Возвращает новую версию потребителя.
+    """
+    diffs = universe.diffs_since(version)
+
+    if diffs is None:
+        consumer.set_pairs(universe.pairs, **kwargs)
+    else:
+        for diff in diffs:
+            consumer.apply_diff(diff, universe.pairs, **kwargs)
+
+    return universe.version
+
@@ -0,0 +1,217 @@
+"""
+route_costs — издержки маршрутов Stage-1 (buy_exchange × sell_exchange[, пара])
+
+Stage-1 отбирал пары по «грязному» спреду (bid - ask) / ask, а комиссии и
+защитный буфер применял только Stage-2 — после двух загрузок стаканов, и
+большая часть сигналов отклонялась как spread_after_fees_too_low.
+
+Комиссия taker — свойство ноги (биржа, при переопределении — биржа + пара),
+поэтому ячейка матрицы маршрута раскладывается на множители ног:
+
+    buy_mult[i]  = 1 + taker_i / 100          (покупка по ask на бирже i)
+    sell_mult[j] = 1 - taker_j / 100          (продажа по bid на бирже j)
+
+    cost    = ask_i * buy_mult[i]
+    net_pct = (bid_j * sell_mult[j] - cost) / cost * 100 - buffer_pct
+
+Это формула Stage-2 на первом уровне стакана (depth_engine.DepthRoute), а
+VWAP глубже только хуже — net_pct по L1 не меньше того, что подтвердит Stage-2.
+
+• множители считаются заранее; переопределения по паре (например, из
+  Binance /sapi/v1/asset/tradeFee — binance_fee_overrides) — только для своих ног
+• update() пересобирает таблицы, только если входные данные изменились;
+  version растёт с каждой пересборкой — по ней движки сбрасывают свои копии
+• Stage-2 проверяет стаканы по тем же множителям: Stage-1 кладёт их в сигнал
+  (buy_mult / sell_mult), процесс Stage-2 без них берёт свою матрицу
+• NO_COSTS — нулевые комиссии и буфер: net_pct совпадает с «грязным» спредом
+  бит в бит (умножение на 1.0 и вычитание 0.0 точны)
+"""
+
+from typing import Dict, Any, Sequence
+
+import numpy as np
+
+from src.config import EXCHANGE_TAKER_FEES, SAFETY_FEE_BUFFER_PCT
+
+
+# комиссия биржи вне таблицы — как в Stage-2
+DEFAULT_TAKER_FEE_PCT = 0.10
+
+Mults = tuple[Dict[str, float], Dict[str, float]]      # (buy_mult, sell_mult) по биржам
+
+
+def net_pct(ask: float, bid: float, buy_mult: float, sell_mult: float, buffer_pct: float) -> float:
+    """
+    Чистый спред маршрута «купить по ask → продать по bid», %.
+    """
+    cost = ask * buy_mult
+    if cost <= 0:
+        return 0.0
+    return (bid * sell_mult - cost) / cost * 100.0 - buffer_pct
+
+
+class RouteCostMatrix:
+
+    def __init__(
+        self,
+        fees: Dict[str, float] = EXCHANGE_TAKER_FEES,
+        buffer_pct: float = SAFETY_FEE_BUFFER_PCT,
+        overrides: Dict[tuple[str, str], float] | None = None,
+        default_fee_pct: float = DEFAULT_TAKER_FEE_PCT,
+    ):
+        """
+        fees — taker, % по биржам; overrides — {(exchange, pair key): taker %}.
+        """
+        self.default_fee_pct = default_fee_pct
+        self.version = 0
+        self._inputs = None
+        self.update(fees, buffer_pct, overrides or {})
+
+    # ------------------------------------------------------------------
+
+    def update(
+        self,
+        fees: Dict[str, float] | None = None,
+        buffer_pct: float | None = None,
+        overrides: Dict[tuple[str, str], float] | None = None,
+    ) -> bool:
+        """
+        Новые входные данные (None — без изменений). False — всё то же, пересборки нет.
+        """
+        old = self._inputs
+        inputs = (
+            tuple(sorted((fees if fees is not None else dict(old[0])).items())),
+            buffer_pct if buffer_pct is not None else old[1],
+            tuple(sorted((overrides if overrides is not None else dict(old[2])).items())),
+        )
+        if inputs == old:
+            return False
+
+        self._inputs = inputs
+        fees_t, self.buffer_pct, overrides_t = inputs
+
+        self.fees = dict(fees_t)
+        self._default: Mults = (
+            {ex: 1 + fee / 100 for ex, fee in fees_t},
+            {ex: 1 - fee / 100 for ex, fee in fees_t},
+        )
+
+        # пара → множители её ног с переопределениями
+        by_pair: Dict[str, Dict[str, float]] = {}
+        for (ex, key), fee in overrides_t:
+            by_pair.setdefault(key, {})[ex] = fee
+        self._pairs: Dict[str, Mults] = {
+            key: (
+                {**self._default[0], **{ex: 1 + fee / 100 for ex, fee in legs.items()}},
+                {**self._default[1], **{ex: 1 - fee / 100 for ex, fee in legs.items()}},
+            )
+            for key, legs in by_pair.items()
+        }
+
+        self.version += 1
+        return True
+
+    @property
+    def overrides(self) -> Dict[tuple[str, str], float]:
+        return dict(self._inputs[2])
+
+    # ------------------------------------------------------------------
+    # lookups
+    # ------------------------------------------------------------------
+
+    @property
+    def has_pair_overrides(self) -> bool:
+        return bool(self._pairs)
+
+    def pair_mults(self, key: str) -> Mults | None:
+        """
+        Множители пары с переопределениями или None — общие по биржам.
+        """
+        return self._pairs.get(key)
+
+    def mults_for(self, exchanges: Sequence[str], key: str | None = None) -> Mults:
+        """
+        (buy_mult, sell_mult) по всем exchanges для пары key (None — без переопределений).
+        """
+        mults = self._pairs.get(key) if key is not None else None
+        return (
+            {ex: self.buy_mult(ex, mults) for ex in exchanges},
+            {ex: self.sell_mult(ex, mults) for ex in exchanges},
+        )
+
+    def buy_mult(self, exchange: str, mults: Mults | None = None) -> float:
+        m = (mults or self._default)[0].get(exchange)
+        return m if m is not None else 1 + self.default_fee_pct / 100
+
+    def sell_mult(self, exchange: str, mults: Mults | None = None) -> float:
+        m = (mults or self._default)[1].get(exchange)
+        return m if m is not None else 1 - self.default_fee_pct / 100
+
+    def route_net_pct(
+        self,
+        buy_ex: str,
+        sell_ex: str,
+        ask: float,
+        bid: float,
+        key: str | None = None,
+    ) -> float:
+        mults = self._pairs.get(key) if key is not None else None
+        return net_pct(
+            ask, bid, self.buy_mult(buy_ex, mults), self.sell_mult(sell_ex, mults), self.buffer_pct,
+        )
+
+    def leg_mults(self, names: Sequence[str], keys: Sequence[str] | None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Множители для матричных движков: (buy, sell) формы (P × E) или (1 × E),
+        если переопределений нет (broadcast по строкам).
+        keys — ключи пар по строкам; нужны только при переопределениях.
+        """
+        buy = np.array([[self.buy_mult(ex) for ex in names]], dtype=np.float64)
+        sell = np.array([[self.sell_mult(ex) for ex in names]], dtype=np.float64)
+
+        if not self._pairs or keys is None:
+            return buy, sell
+
+        buy = np.repeat(buy, len(keys), axis=0)
+        sell = np.repeat(sell, len(keys), axis=0)
+        for r, key in enumerate(keys):
+            mults = self._pairs.get(key)
+            if mults is not None:
+                buy[r] = [self.buy_mult(ex, mults) for ex in names]
+                sell[r] = [self.sell_mult(ex, mults) for ex in names]
+
+        return buy, sell
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "fees": self.fees,
+            "buffer_pct": self.buffer_pct,
+            "overrides": len(self._inputs[2]),
+        }
+
+
+# нулевые издержки: net_pct == «грязный» спред
+NO_COSTS = RouteCostMatrix(fees={}, buffer_pct=0.0, default_fee_pct=0.0)
+
+# издержки Stage-1 по конфигу; переопределения — update(overrides=...)
+ROUTE_COSTS = RouteCostMatrix()
+
+
+# -------------------------------------------------------------------------
+# fee overrides
+# -------------------------------------------------------------------------
+
+def binance_fee_overrides(raw: list) -> Dict[tuple[str, str], float]:
+    """
+    Ответ fetch_binance_trade_fees_raw() → {("binance", "BTC_USDT"): taker %}.
+    takerCommission у Binance — доля ("0.001" = 0.1%).
+    """
+    out: Dict[tuple[str, str], float] = {}
+    for it in raw:
+        sym = it.get("symbol") or ""
+        taker = it.get("takerCommission")
+        if not sym.endswith("USDT") or taker in (None, ""):
+            continue
+        out[("binance", f"{sym[:-4]}_USDT")] = float(taker) * 100
+    return out
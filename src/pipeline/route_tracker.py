@@ -0,0 +1,460 @@
+"""
+route_tracker — лучший маршрут пары через best / second-best bid и ask
+
+Лучший межбиржевой маршрут пары — всегда «купить по минимальному ask,
+продать по максимальному bid» на РАЗНЫХ биржах. Комиссии taker — свойство ноги
+(src/pipeline/route_costs.py), поэтому то же верно для чистого спреда, если
+сравнивать цены с издержками: ask * buy_mult и bid * sell_mult. На пару
+достаточно держать две лучшие такие цены покупки и продажи по биржам:
+
+• max bid и min ask на разных биржах → маршрут готов
+• на одной бирже → лучшее из (второй ask → max bid) и (min ask → второй bid)
+
+Обновление котировки одной биржи трогает только её пару:
+• цена улучшилась или биржа не в топ-2 → сдвиг топ-2, O(1)
+• цена лидера ухудшилась → пересчёт топ-2 этой пары, O(E)
+Выбор маршрута — O(1) вместо перебора E² пар бирж.
+
+RouteTracker подключается слушателем к QuoteStore (режим стрима) и
+пересчитывает маршруты только у изменившихся пар. Для REST-режима —
+движок candidates_tracker (STAGE1_SPREAD_ENGINE = "tracker").
+
+Формат кандидатов — как у _candidates_python (a / b — в порядке бирж),
+порог min_pct — по чистому спреду; смена RouteCostMatrix.version пересчитывает
+топ-2 всех пар.
+Отличие только при точном равенстве спредов разных маршрутов:
+здесь остаётся маршрут, найденный первым.
+"""
+
+from typing import Dict, Any, Sequence, Iterable
+
+from src.pipeline.route_costs import RouteCostMatrix, Mults, NO_COSTS, net_pct
+
+
+def _pct(buy: float, sell: float) -> float:
+    if buy <= 0:
+        return 0.0
+    return (sell - buy) / buy * 100.0
+
+
+# -------------------------------------------------------------------------
+# one pair
+# -------------------------------------------------------------------------
+
+class PairBests:
+
+    __slots__ = ("quotes", "bid1", "bid2", "ask1", "ask2", "buy_mult", "sell_mult")
+
+    def __init__(self, mults: Mults):
+        # exchange → (quote, ts)
+        self.quotes: Dict[str, tuple[Dict[str, Any], float]] = {}
+        self.bid1 = self.bid2 = None       # биржи с лучшим / вторым bid
+        self.ask1 = self.ask2 = None       # биржи с лучшим / вторым ask
+        self.buy_mult, self.sell_mult = mults
+
+    # цены с издержками ноги
+    def _bid(self, ex: str) -> float:
+        return self.quotes[ex][0]["bid"] * self.sell_mult[ex]
+
+    def _ask(self, ex: str) -> float:
+        return self.quotes[ex][0]["ask"] * self.buy_mult[ex]
+
+    def reweight(self, mults: Mults):
+        self.buy_mult, self.sell_mult = mults
+        self._rescan_bids()
+        self._rescan_asks()
+
+    def net(self, route: tuple[str, str], buffer_pct: float) -> float:
+        buy, sell = route
+        return net_pct(
+            self.quotes[buy][0]["ask"], self.quotes[sell][0]["bid"],
+            self.buy_mult[buy], self.sell_mult[sell], buffer_pct,
+        )
+
+    # --- bids (больше — лучше) -------------------------------------------
+
+    def _push_bid(self, ex: str):
+        if ex == self.bid1:
+            return
+        b = self._bid(ex)
+        if self.bid1 is None or b > self._bid(self.bid1):
+            self.bid1, self.bid2 = ex, self.bid1
+        elif ex != self.bid2 and (self.bid2 is None or b > self._bid(self.bid2)):
+            self.bid2 = ex
+
+    def _rescan_bids(self):
+        self.bid1 = self.bid2 = None
+        for ex in self.quotes:
+            self._push_bid(ex)
+
+    # --- asks (меньше — лучше) -------------------------------------------
+
+    def _push_ask(self, ex: str):
+        if ex == self.ask1:
+            return
+        a = self._ask(ex)
+        if self.ask1 is None or a < self._ask(self.ask1):
+            self.ask1, self.ask2 = ex, self.ask1
+        elif ex != self.ask2 and (self.ask2 is None or a < self._ask(self.ask2)):
+            self.ask2 = ex
+
+    def _rescan_asks(self):
+        self.ask1 = self.ask2 = None
+        for ex in self.quotes:
+            self._push_ask(ex)
+
+    # ------------------------------------------------------------------
+
+    def update(self, ex: str, quote: Dict[str, Any], ts: float):
+        old = self.quotes.get(ex)
+        self.quotes[ex] = (quote, ts)
+
+        if old is not None and ex in (self.bid1, self.bid2) and quote["bid"] < old[0]["bid"]:
+            self._rescan_bids()
+        else:
+            self._push_bid(ex)
+
+        if old is not None and ex in (self.ask1, self.ask2) and quote["ask"] > old[0]["ask"]:
+            self._rescan_asks()
+        else:
+            self._push_ask(ex)
+
+    def touch(self, ex: str, ts: float) -> bool:
+        """
+        Котировка подтверждена без изменений — обновляется только время.
+        False — ноги нет (выбыла как устаревшая), котировку нужно подать заново.
+        """
+        entry = self.quotes.get(ex)
+        if entry is None:
+            return False
+        self.quotes[ex] = (entry[0], ts)
+        return True
+
+    def remove(self, ex: str):
+        if self.quotes.pop(ex, None) is None:
+            return
+        if ex in (self.bid1, self.bid2):
+            self._rescan_bids()
+        if ex in (self.ask1, self.ask2):
+            self._rescan_asks()
+
+    def route(self) -> tuple[str, str] | None:
+        """
+        (биржа покупки, биржа продажи) лучшего маршрута или None.
+        """
+        if self.ask1 is None or self.bid1 is None:
+            return None
+
+        if self.ask1 != self.bid1:
+            return self.ask1, self.bid1
+
+        options = []
+        if self.ask2 is not None:
+            options.append((self.ask2, self.bid1))
+        if self.bid2 is not None:
+            options.append((self.ask1, self.bid2))
+        if not options:
+            return None
+
+        return max(options, key=lambda r: _pct(self._ask(r[0]), self._bid(r[1])))
+
+
+# -------------------------------------------------------------------------
+# all pairs
+# -------------------------------------------------------------------------
+
+class RouteTracker:
+    """
+    Лучшие маршруты всех пар; слушатель QuoteStore (on_quote / on_discard / on_clear).
+    """
+
+    def __init__(self, exchanges: Sequence[str], costs: RouteCostMatrix | None = None):
+        # порядок бирж задаёт, кто в кандидате "a", а кто "b"
+        self._order = {name: i for i, name in enumerate(exchanges)}
+
+        # издержки маршрутов; None — без них (чистый спред = «грязный»)
+        self.costs = costs if costs is not None else NO_COSTS
+        self._costs_version = self.costs.version
+        self._default_mults = self.costs.mults_for(self._order)
+
+        self._source: Dict[str, Dict[str, Any]] | None = None
+        # exchange → native symbol → key
+        self._index: Dict[str, Dict[str, str]] = {}
+        self._pairs: Dict[str, PairBests] = {}
+
+        self._routes: Dict[str, tuple[str, str]] = {}
+        self._dirty: set[str] = set()
+
+        self.updates = 0
+
+    @property
+    def exchanges(self) -> list[str]:
+        return list(self._order)
+
+    def _new_pair(self, key: str) -> PairBests:
+        if self.costs.pair_mults(key) is None:
+            return PairBests(self._default_mults)
+        return PairBests(self.costs.mults_for(self._order, key))
+
+    def _check_costs(self):
+        """
+        Издержки пересобраны — новые множители и топ-2 у всех пар.
+        """
+        if self.costs.version == self._costs_version:
+            return
+        self._costs_version = self.costs.version
+        self._default_mults = self.costs.mults_for(self._order)
+
+        for key, pb in self._pairs.items():
+            mults = self._default_mults
+            if self.costs.pair_mults(key) is not None:
+                mults = self.costs.mults_for(self._order, key)
+            pb.reweight(mults)
+            self._dirty.add(key)
+
+    # ------------------------------------------------------------------
+    # universe
+    # ------------------------------------------------------------------
+
+    def set_pairs(self, pairs: Dict[str, Dict[str, Any]], store=None):
+        """
+        Новая таблица пар Stage-0. Та же таблица — ничего не делает.
+        store — QuoteStore, из которого засеваются текущие котировки.
+        """
+        if pairs is self._source:
+            return
+
+        self._source = pairs
+        self._index = {}
+        self._pairs = {key: self._new_pair(key) for key in pairs}
+        self._routes.clear()
+        self._dirty.clear()
+
+        for key, mapping in pairs.items():
+            for ex, sym in mapping.items():
+                if sym and ex in self._order:
+                    self._index.setdefault(ex, {})[sym] = key
+
+        if store is not None:
+            for ex in self._index:
+                for sym, quote in store.book(ex).items():
+                    self.on_quote(ex, sym, quote)
+
+    def apply_diff(self, diff: Dict[str, Any], pairs: Dict[str, Dict[str, Any]], store=None):
+        """
+        Дифф вселенной (src/pipeline/pairs_universe.py) вместо полной переиндексации:
+        трогаются только пары с добавленными / снятыми ногами.
+        pairs — таблица после диффа; store — источник котировок новых ног.
+        """
+        for key, ex, sym in diff["removed"]:
+            index = self._index.get(ex, {})
+            if index.get(sym) != key:
+                continue
+            del index[sym]
+
+            pb = self._pairs.get(key)
+            if pb is not None:
+                pb.remove(ex)
+                self._dirty.add(key)
+
+        for key, ex, sym in diff["added"]:
+            if ex not in self._order:
+                continue
+            self._index.setdefault(ex, {})[sym] = key
+            if key not in self._pairs:
+                self._pairs[key] = self._new_pair(key)
+
+            if store is not None:
+                quote = store.book(ex).get(sym)
+                if quote is not None:
+                    self.on_quote(ex, sym, quote)
+
+        # пара ушла из таблицы целиком
+        for key, _, _ in diff["removed"]:
+            if key not in pairs and self._pairs.pop(key, None) is not None:
+                self._routes.pop(key, None)
+                self._dirty.discard(key)
+
+        self._source = pairs
+
+    def load_books(self, exchanges: Iterable[tuple[str, Dict[str, Any], float]]):
+        """
+        Полные книги [(exchange, quotes, ts)] — REST-режим.
+        """
+        for ex, book, ts in exchanges:
+            for sym, key in self._index.get(ex, {}).items():
+                quote = book.get(sym)
+                if quote is not None:
+                    self._pairs[key].update(ex, quote, quote.get("ts", ts))
+                    self._dirty.add(key)
+
+    # ------------------------------------------------------------------
+    # QuoteStore listener
+    # ------------------------------------------------------------------
+
+    def on_quote(
+        self,
+        exchange: str,
+        symbol: str,
+        quote: Dict[str, Any],
+        ts: float | None = None,
+    ):
+        """
+        ts — время котировки, если в самой котировке его нет (REST).
+        """
+        key = self._index.get(exchange, {}).get(symbol)
+        if key is None:
+            return
+        self._pairs[key].update(exchange, quote, quote["ts"] if ts is None else ts)
+        self._dirty.add(key)
+        self.updates += 1
+
+    def on_discard(self, exchange: str, symbol: str):
+        key = self._index.get(exchange, {}).get(symbol)
+        if key is None:
+            return
+        self._pairs[key].remove(exchange)
+        self._dirty.add(key)
+
+    def on_clear(self, exchange: str):
+        for sym in self._index.get(exchange, {}):
+            self.on_discard(exchange, sym)
+
+    def touch(self, exchange: str, symbol: str, ts: float) -> bool:
+        """
+        Продление метки времени ноги. False — ноги в паре нет
+        (candidate() снял её как устаревшую): нужен on_quote().
+        """
+        key = self._index.get(exchange, {}).get(symbol)
+        if key is None:
+            return False
+        return self._pairs[key].touch(exchange, ts)
+
+    def key_of(self, exchange: str, symbol: str) -> str | None:
+        return self._index.get(exchange, {}).get(symbol)
+
+    def symbols(self, exchange: str) -> Dict[str, str]:
+        """
+        native symbol → key для биржи.
+        """
+        return self._index.get(exchange, {})
+
+    # ------------------------------------------------------------------
+    # Stage-1
+    # ------------------------------------------------------------------
+
+    def _refresh(self, key: str):
+        route = self._pairs[key].route()
+        if route is None:
+            self._routes.pop(key, None)
+        else:
+            self._routes[key] = route
+
+    def take_dirty(self) -> set[str]:
+        """
+        Пары, чьи котировки (или издержки) менялись с прошлого вызова
+        (маршруты обновлены).
+        """
+        self._check_costs()
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            self._refresh(key)
+        return dirty
+
+    def candidate(
+        self,
+        key: str,
+        now: float,
+        max_age_s: float,
+        min_pct: float,
+    ) -> Dict[str, Any] | None:
+        """
+        Кандидат одной пары или None; ноги старше max_age_s выбывают из пары.
+        """
+        pb = self._pairs.get(key)
+        if pb is None:
+            return None
+
+        while True:
+            route = self._routes.get(key)
+            if route is None:
+                return None
+
+            stale = [ex for ex in route if now - pb.quotes[ex][1] > max_age_s]
+            if not stale:
+                break
+
+            for ex in stale:
+                pb.remove(ex)
+            self._refresh(key)
+
+        if pb.net(route, self.costs.buffer_pct) < min_pct:
+            return None
+
+        return self._candidate(pb, route, now)
+
+    def route_age(self, key: str, now: float) -> float | None:
+        """
+        Возраст самой старой ноги текущего маршрута пары (None — маршрута нет).
+        """
+        route = self._routes.get(key)
+        if route is None:
+            return None
+        quotes = self._pairs[key].quotes
+        return now - min(quotes[ex][1] for ex in route)
+
+    def candidates(self, now: float, max_age_s: float, min_pct: float) -> Dict[str, Any]:
+        """
+        Кандидаты Stage-1 по всем парам с маршрутом.
+        Маршруты пересчитываются только у изменившихся пар.
+        """
+        self.take_dirty()
+
+        result: Dict[str, Any] = {}
+        for key in list(self._routes):
+            candidate = self.candidate(key, now, max_age_s, min_pct)
+            if candidate is not None:
+                result[key] = candidate
+
+        return result
+
+    def _candidate(self, pb: PairBests, route: tuple[str, str], now: float) -> Dict[str, Any]:
+        buy, sell = route
+        a, b = (buy, sell) if self._order[buy] < self._order[sell] else (sell, buy)
+
+        qa, ts_a = pb.quotes[a]
+        qb, ts_b = pb.quotes[b]
+
+        a2b = _pct(qa["ask"], qb["bid"])
+        b2a = _pct(qb["ask"], qa["bid"])
+
+        return {
+            "a": a,
+            "b": b,
+            "a_prices": qa,
+            "b_prices": qb,
+            "spread_a2b_pct": round(a2b, 4),
+            "spread_b2a_pct": round(b2a, 4),
+            "best_direction": f"{buy}→{sell}",
+            "best_spread_pct": round(a2b if buy == a else b2a, 4),
+            "net_spread_pct": round(pb.net(route, self.costs.buffer_pct), 4),
+            "a_age_s": round(now - ts_a, 3),
+            "b_age_s": round(now - ts_b, 3),
+        }
+
+
+def candidates_tracker(
+    pairs: Dict[str, Dict[str, Any]],
+    exchanges: list,
+    now: float,
+    max_age_s: float,
+    min_pct: float,
+    costs: RouteCostMatrix | None = None,
+) -> Dict[str, Any]:
+    """
+    Движок Stage-1 для REST-режима: полные книги → трекер → кандидаты.
+    """
+    tracker = RouteTracker([name for name, _, _ in exchanges], costs)
+    tracker.set_pairs(pairs)
+    tracker.load_books(exchanges)
+    return tracker.candidates(now, max_age_s, min_pct)
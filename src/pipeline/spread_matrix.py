@@ -0,0 +1,214 @@
+"""
+spread_matrix — векторный расчёт кандидатов Stage-1 (NumPy)
+
+Вместо двойного Python-цикла по биржам каждой пары:
+• bid / ask собираются в матрицы (pairs × exchanges), NaN — ноги нет
+• все направленные спреды всех пар бирж считаются одним проходом
+• на пару выбирается лучший маршрут по ЧИСТОМУ спреду (комиссии taker и
+  буфер — src/pipeline/route_costs.py) не ниже порога
+
+Результат совпадает с Python-циклом Stage-1 (_candidates_python) точно:
+• те же операции float64 в том же порядке:
+  (bid * sell_mult - ask * buy_mult) / (ask * buy_mult) * 100 - buffer
+• направление пары бирж: A→B, если net_a2b >= net_b2a
+• между маршрутами сравниваются ОКРУГЛЁННЫЕ до 4 знаков чистые спреды,
+  при равенстве побеждает первый (i, j) — близкие к максимуму маршруты
+  (в пределах шага округления) добираются Python-кодом
+
+Замер против цикла: python -m benchmarks.bench_spread_matrix
+"""
+
+from typing import Dict, Any
+
+import numpy as np
+
+from src.pipeline.route_costs import RouteCostMatrix, NO_COSTS
+
+
+# шаг округления best_spread_pct (4 знака) с запасом на погрешность float
+_TIE_EPS = 1.5e-4
+
+_NAN = float("nan")
+
+
+def build_quote_matrix(
+    pairs: Dict[str, Dict[str, Any]],
+    exchanges: list,
+    now: float,
+    max_age_s: float,
+):
+    """
+    exchanges — [(name, book, ts)] как у загрузчиков Stage-1.
+
+    Возвращает keys, quotes, ages, bid, ask, valid:
+      quotes[p][e] — dict котировки или None, ages[p][e] — возраст ноги,
+      bid / ask — float64 (P × E), valid — нога есть и внутри окна свежести.
+    """
+    keys = list(pairs)
+    n_ex = len(exchanges)
+
+    quotes, ages, bids, asks = [], [], [], []
+
+    for key in keys:
+        mapping = pairs[key]
+        q_row = [None] * n_ex
+        age_row = [_NAN] * n_ex
+        bid_row = [_NAN] * n_ex
+        ask_row = [_NAN] * n_ex
+
+        for e, (name, book, ts) in enumerate(exchanges):
+            sym = mapping.get(name)
+            if not sym:
+                continue
+            q = book.get(sym)
+            if q is None:
+                continue
+
+            age = now - q.get("ts", ts)
+            if age > max_age_s:
+                continue
+
+            q_row[e] = q
+            age_row[e] = age
+            bid_row[e] = q["bid"]
+            ask_row[e] = q["ask"]
+
+        quotes.append(q_row)
+        ages.append(age_row)
+        bids.append(bid_row)
+        asks.append(ask_row)
+
+    bid = np.array(bids, dtype=np.float64).reshape(len(keys), n_ex)
+    ask = np.array(asks, dtype=np.float64).reshape(len(keys), n_ex)
+    valid = ~(np.isnan(bid) | np.isnan(ask))
+
+    return keys, quotes, ages, bid, ask, valid
+
+
+def _gross(buy: np.ndarray, sell: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(buy > 0, (sell - buy) / buy * 100.0, 0.0)
+
+
+def best_routes(
+    bid: np.ndarray,
+    ask: np.ndarray,
+    valid: np.ndarray,
+    min_pct: float,
+    buy_mult: np.ndarray | None = None,
+    sell_mult: np.ndarray | None = None,
+    buffer_pct: float = 0.0,
+):
+    """
+    Лучший маршрут каждой пары по чистому спреду >= min_pct.
+    buy_mult / sell_mult — множители ног (P × E или 1 × E, RouteCostMatrix.leg_mults);
+    None — без издержек (чистый спред = «грязный»).
+
+    Возвращает (rows, ii, jj, a2b, b2a, best, forward, net):
+      rows — индексы пар, у которых есть маршрут,
+      ii / jj — биржи A / B маршрута (i < j),
+      a2b / b2a / best — «грязные» спреды маршрута, forward — направление A→B,
+      net — чистый спред выбранного направления.
+    """
+    n_pairs, n_ex = bid.shape
+    ii, jj = np.triu_indices(n_ex, k=1)        # (0,1), (0,2) … — порядок цикла
+
+    if buy_mult is None:
+        buy_mult = sell_mult = np.ones((1, n_ex))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        a_cost = ask[:, ii] * buy_mult[:, ii]
+        b_cost = ask[:, jj] * buy_mult[:, jj]
+        a2b = np.where(a_cost > 0, (bid[:, jj] * sell_mult[:, jj] - a_cost) / a_cost * 100.0 - buffer_pct, 0.0)
+        b2a = np.where(b_cost > 0, (bid[:, ii] * sell_mult[:, ii] - b_cost) / b_cost * 100.0 - buffer_pct, 0.0)
+
+    forward = a2b >= b2a
+    best = np.where(forward, a2b, b2a)
+
+    ok = valid[:, ii] & valid[:, jj] & (best >= min_pct)
+    masked = np.where(ok, best, -np.inf)
+
+    top = masked.max(axis=1) if masked.shape[1] else np.full(n_pairs, -np.inf)
+    rows = np.flatnonzero(np.isfinite(top))
+
+    sub = masked[rows]
+    win = sub.argmax(axis=1)
+
+    # несколько маршрутов в пределах шага округления — решает round() как в цикле
+    near = sub >= (top[rows] - _TIE_EPS)[:, None]
+    for r in np.flatnonzero(near.sum(axis=1) > 1):
+        cand = np.flatnonzero(near[r])
+        rounded = [round(float(sub[r, k]), 4) for k in cand]
+        win[r] = cand[rounded.index(max(rounded))]
+
+    i_win, j_win = ii[win], jj[win]
+    fwd = forward[rows, win]
+
+    # «грязные» спреды — только у выбранных маршрутов
+    g_a2b = _gross(ask[rows, i_win], bid[rows, j_win])
+    g_b2a = _gross(ask[rows, j_win], bid[rows, i_win])
+
+    return (
+        rows,
+        i_win,
+        j_win,
+        g_a2b,
+        g_b2a,
+        np.where(fwd, g_a2b, g_b2a),
+        fwd,
+        best[rows, win],
+    )
+
+
+def candidates_numpy(
+    pairs: Dict[str, Dict[str, Any]],
+    exchanges: list,
+    now: float,
+    max_age_s: float,
+    min_pct: float,
+    costs: RouteCostMatrix | None = None,
+) -> Dict[str, Any]:
+    """
+    Те же кандидаты, что и Python-цикл Stage-1, одним векторным проходом.
+    min_pct — порог чистого спреда; costs — издержки маршрутов (None — без них).
+    """
+    if not pairs or len(exchanges) < 2:
+        return {}
+
+    if costs is None:
+        costs = NO_COSTS
+
+    keys, quotes, ages, bid, ask, valid = build_quote_matrix(
+        pairs, exchanges, now, max_age_s,
+    )
+    buy_mult, sell_mult = costs.leg_mults([name for name, _, _ in exchanges], keys)
+    rows, ii, jj, a2b, b2a, best, forward, net = best_routes(
+        bid, ask, valid, min_pct, buy_mult, sell_mult, costs.buffer_pct,
+    )
+
+    result: Dict[str, Any] = {}
+
+    for n, p in enumerate(rows.tolist()):
+        i, j = int(ii[n]), int(jj[n])
+        a_name, b_name = exchanges[i][0], exchanges[j][0]
+
+        if forward[n]:
+            direction = f"{a_name}→{b_name}"
+        else:
+            direction = f"{b_name}→{a_name}"
+
+        result[keys[p]] = {
+            "a": a_name,
+            "b": b_name,
+            "a_prices": quotes[p][i],
+            "b_prices": quotes[p][j],
+            "spread_a2b_pct": round(float(a2b[n]), 4),
+            "spread_b2a_pct": round(float(b2a[n]), 4),
+            "best_direction": direction,
+            "best_spread_pct": round(float(best[n]), 4),
+            "net_spread_pct": round(float(net[n]), 4),
+            "a_age_s": round(ages[p][i], 3),
+            "b_age_s": round(ages[p][j], 3),
+        }
+
+    return result
@@ -0,0 +1,235 @@
+"""
+stage_one_incremental — событийный Stage-1
+
+Полный срез пересчитывает все пары на каждом цикле, хотя между опросами
+двигается малая часть котировок. Здесь:
+
+• на каждую ногу (exchange, symbol) хранится последняя оценённая котировка L1:
+  bid / ask и их объёмы (объёмы уходят в сигнал — по ним Stage-2 подтверждает
+  сделку без стакана)
+• REST-опрос: котировка без изменений только продлевает свою метку времени,
+  изменившиеся уходят в RouteTracker и помечают пару; нога, которую трекер
+  снял как устаревшую, возвращается первой же свежей котировкой, даже той же
+• стрим: объект — слушатель QuoteStore, фильтр тот же
+• evaluate() пересчитывает только помеченные пары + открытые сигналы,
+  у которых устарела нога, и отдаёт события вместо полного среза:
+
+    opened  — пара впервые прошла порог чистого спреда (STAGE1_MIN_NET_PROFIT_PCT)
+    updated — у открытого сигнала сменился маршрут, округлённый спред
+              или объём L1 исполнимой стороны (ask покупки / bid продажи)
+    closed  — сигнал больше не проходит (спред, ноги устарели, пара ушла)
+
+Смена вселенной Stage-0 — apply_diff() (src/pipeline/pairs_universe.py):
+остальные пары и открытые сигналы не сбрасываются.
+
+Работа за цикл растёт с активностью рынка, а не с размером вселенной
+(разбор REST-ответа по-прежнему O(вселенной) — это цена опроса).
+"""
+
+import time
+from typing import Dict, Any, Iterable, Sequence
+
+from src.config import STAGE1_MIN_NET_PROFIT_PCT, STAGE1_MAX_QUOTE_AGE_S
+
+from src.pipeline.route_tracker import RouteTracker
+from src.pipeline.route_costs import RouteCostMatrix, ROUTE_COSTS
+
+
+OPENED = "opened"
+UPDATED = "updated"
+CLOSED = "closed"
+
+
+class IncrementalStageOne:
+
+    def __init__(
+        self,
+        exchanges: Sequence[str],
+        min_pct: float = STAGE1_MIN_NET_PROFIT_PCT,
+        max_age_s: float = STAGE1_MAX_QUOTE_AGE_S,
+        costs: RouteCostMatrix = ROUTE_COSTS,
+    ):
+        self.tracker = RouteTracker(exchanges, costs)
+        self.min_pct = min_pct
+        self.max_age_s = max_age_s
+
+        self._pairs: Dict[str, Dict[str, Any]] | None = None
+        # (exchange, symbol) → (bid, ask, bid_size, ask_size) последней оценки
+        self._last: Dict[tuple[str, str], tuple] = {}
+        # key → кандидат открытого сигнала
+        self._open: Dict[str, Dict[str, Any]] = {}
+        # пары, ушедшие из вселенной с открытым сигналом
+        self._gone: list[str] = []
+
+        self.rescored = 0
+
+    @property
+    def open_signals(self) -> Dict[str, Dict[str, Any]]:
+        return self._open
+
+    # ------------------------------------------------------------------
+    # universe
+    # ------------------------------------------------------------------
+
+    def set_pairs(self, pairs: Dict[str, Dict[str, Any]], store=None):
+        """
+        Новая таблица пар Stage-0 (та же — ничего не делает).
+        Котировки засеваются заново: из store (стрим) или следующим feed_books.
+        """
+        if pairs is self._pairs:
+            return
+
+        self._pairs = pairs
+        self._last.clear()
+        self._gone.extend(k for k in self._open if k not in pairs)
+
+        self.tracker.set_pairs(pairs)
+        if store is not None:
+            for ex in self.tracker.exchanges:
+                book = store.book(ex)
+                for sym in self.tracker.symbols(ex):
+                    quote = book.get(sym)
+                    if quote is not None:
+                        self.on_quote(ex, sym, quote)
+
+    def apply_diff(self, diff: Dict[str, Any], pairs: Dict[str, Dict[str, Any]], store=None):
+        """
+        Дифф вселенной: состояние остальных пар и открытые сигналы сохраняются.
+        Пара, потерявшая ногу, пересчитывается в следующем evaluate().
+        """
+        if pairs is self._pairs and not diff["added"] and not diff["removed"]:
+            return
+
+        for key, ex, sym in diff["removed"]:
+            self._last.pop((ex, sym), None)
+            if key in self._open and key not in pairs and key not in self._gone:
+                self._gone.append(key)
+
+        self.tracker.apply_diff(diff, pairs)
+        self._pairs = pairs
+
+        if store is not None:
+            for key, ex, sym in diff["added"]:
+                quote = store.book(ex).get(sym)
+                if quote is not None:
+                    self.on_quote(ex, sym, quote)
+
+    # ------------------------------------------------------------------
+    # inputs
+    # ------------------------------------------------------------------
+
+    def _changed(self, exchange: str, symbol: str, quote: Dict[str, Any]) -> bool:
+        leg = (exchange, symbol)
+        l1 = (quote["bid"], quote["ask"], quote.get("bid_size"), quote.get("ask_size"))
+        if self._last.get(leg) == l1:
+            return False
+        self._last[leg] = l1
+        return True
+
+    def feed_books(self, exchanges: Iterable[tuple[str, Dict[str, Any], float]]):
+        """
+        REST: полные книги [(exchange, quotes, ts)] очередного опроса.
+        """
+        tracker = self.tracker
+
+        for ex, book, ts in exchanges:
+            for sym in tracker.symbols(ex):
+                quote = book.get(sym)
+
+                if quote is None:
+                    if self._last.pop((ex, sym), None) is not None:
+                        tracker.on_discard(ex, sym)
+                    continue
+
+                quote_ts = quote.get("ts", ts)
+                if self._changed(ex, sym, quote) or not tracker.touch(ex, sym, quote_ts):
+                    tracker.on_quote(ex, sym, quote, ts=quote_ts)
+
+    # --- QuoteStore listener ------------------------------------------
+
+    def on_quote(self, exchange: str, symbol: str, quote: Dict[str, Any]):
+        if self.tracker.key_of(exchange, symbol) is None:
+            return
+        tracker = self.tracker
+        if self._changed(exchange, symbol, quote) or not tracker.touch(exchange, symbol, quote["ts"]):
+            tracker.on_quote(exchange, symbol, quote)
+
+    def on_discard(self, exchange: str, symbol: str):
+        self._last.pop((exchange, symbol), None)
+        self.tracker.on_discard(exchange, symbol)
+
+    def on_clear(self, exchange: str):
+        for sym in self.tracker.symbols(exchange):
+            self.on_discard(exchange, sym)
+
+    # ------------------------------------------------------------------
+    # events
+    # ------------------------------------------------------------------
+
+    def evaluate(self, now: float | None = None) -> list[Dict[str, Any]]:
+        """
+        События сигналов с прошлого вызова:
+        {"event", "pair", "candidate", "ts"}; у closed — последний кандидат.
+        """
+        if now is None:
+            now = time.time()
+
+        events: list[Dict[str, Any]] = []
+
+        for key in self._gone:
+            prev = self._open.pop(key, None)
+            if prev is not None:
+                events.append(_event(CLOSED, key, prev, now))
+        self._gone.clear()
+
+        tracker = self.tracker
+        keys = tracker.take_dirty()
+
+        # открытый сигнал без новых котировок — только проверка возраста ног
+        for key in self._open:
+            if key not in keys:
+                age = tracker.route_age(key, now)
+                if age is None or age > self.max_age_s:
+                    keys.add(key)
+
+        self.rescored += len(keys)
+
+        for key in keys:
+            cand = tracker.candidate(key, now, self.max_age_s, self.min_pct)
+            prev = self._open.get(key)
+
+            if cand is None:
+                if prev is not None:
+                    del self._open[key]
+                    events.append(_event(CLOSED, key, prev, now))
+                continue
+
+            if prev is None:
+                self._open[key] = cand
+                events.append(_event(OPENED, key, cand, now))
+                continue
+
+            self._open[key] = cand
+            if (
+                cand["best_direction"] != prev["best_direction"]
+                or cand["best_spread_pct"] != prev["best_spread_pct"]
+                or _route_sizes(cand) != _route_sizes(prev)
+            ):
+                events.append(_event(UPDATED, key, cand, now))
+
+        return events
+
+
+def _route_sizes(candidate: Dict[str, Any]) -> tuple:
+    """
+    Объёмы L1, по которым исполняется маршрут: ask ноги покупки, bid ноги продажи.
+    """
+    buy = candidate["best_direction"].split("→", 1)[0]
+    qa, qb = candidate["a_prices"], candidate["b_prices"]
+    if buy == candidate["a"]:
+        return qa.get("ask_size"), qb.get("bid_size")
+    return qb.get("ask_size"), qa.get("bid_size")
+
+
+def _event(kind: str, key: str, candidate: Dict[str, Any], now: float) -> Dict[str, Any]:
+    return {"event": kind, "pair": key, "candidate": candidate, "ts": now}
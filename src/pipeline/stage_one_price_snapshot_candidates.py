@@ -3,19 +3,59 @@ stage_one — Price snapshot + spread candidates (multi-exchange)
 
 • получает bid/ask по биржам
 • сопоставляет символы через snapshot Stage-0
-• считает спреды в обе стороны
-• выбирает лучшее направление
-• фильтрует по MIN_PROFIT_PCT
+• считает спреды в обе стороны — «грязные» и чистые (комиссии taker + буфер,
+  матрица издержек src/pipeline/route_costs.py)
+• выбирает лучшее направление по чистому спреду
+• фильтрует по STAGE1_MIN_NET_PROFIT_PCT
 • возвращает кандидатов для Stage-2
 
 Stage-1 НЕ строит список пар.
 Пары передаются извне (результат Stage-0).
+
+Источник котировок:
+• REST — полные тикеры бирж на каждом цикле (по умолчанию)
+• стрим — QuoteStore, который держат WebSocket-стримы (src/streams/)
+
+Цикл ограничен дедлайном (STAGE1_DEADLINE_S):
+• не успевшая / упавшая биржа участвует последними известными котировками
+  (stale), если они моложе STAGE1_MAX_QUOTE_AGE_S, иначе исключается (missing)
+• спреды считаются только между ногами внутри окна свежести
+• результат — StageOneSnapshot: кандидаты + .status / .ages по биржам
+
+Кандидаты считает движок STAGE1_SPREAD_ENGINE:
+• numpy   — матрица спредов (src/pipeline/spread_matrix.py)
+• columnar — та же матрица на переиспользуемых столбцах (src/pipeline/columnar_quotes.py)
+• tracker — best / second-best bid и ask на пару (src/pipeline/route_tracker.py)
+• python  — эталонный двойной цикл (_candidates_python), результат тот же
+В режиме стрима с RouteTracker маршруты ведутся по каждому обновлению котировки.
+
+build_stage_one_events — инкрементальный режим (src/pipeline/stage_one_incremental.py):
+пересчитываются только пары с изменившимися котировками,
+результат — события opened / updated / closed.
+
+ticker_cache (src/exchanges/ticker_cache.py) — Bybit / OKX / Gate / KuCoin
+читаются из общего с Stage-0 снимка тикеров, не старше
+TICKER_CACHE_STAGE1_MAX_AGE_S.
+
+REST-загрузчики разбирают только символы активного универсума
+(_universe_index: exchange → frozenset нативных символов, пересобирается
+при смене таблицы пар Stage-0) — остальные строки ответа отбрасываются
+до преобразования в float.
 """
 
 import asyncio
-from typing import Dict, Any
-
-from src.config import MIN_PROFIT_PCT
+import time
+from functools import partial
+from typing import Dict, Any, Container
+
+from src.config import (
+    STAGE1_MIN_NET_PROFIT_PCT,
+    FAST_DECODE_ENABLED,
+    STAGE1_DEADLINE_S,
+    STAGE1_MAX_QUOTE_AGE_S,
+    STAGE1_SPREAD_ENGINE,
+    TICKER_CACHE_STAGE1_MAX_AGE_S,
+)
 
 from src.exchanges.binance.binance_market import fetch_book_tickers_raw
 from src.exchanges.bybit.bybit_market import fetch_tickers_raw
@@ -23,6 +63,19 @@ from src.exchanges.okx.okx_market import fetch_tickers_raw as okx_fetch_tickers_
 from src.exchanges.gate.gate_market import fetch_tickers_raw as gate_fetch_tickers_raw
 from src.exchanges.kucoin.kucoin_market import fetch_tickers_raw as kucoin_fetch_tickers_raw
 
+from src.exchanges import decoders
+from src.exchanges.ticker_cache import TickerCache
+from src.pipeline.spread_matrix import candidates_numpy
+from src.pipeline.columnar_quotes import candidates_columnar
+from src.pipeline.route_tracker import RouteTracker, candidates_tracker
+from src.pipeline.route_costs import RouteCostMatrix, NO_COSTS, ROUTE_COSTS, net_pct
+from src.pipeline.stage_one_incremental import IncrementalStageOne
+from src.streams.quote_store import QuoteStore
+
+
+# схемные декодеры сразу отдают {symbol: quote} — цикл разбора не нужен
+_FAST_DECODE = FAST_DECODE_ENABLED and decoders.AVAILABLE
+
 
 # -------------------------------------------------------------------------
 # helpers
@@ -34,34 +87,18 @@ def _pct(buy: float, sell: float) -> float:
     return (sell - buy) / buy * 100.0
 
 
-def _best_spread(a_bid, a_ask, b_bid, b_ask):
-    """
-    Возвращает:
-      direction  — "A→B" или "B→A"
-      best_pct   — максимальный спред
-      a2b_pct    — спред A→B
-      b2a_pct    — спред B→A
-    """
-    s_a2b = _pct(a_ask, b_bid)
-    s_b2a = _pct(b_ask, a_bid)
-
-    if s_a2b >= s_b2a:
-        return "A→B", s_a2b, s_a2b, s_b2a
-
-    return "B→A", s_b2a, s_a2b, s_b2a
-
-
 # -------------------------------------------------------------------------
 # exchange loaders
 # -------------------------------------------------------------------------
 
-async def _load_binance() -> Dict[str, Any]:
-    raw = await fetch_book_tickers_raw()
+def _parse_binance(raw: list, universe: Container[str] | None = None) -> Dict[str, Any]:
     out = {}
     for it in raw:
         s = it.get("symbol")
         if not s:
             continue
+        if universe is not None and s not in universe:
+            continue
         out[s] = {
             "bid": float(it["bidPrice"]),
             "ask": float(it["askPrice"]),
@@ -71,13 +108,22 @@ async def _load_binance() -> Dict[str, Any]:
     return out
 
 
-async def _load_bybit() -> Dict[str, Any]:
-    raw = await fetch_tickers_raw("spot")
+async def _load_binance(universe: Container[str] | None = None) -> Dict[str, Any]:
+    if _FAST_DECODE:
+        return await fetch_book_tickers_raw(
+            decoder=partial(decoders.decode_binance_quotes, universe=universe),
+        )
+    return _parse_binance(await fetch_book_tickers_raw(), universe)
+
+
+def _parse_bybit(raw: list, universe: Container[str] | None = None) -> Dict[str, Any]:
     out = {}
     for it in raw:
         s = it.get("symbol")
         if not s:
             continue
+        if universe is not None and s not in universe:
+            continue
         out[s] = {
             "bid": float(it["bid1Price"]),
             "ask": float(it["ask1Price"]),
@@ -87,13 +133,22 @@ async def _load_bybit() -> Dict[str, Any]:
     return out
 
 
-async def _load_okx() -> Dict[str, Any]:
-    raw = await okx_fetch_tickers_raw()
+async def _load_bybit(universe: Container[str] | None = None) -> Dict[str, Any]:
+    if _FAST_DECODE:
+        return await fetch_tickers_raw(
+            "spot", decoder=partial(decoders.decode_bybit_quotes, universe=universe),
+        )
+    return _parse_bybit(await fetch_tickers_raw("spot"), universe)
+
+
+def _parse_okx(raw: list, universe: Container[str] | None = None) -> Dict[str, Any]:
     out = {}
     for it in raw:
         s = it.get("instId")
         if not s:
             continue
+        if universe is not None and s not in universe:
+            continue
         out[s] = {
             "bid": float(it["bidPx"]),
             "ask": float(it["askPx"]),
@@ -103,16 +158,25 @@ async def _load_okx() -> Dict[str, Any]:
     return out
 
 
-async def _load_gate() -> Dict[str, Any]:
+async def _load_okx(universe: Container[str] | None = None) -> Dict[str, Any]:
+    if _FAST_DECODE:
+        return await okx_fetch_tickers_raw(
+            decoder=partial(decoders.decode_okx_quotes, universe=universe),
+        )
+    return _parse_okx(await okx_fetch_tickers_raw(), universe)
+
+
+def _parse_gate(raw: list, universe: Container[str] | None = None) -> Dict[str, Any]:
     """
     Gate.io иногда отдаёт пустые строки — считаем рынок неактивным.
     """
-    raw = await gate_fetch_tickers_raw()
     out = {}
     for it in raw:
         s = it.get("currency_pair")
         if not s:
             continue
+        if universe is not None and s not in universe:
+            continue
 
         bid = it.get("highest_bid")
         ask = it.get("lowest_ask")
@@ -122,23 +186,33 @@ async def _load_gate() -> Dict[str, Any]:
         out[s] = {
             "bid": float(bid),
             "ask": float(ask),
-            "bid_size": float(it.get("base_volume", 0) or 0),
-            "ask_size": float(it.get("quote_volume", 0) or 0),
+            # объёмы лучших уровней, не 24h-оборот (base_volume / quote_volume)
+            "bid_size": float(it.get("highest_size", 0) or 0),
+            "ask_size": float(it.get("lowest_size", 0) or 0),
         }
     return out
 
 
-async def _load_kucoin() -> Dict[str, Any]:
+async def _load_gate(universe: Container[str] | None = None) -> Dict[str, Any]:
+    if _FAST_DECODE:
+        return await gate_fetch_tickers_raw(
+            decoder=partial(decoders.decode_gate_quotes, universe=universe),
+        )
+    return _parse_gate(await gate_fetch_tickers_raw(), universe)
+
+
+def _parse_kucoin(raw: list, universe: Container[str] | None = None) -> Dict[str, Any]:
     """
     KuCoin может отдавать None для неактивных рынков.
     Такие пары пропускаем.
     """
-    raw = await kucoin_fetch_tickers_raw()
     out = {}
     for it in raw:
         s = it.get("symbol")
         if not s:
             continue
+        if universe is not None and s not in universe:
+            continue
 
         bid = it.get("buy")
         ask = it.get("sell")
@@ -154,40 +228,276 @@ async def _load_kucoin() -> Dict[str, Any]:
     return out
 
 
+async def _load_kucoin(universe: Container[str] | None = None) -> Dict[str, Any]:
+    if _FAST_DECODE:
+        return await kucoin_fetch_tickers_raw(
+            decoder=partial(decoders.decode_kucoin_quotes, universe=universe),
+        )
+    return _parse_kucoin(await kucoin_fetch_tickers_raw(), universe)
+
+
+# -------------------------------------------------------------------------
+# source status
+# -------------------------------------------------------------------------
+
+EXCHANGES = ("binance", "bybit", "okx", "gate", "kucoin")
+
+LOADERS = {
+    "binance": _load_binance,
+    "bybit":   _load_bybit,
+    "okx":     _load_okx,
+    "gate":    _load_gate,
+    "kucoin":  _load_kucoin,
+}
+
+# разбор сырых строк тикеров (путь без быстрых декодеров)
+PARSERS = {
+    "binance": _parse_binance,
+    "bybit":   _parse_bybit,
+    "okx":     _parse_okx,
+    "gate":    _parse_gate,
+    "kucoin":  _parse_kucoin,
+}
+
+
+async def _load_cached(
+    name: str,
+    tickers: TickerCache,
+    universe: Container[str] | None = None,
+) -> tuple[float, Dict[str, Any]]:
+    """
+    Котировки из общего с Stage-0 снимка тикеров.
+    Время котировок — время ответа биржи, а не момент чтения кэша.
+    """
+    ts, body = await tickers.get(name, TICKER_CACHE_STAGE1_MAX_AGE_S)
+    if _FAST_DECODE:
+        return ts, decoders.QUOTE_DECODERS[name](body, universe)
+    return ts, PARSERS[name](decoders.TICKER_DECODERS[name](body), universe)
+
+
+async def _stamped(coro) -> tuple[float, Dict[str, Any]]:
+    book = await coro
+    return time.time(), book
+
+
+FRESH = "fresh"        # ответ получен в этом цикле
+STALE = "stale"        # последние известные котировки внутри окна свежести
+MISSING = "missing"    # котировок нет или они старше окна
+
+
+class _SourceStatus:
+    """
+    Состояние источников цикла:
+      status — exchange → fresh / stale / missing
+      ages   — exchange → возраст котировок в секундах (None — котировок нет)
+    """
+
+    def __init__(self, *args, status=None, ages=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.status: Dict[str, str] = status or {}
+        self.ages: Dict[str, float | None] = ages or {}
+
+    def degraded(self) -> Dict[str, str]:
+        return {ex: st for ex, st in self.status.items() if st != FRESH}
+
+
+class StageOneSnapshot(_SourceStatus, dict):
+    """
+    Кандидаты Stage-1: key → candidate.
+    """
+
+
+class StageOneEvents(_SourceStatus, list):
+    """
+    События инкрементального Stage-1: opened / updated / closed.
+    """
+
+
+# exchange → (время получения, котировки) последнего успешного REST-ответа
+_last_books: Dict[str, tuple[float, Dict[str, Any]]] = {}
+
+# exchange → незавершённый запрос; переживает дедлайн и дополняет кэш
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _on_loaded(name: str, task: asyncio.Task):
+    if _inflight.get(name) is task:
+        del _inflight[name]
+
+    if task.cancelled():
+        return
+
+    err = task.exception()
+    if err is not None:
+        print(f"[Stage1][WARN] {name}: {type(err).__name__}: {err}")
+        return
+
+    _last_books[name] = task.result()
+
+
+def _classify(
+    ts: float | None,
+    now: float,
+    fresh_after: float,
+    max_age_s: float,
+) -> tuple[str, float | None]:
+    if ts is None:
+        return MISSING, None
+
+    age = now - ts
+    if ts >= fresh_after:
+        return FRESH, age
+    if age <= max_age_s:
+        return STALE, age
+    return MISSING, age
+
+
+# -------------------------------------------------------------------------
+# active universe
+# -------------------------------------------------------------------------
+
+# (таблица пар Stage-0, exchange → нативные символы этой таблицы)
+_universe: tuple[Dict[str, Dict[str, Any]] | None, Dict[str, frozenset]] = (None, {})
+
+
+def _universe_index(pairs: Dict[str, Dict[str, Any]]) -> Dict[str, frozenset]:
+    """
+    exchange → frozenset нативных символов активного универсума.
+    Пересобирается только при смене таблицы пар (сравнение по identity).
+    """
+    global _universe
+
+    source, index = _universe
+    if pairs is source:
+        return index
+
+    symbols: Dict[str, set] = {name: set() for name in EXCHANGES}
+    for mapping in pairs.values():
+        for name, sym in mapping.items():
+            if sym and name in symbols:
+                symbols[name].add(sym)
+
+    index = {name: frozenset(syms) for name, syms in symbols.items()}
+    _universe = (pairs, index)
+    return index
+
+
 # -------------------------------------------------------------------------
 # main pipeline
 # -------------------------------------------------------------------------
 
-async def build_stage_one_snapshot(
-    pairs: Dict[str, Dict[str, Any]],
-) -> Dict[str, Any]:
+BookEntry = tuple[str, Dict[str, Any], float]     # (exchange, quotes, ts котировок)
 
-    if not pairs:
-        return {}
 
-    binance, bybit, okx, gate, kucoin = await asyncio.gather(
-        _load_binance(),
-        _load_bybit(),
-        _load_okx(),
-        _load_gate(),
-        _load_kucoin(),
-    )
+async def _load_books_rest(
+    deadline_s: float,
+    max_age_s: float,
+    universes: Dict[str, frozenset] | None = None,
+    tickers: TickerCache | None = None,
+) -> tuple[list[BookEntry], Dict[str, str], Dict[str, float | None]]:
+    """
+    universes — exchange → символы активного универсума; остальные строки
+    ответа отбрасываются до разбора (кэш хранит только символы универсума).
+
+    tickers — общий с Stage-0 кэш тикеров: его биржи читаются через него.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.time()
+
+    tasks = []
+    for name in EXCHANGES:
+        task = _inflight.get(name)
+        # запрос прошлого цикла ещё идёт — не дублируем
+        if task is None or task.done() or task.get_loop() is not loop:
+            universe = universes.get(name) if universes else None
+            if tickers is not None and name in tickers.exchanges:
+                coro = _load_cached(name, tickers, universe)
+            else:
+                coro = _stamped(LOADERS[name](universe))
+            task = loop.create_task(coro)
+            task.add_done_callback(partial(_on_loaded, name))
+            _inflight[name] = task
+        tasks.append(task)
+
+    # _on_loaded зарегистрирован раньше wait — кэш уже обновлён к возврату
+    await asyncio.wait(tasks, timeout=deadline_s)
+
+    now = time.time()
+    books, status, ages = [], {}, {}
+
+    for name in EXCHANGES:
+        ts, book = _last_books.get(name, (None, None))
+        # переиспользованный снимок кэша тикеров в пределах допуска — тоже fresh
+        fresh_after = started
+        if tickers is not None and name in tickers.exchanges:
+            fresh_after -= TICKER_CACHE_STAGE1_MAX_AGE_S
+        status[name], ages[name] = _classify(ts, now, fresh_after, max_age_s)
+        if status[name] != MISSING:
+            books.append((name, book, ts))
+
+    return books, status, ages
+
+
+def _stream_status(
+    store: QuoteStore,
+    deadline_s: float,
+    max_age_s: float,
+) -> tuple[Dict[str, str], Dict[str, float | None]]:
+    """
+    Стрим без дедлайна: биржа fresh, если обновлялась не дольше deadline_s назад.
+    """
+    now = time.time()
+    status, ages = {}, {}
+
+    for name in EXCHANGES:
+        ts = store.last_update(name)
+        status[name], ages[name] = _classify(ts, now, now - deadline_s, max_age_s)
 
-    result: Dict[str, Any] = {}
+    return status, ages
+
+
+def _load_books_stream(
+    store: QuoteStore,
+    deadline_s: float,
+    max_age_s: float,
+) -> tuple[list[BookEntry], Dict[str, str], Dict[str, float | None]]:
+    """
+    Отдельные котировки старше окна свежести отбрасываются.
+    """
+    status, ages = _stream_status(store, deadline_s, max_age_s)
 
-    exchanges = [
-        ("binance", binance),
-        ("bybit",   bybit),
-        ("okx",     okx),
-        ("gate",    gate),
-        ("kucoin",  kucoin),
+    books = [
+        (name, store.book(name, max_age_s=max_age_s), store.last_update(name))
+        for name in EXCHANGES
+        if status[name] != MISSING
     ]
 
+    return books, status, ages
+
+
+def _candidates_python(
+    pairs: Dict[str, Dict[str, Any]],
+    exchanges: list[BookEntry],
+    now: float,
+    max_age_s: float,
+    min_pct: float,
+    costs: RouteCostMatrix | None = None,
+) -> Dict[str, Any]:
+    """
+    Эталонный цикл: все пары бирж каждой пары, лучший маршрут по чистому спреду.
+    """
+    if costs is None:
+        costs = NO_COSTS
+
+    buffer = costs.buffer_pct
+    result: Dict[str, Any] = {}
+
     for key, mapping in pairs.items():
+        mults = costs.pair_mults(key)
 
         present = [
-            (name, mapping.get(name), book)
-            for name, book in exchanges
+            (name, mapping.get(name), book, ts)
+            for name, book, ts in exchanges
             if mapping.get(name) and mapping.get(name) in book
         ]
 
@@ -198,19 +508,36 @@ async def build_stage_one_snapshot(
 
         for i in range(len(present)):
             for j in range(i + 1, len(present)):
-                a_name, a_sym, a_book = present[i]
-                b_name, b_sym, b_book = present[j]
+                a_name, a_sym, a_book, a_ts = present[i]
+                b_name, b_sym, b_book, b_ts = present[j]
 
                 a = a_book[a_sym]
                 b = b_book[b_sym]
 
-                direction, best_pct, a2b, b2a = _best_spread(
-                    a["bid"], a["ask"], b["bid"], b["ask"]
+                # возраст ноги: своя метка котировки (стрим) или время ответа биржи
+                a_age = now - a.get("ts", a_ts)
+                b_age = now - b.get("ts", b_ts)
+                if a_age > max_age_s or b_age > max_age_s:
+                    continue
+
+                n_a2b = net_pct(
+                    a["ask"], b["bid"],
+                    costs.buy_mult(a_name, mults), costs.sell_mult(b_name, mults), buffer,
+                )
+                n_b2a = net_pct(
+                    b["ask"], a["bid"],
+                    costs.buy_mult(b_name, mults), costs.sell_mult(a_name, mults), buffer,
                 )
+                forward = n_a2b >= n_b2a
+                net = n_a2b if forward else n_b2a
 
-                if best_pct < MIN_PROFIT_PCT:
+                if net < min_pct:
                     continue
 
+                a2b = _pct(a["ask"], b["bid"])
+                b2a = _pct(b["ask"], a["bid"])
+                direction = "A→B" if forward else "B→A"
+
                 candidate = {
                     "a": a_name,
                     "b": b_name,
@@ -219,12 +546,15 @@ async def build_stage_one_snapshot(
                     "spread_a2b_pct": round(a2b, 4),
                     "spread_b2a_pct": round(b2a, 4),
                     "best_direction": direction.replace("A", a_name).replace("B", b_name),
-                    "best_spread_pct": round(best_pct, 4),
+                    "best_spread_pct": round(a2b if forward else b2a, 4),
+                    "net_spread_pct": round(net, 4),
+                    "a_age_s": round(a_age, 3),
+                    "b_age_s": round(b_age, 3),
                 }
 
                 if (
                     not best
-                    or candidate["best_spread_pct"] > best["best_spread_pct"]
+                    or candidate["net_spread_pct"] > best["net_spread_pct"]
                 ):
                     best = candidate
 
@@ -234,6 +564,84 @@ async def build_stage_one_snapshot(
     return result
 
 
+SPREAD_ENGINES = {
+    "python":   _candidates_python,
+    "numpy":    candidates_numpy,
+    "columnar": candidates_columnar,
+    "tracker":  candidates_tracker,
+}
+
+
+async def build_stage_one_snapshot(
+    pairs: Dict[str, Dict[str, Any]],
+    quote_store: QuoteStore | None = None,
+    deadline_s: float = STAGE1_DEADLINE_S,
+    max_age_s: float = STAGE1_MAX_QUOTE_AGE_S,
+    route_tracker: RouteTracker | None = None,
+    ticker_cache: TickerCache | None = None,
+    costs: RouteCostMatrix = ROUTE_COSTS,
+) -> StageOneSnapshot:
+    """
+    quote_store — если передан, котировки читаются из него (режим стрима),
+    иначе грузятся REST-тикерами всех бирж с дедлайном deadline_s.
+
+    route_tracker — слушатель quote_store: маршруты ведутся инкрементально
+    по каждому обновлению, здесь только собираются кандидаты.
+
+    ticker_cache — общий с Stage-0 кэш тикеров (один запрос на биржу за тик).
+
+    costs — издержки маршрутов для чистого спреда (route_tracker — свои).
+    """
+
+    if not pairs:
+        return StageOneSnapshot()
+
+    if quote_store is not None:
+        exchanges, status, ages = _load_books_stream(quote_store, deadline_s, max_age_s)
+    else:
+        exchanges, status, ages = await _load_books_rest(
+            deadline_s, max_age_s, _universe_index(pairs), ticker_cache,
+        )
+
+    if quote_store is not None and route_tracker is not None:
+        route_tracker.set_pairs(pairs, store=quote_store)
+        candidates = route_tracker.candidates(time.time(), max_age_s, STAGE1_MIN_NET_PROFIT_PCT)
+    else:
+        engine = SPREAD_ENGINES[STAGE1_SPREAD_ENGINE]
+        candidates = engine(
+            pairs, exchanges, time.time(), max_age_s, STAGE1_MIN_NET_PROFIT_PCT, costs,
+        )
+
+    return StageOneSnapshot(candidates, status=status, ages=ages)
+
+
+async def build_stage_one_events(
+    pairs: Dict[str, Dict[str, Any]],
+    incremental: IncrementalStageOne,
+    quote_store: QuoteStore | None = None,
+    deadline_s: float = STAGE1_DEADLINE_S,
+    max_age_s: float = STAGE1_MAX_QUOTE_AGE_S,
+    ticker_cache: TickerCache | None = None,
+) -> StageOneEvents:
+    """
+    Инкрементальный режим: события сигналов вместо полного среза.
+
+    quote_store — incremental должен быть его слушателем (add_listener),
+    иначе книги REST-опроса подаются в incremental.feed_books().
+    """
+    if quote_store is not None:
+        incremental.set_pairs(pairs, store=quote_store)
+        status, ages = _stream_status(quote_store, deadline_s, max_age_s)
+    else:
+        incremental.set_pairs(pairs)
+        books, status, ages = await _load_books_rest(
+            deadline_s, max_age_s, _universe_index(pairs), ticker_cache,
+        )
+        incremental.feed_books(books)
+
+    return StageOneEvents(incremental.evaluate(), status=status, ages=ages)
+
+
 # -------------------------------------------------------------------------
 # Local demo — Stage-0 → Stage-1 simulation
 # -------------------------------------------------------------------------
@@ -245,6 +653,8 @@ async def _demo():
         pairs = await build_pairs_snapshot()
         snapshot = await build_stage_one_snapshot(pairs)
 
+        print("sources:", snapshot.status)
+
         # выводим только сигналы
         for k, v in snapshot.items():
             print(f"{k:<12} {v['best_direction']} {v['best_spread_pct']}%")
@@ -3,10 +3,31 @@ stage_two — Depth-check / executable liquidity (ALL EXCHANGES)
 
 • принимает BATCH сигналов Stage-1
 • грузит стаканы нужных бирж параллельно
-• считает VWAP-цены исполнения
-• учитывает комиссии + защитный буфер
+• считает VWAP-цены исполнения (src/pipeline/depth_engine.py)
+• учитывает комиссии + защитный буфер — по той же RouteCostMatrix, что и
+  Stage-1 (src/pipeline/route_costs.py): множители ног приходят в сигнале
+  (buy_mult / sell_mult), без них — из матрицы costs по паре
 • проверяет чистую прибыль >= TARGET_NET_PROFIT_PCT
 • подтверждает / отклоняет сигнал
+• отчитывается наибольшим объёмом, при котором цель ещё выполняется
+  (max_notional_usdt), и кривой «прибыль от объёма» (profit_curve)
+
+Если передан менеджер локальных L2-стаканов (src/streams/orderbook_l2.py),
+синхронизированные стаканы берутся из памяти, REST — только для остальных.
+REST-стаканы — через OrderbookCache (src/exchanges/orderbook_cache.py), если он
+передан: TTL по бирже и один запрос на ключ для параллельных батчей.
+Возраст использованных стаканов — buy_book_age_s / sell_book_age_s в результате.
+
+Быстрый путь (STAGE2_L1_FAST_CONFIRM): если в сигнале есть L1 маршрута
+(buy_ask / buy_ask_size, sell_bid / sell_bid_size) и лучшие уровни обеих ног
+уже вмещают MIN_EXECUTION_NOTIONAL_USDT с чистым спредом >= TARGET_NET_PROFIT_PCT,
+сигнал подтверждается без стаканов ("source": "l1"; max_notional_usdt и
+profit_curve — по одному уровню, т.е. нижняя граница). Доля таких сигналов —
+stage_two_stats().
+
+Глубина REST-стаканов — ступенями (src/pipeline/depth_tiers.py): нога грузится
+с запомненной ступени, и только ноги маршрутов, которым не хватило объёма на
+MIN_EXECUTION_NOTIONAL_USDT, догружаются следующей ступенью.
 """
 
 from __future__ import annotations
@@ -19,13 +40,17 @@ from httpx import HTTPStatusError
 
 from src.config import (
     MIN_EXECUTION_NOTIONAL_USDT,
-    MAX_BOOK_DEPTH_LEVELS,
-    MIN_PROFIT_PCT,              # используется только как диагностический маркер Stage-1
     TARGET_NET_PROFIT_PCT,       # главный порог ЧИСТОЙ прибыли
-    SAFETY_FEE_BUFFER_PCT,
-    EXCHANGE_TAKER_FEES,
+    FAST_DECODE_ENABLED,
+    STAGE2_L1_FAST_CONFIRM,
 )
 
+from src.exchanges import decoders
+from src.exchanges.orderbook_cache import OrderbookCache
+from src.pipeline.depth_engine import DepthSide, DepthRoute
+from src.pipeline.depth_tiers import DepthTiers
+from src.pipeline.route_costs import RouteCostMatrix, ROUTE_COSTS
+
 from src.exchanges.binance.binance_market import fetch_orderbook_raw as ob_binance
 from src.exchanges.bybit.bybit_market import fetch_orderbook_raw as ob_bybit
 from src.exchanges.okx.okx_market import fetch_orderbook_raw as ob_okx
@@ -33,42 +58,6 @@ from src.exchanges.gate.gate_market import fetch_orderbook_raw as ob_gate
 from src.exchanges.kucoin.kucoin_market import fetch_orderbook_raw as ob_kucoin
 
 
-# -------------------------------------------------------------------------
-# calc executable VWAP price
-# -------------------------------------------------------------------------
-
-def _calc_exec_price(levels, want_notional, max_levels) -> Optional[float]:
-    filled = 0.0
-    cost = 0.0
-
-    for price, qty in levels[:max_levels]:
-        price = float(price)
-        qty = float(qty)
-
-        level_notional = price * qty
-        need = want_notional - filled
-        if need <= 0:
-            break
-
-        take = min(level_notional, need)
-        qty_taken = take / price
-
-        cost += price * qty_taken
-        filled += take
-
-        if filled >= want_notional:
-            break
-
-    if filled < want_notional:
-        return None
-
-    total_qty = filled / price
-    if total_qty <= 0:
-        return None
-
-    return cost / total_qty
-
-
 # -------------------------------------------------------------------------
 # map BASE_USDT → native exchange symbol
 # -------------------------------------------------------------------------
@@ -106,8 +95,9 @@ def _normalize_ob(exchange: str, ob: Dict[str, Any]) -> Tuple[list, list]:
         return ob.get("b") or [], ob.get("a") or []
 
     if exchange == "okx":
-        bids = [[float(x[0]), float(x[2])] for x in ob.get("bids", [])]
-        asks = [[float(x[0]), float(x[3])] for x in ob.get("asks", [])]
+        # уровень OKX: [price, size, "0", orders] — объём во втором поле
+        bids = [[float(x[0]), float(x[1])] for x in ob.get("bids", [])]
+        asks = [[float(x[0]), float(x[1])] for x in ob.get("asks", [])]
         return bids, asks
 
     if exchange == "gate":
@@ -132,34 +122,199 @@ FETCHERS = {
 }
 
 
-async def _fetch_ob_safe(exchange: str, symbol_native: str):
+_FAST_DECODE = FAST_DECODE_ENABLED and decoders.AVAILABLE
+
+
+async def _fetch_ob_safe(
+    exchange: str,
+    symbol_native: str,
+    limit: int | None = None,
+) -> Tuple[list, list]:
+    """
+    REST-стакан глубиной limit → (bids, asks). Ошибка → пустые стороны.
+    """
     fn = FETCHERS.get(exchange)
     if not fn:
-        return None
+        return [], []
 
     try:
-        return await fn(symbol_native)
-    except HTTPStatusError:
-        return None
+        if _FAST_DECODE:
+            return await fn(symbol_native, limit=limit, decoder=decoders.ORDERBOOK_DECODERS[exchange])
+        return _normalize_ob(exchange, await fn(symbol_native, limit=limit))
+    except HTTPStatusError as e:
+        # 429 / 418 — бюджет лимита уже заблокирован планировщиком (rate_limit.py),
+        # но отказ не должен проходить молча
+        if e.response.status_code in (418, 429):
+            print(f"[Stage2][WARN] {exchange} rate limited on {symbol_native}")
+        return [], []
     except Exception:
+        return [], []
+
+
+# ступени глубины, запомненные между батчами
+_DEPTH_TIERS = DepthTiers()
+
+# счётчики сигналов с начала работы процесса
+_STATS = {"signals": 0, "fast_confirmed": 0}
+
+
+def signal_legs(signals: List[Dict[str, Any]]) -> list[Tuple[str, str]]:
+    """
+    Ноги (exchange, native symbol) маршрутов сигналов — для hot-set L2-стаканов.
+    """
+    legs = []
+    for s in signals:
+        pair = s.get("pair")
+        direction = s.get("direction", "")
+        if not pair or "→" not in direction:
+            continue
+        for ex in direction.split("→"):
+            ex = ex.strip().lower()
+            legs.append((ex, _symbol_for_exchange(pair, ex)))
+    return legs
+
+
+def stage_two_stats() -> Dict[str, Any]:
+    signals = _STATS["signals"]
+    return {
+        **_STATS,
+        "fast_confirm_share": round(_STATS["fast_confirmed"] / signals, 4) if signals else 0.0,
+        "depth_escalations": _DEPTH_TIERS.escalations,
+    }
+
+
+# -------------------------------------------------------------------------
+# fees
+# -------------------------------------------------------------------------
+
+def _route_mults(
+    s: Dict[str, Any],
+    pair: str,
+    buy_ex: str,
+    sell_ex: str,
+    costs: RouteCostMatrix,
+) -> tuple[float, float]:
+    """
+    (buy_mult, sell_mult) маршрута: из сигнала Stage-1, иначе из costs.
+    """
+    buy_mult, sell_mult = s.get("buy_mult") or 0.0, s.get("sell_mult") or 0.0
+    if buy_mult > 0 and sell_mult > 0:
+        return buy_mult, sell_mult
+
+    mults = costs.pair_mults(pair)
+    return costs.buy_mult(buy_ex, mults), costs.sell_mult(sell_ex, mults)
+
+
+# -------------------------------------------------------------------------
+# L1 fast confirm
+# -------------------------------------------------------------------------
+
+def _fast_confirm(
+    s: Dict[str, Any],
+    pair: str,
+    direction: str,
+    buy_ex: str,
+    sell_ex: str,
+    costs: RouteCostMatrix,
+) -> Dict[str, Any] | None:
+    """
+    Подтверждение по L1 сигнала или None — нужен стакан.
+    """
+    ask, ask_size = s.get("buy_ask") or 0.0, s.get("buy_ask_size") or 0.0
+    bid, bid_size = s.get("sell_bid") or 0.0, s.get("sell_bid_size") or 0.0
+
+    if ask <= 0 or bid <= 0 or ask_size <= 0 or bid_size <= 0:
         return None
 
+    want = float(MIN_EXECUTION_NOTIONAL_USDT)
+    # объём первого уровня — грубая отсечка до построения массивов
+    if ask * ask_size < want or bid * bid_size < want:
+        return None
+
+    route = DepthRoute.from_mults(
+        DepthSide([(ask, ask_size)], 1),
+        DepthSide([(bid, bid_size)], 1),
+        *_route_mults(s, pair, buy_ex, sell_ex, costs),
+        costs.buffer_pct,
+    )
+    if want > route.max_depth_notional:
+        return None
+
+    buy_price, sell_price, net_spread = (float(v) for v in route.evaluate(want))
+    if net_spread < TARGET_NET_PROFIT_PCT:
+        return None
+
+    return {
+        "status": "confirmed",
+        "reason": "ok",
+        "source": "l1",
+        "pair": pair,
+        "direction": direction,
+        "signal_spread_pct": float(s.get("best_spread_pct", 0.0)),
+        "exec_spread_pct": net_spread,
+        "buy_exchange": buy_ex,
+        "sell_exchange": sell_ex,
+        "buy_price": buy_price,
+        "sell_price": sell_price,
+        "max_notional_usdt": route.max_notional(),
+        "profit_curve": route.profit_curve(),
+    }
+
+
+async def _fetch_books(
+    depths: Dict[Tuple[str, str], int],
+    ob_cache: OrderbookCache | None,
+) -> list:
+    """
+    [((bids, asks), возраст)] в порядке depths.
+    """
+    if ob_cache is not None:
+        return await asyncio.gather(*(
+            ob_cache.get(ex, sym, _fetch_ob_safe, depth) for (ex, sym), depth in depths.items()
+        ))
+
+    books_only = await asyncio.gather(*(
+        _fetch_ob_safe(ex, sym, depth) for (ex, sym), depth in depths.items()
+    ))
+    return [(book, 0.0) for book in books_only]
+
 
 # -------------------------------------------------------------------------
 # MAIN — batch Stage-2
 # -------------------------------------------------------------------------
 
 async def process_stage_two_batch(
-    signals: List[Dict[str, Any]]
+    signals: List[Dict[str, Any]],
+    books=None,
+    ob_cache: OrderbookCache | None = None,
+    depth_tiers: DepthTiers | None = None,
+    costs: RouteCostMatrix | None = None,
 ) -> List[Dict[str, Any]]:
+    """
+    books — L2BookManager (или None): источник локальных стаканов.
+    ob_cache — кэш REST-стаканов между батчами (или None — всегда REST).
+    depth_tiers — ступени глубины с памятью по ногам (None — общие модуля).
+    costs — комиссии и буфер для сигналов без множителей ног (None — ROUTE_COSTS).
+    """
+
+    if costs is None:
+        costs = ROUTE_COSTS
+
+    tiers = depth_tiers if depth_tiers is not None else _DEPTH_TIERS
+    want = float(MIN_EXECUTION_NOTIONAL_USDT)
 
     if not signals:
         return []
 
+    # L1 fast confirm → индекс сигнала: результат без стаканов
+    fast: Dict[int, Dict[str, Any]] = {}
+
     # collect orderbooks to fetch
     need: set[tuple[str, str]] = set()
+    # (buy leg, sell leg) каждого сигнала
+    routes: set[tuple[tuple[str, str], tuple[str, str]]] = set()
 
-    for s in signals:
+    for n, s in enumerate(signals):
         pair = s.get("pair")
         direction = s.get("direction", "")
 
@@ -168,22 +323,100 @@ async def process_stage_two_batch(
 
         buy_ex, sell_ex = [x.strip().lower() for x in direction.split("→")]
 
-        need.add((buy_ex,  _symbol_for_exchange(pair, buy_ex)))
-        need.add((sell_ex, _symbol_for_exchange(pair, sell_ex)))
-
-    # fetch all concurrently
-    tasks = {
-        (ex, sym): asyncio.create_task(_fetch_ob_safe(ex, sym))
-        for ex, sym in need
-    }
-
-    await asyncio.gather(*tasks.values())
-    orderbooks = {k: tasks[k].result() for k in tasks}
+        if STAGE2_L1_FAST_CONFIRM:
+            confirmed = _fast_confirm(s, pair, direction, buy_ex, sell_ex, costs)
+            if confirmed is not None:
+                fast[n] = confirmed
+                continue
+
+        buy_key = (buy_ex, _symbol_for_exchange(pair, buy_ex))
+        sell_key = (sell_ex, _symbol_for_exchange(pair, sell_ex))
+        need.update((buy_key, sell_key))
+        routes.add((buy_key, sell_key))
+
+    # local L2 books first → (bids, asks)
+    orderbooks: Dict[Tuple[str, str], Tuple[list, list]] = {}
+    # возраст стакана в секундах (локальный L2 — 0)
+    book_ages: Dict[Tuple[str, str], float] = {}
+
+    if books is not None:
+        for key in need:
+            levels = books.get_levels(*key, depth=tiers.max_depth(key[0]))
+            if levels:
+                orderbooks[key] = levels
+                book_ages[key] = 0.0
+
+    # стороны стаканов → float-массивы, один раз на загрузку
+    sides: Dict[Tuple[str, str, int], DepthSide] = {}
+
+    def side(key: Tuple[str, str], i: int) -> DepthSide:
+        ds = sides.get((*key, i))
+        if ds is None:
+            levels = orderbooks[key][i]
+            ds = sides[(*key, i)] = DepthSide(levels, len(levels))
+        return ds
+
+    # глубина загруженных REST-стаканов (уровней запрошено или получено больше)
+    depths: Dict[Tuple[str, str], int] = {}
+
+    def deeper(key: Tuple[str, str], i: int) -> int | None:
+        # стакан короче запрошенного — на бирже глубже нет
+        if key not in depths or len(orderbooks[key][i]) < depths[key]:
+            return None
+        return tiers.deeper(key[0], depths[key])
+
+    # fetch the rest concurrently: с запомненной ступени, затем догрузка
+    # только тех ног, которым не хватило объёма
+    pending = {key: tiers.depth(*key) for key in need if key not in orderbooks}
+
+    while pending:
+        fetched = await _fetch_books(pending, ob_cache)
+
+        for (key, depth), (book, age) in zip(pending.items(), fetched):
+            orderbooks[key] = book
+            book_ages[key] = age
+            depths[key] = max(depth, len(book[0]), len(book[1]))
+            sides.pop((*key, 0), None)
+            sides.pop((*key, 1), None)
+
+        pending = {}
+        for buy_key, sell_key in routes:
+            if not all(orderbooks[buy_key]) or not all(orderbooks[sell_key]):
+                continue
+
+            asks, bids = side(buy_key, 1), side(sell_key, 0)
+            if want <= DepthRoute(asks, bids, 0.0, 0.0).max_depth_notional:
+                continue
+
+            # не хватило покупки — догружаем asks; иначе не хватило продажи
+            short_buy = asks.total_notional < want
+            short_sell = not short_buy or bids.total_notional < want
+
+            for key, i, short in ((buy_key, 1, short_buy), (sell_key, 0, short_sell)):
+                depth = deeper(key, i) if short else None
+                if depth is not None:
+                    pending[key] = max(pending.get(key, 0), depth)
+
+        tiers.escalations += len(pending)
+
+    # сколько уровней каждая REST-нога потребовала в этом батче
+    needed: Dict[Tuple[str, str], int] = {}
+
+    def require(key: Tuple[str, str], levels: int):
+        if key in depths:
+            needed[key] = max(needed.get(key, 0), levels)
 
     results: List[Dict[str, Any]] = []
 
+    _STATS["signals"] += len(signals)
+    _STATS["fast_confirmed"] += len(fast)
+
     # process signals
-    for s in signals:
+    for n, s in enumerate(signals):
+        if n in fast:
+            results.append(fast[n])
+            continue
+
         pair = s.get("pair")
         direction = s.get("direction", "")
         sig_spread = float(s.get("best_spread_pct", 0.0))
@@ -202,11 +435,8 @@ async def process_stage_two_batch(
         sym_buy  = _symbol_for_exchange(pair, buy_ex)
         sym_sell = _symbol_for_exchange(pair, sell_ex)
 
-        ob_buy  = orderbooks.get((buy_ex,  sym_buy))
-        ob_sell = orderbooks.get((sell_ex, sym_sell))
-
-        bids_buy, asks_buy = _normalize_ob(buy_ex, ob_buy)
-        bids_sell, asks_sell = _normalize_ob(sell_ex, ob_sell)
+        bids_buy, asks_buy = orderbooks.get((buy_ex, sym_buy), ([], []))
+        bids_sell, asks_sell = orderbooks.get((sell_ex, sym_sell), ([], []))
 
         if not bids_buy or not asks_buy or not bids_sell or not asks_sell:
             results.append({
@@ -218,31 +448,40 @@ async def process_stage_two_batch(
             })
             continue
 
-        want = float(MIN_EXECUTION_NOTIONAL_USDT)
-
-        buy_price  = _calc_exec_price(asks_buy,  want, MAX_BOOK_DEPTH_LEVELS)
-        sell_price = _calc_exec_price(bids_sell, want, MAX_BOOK_DEPTH_LEVELS)
+        # -------------------- FEES + BUFFER ------------------------------
 
-        if buy_price is None or sell_price is None:
+        # покупка по ask на buy_ex, то же количество продаётся по bid на sell_ex
+        route = DepthRoute.from_mults(
+            side((buy_ex, sym_buy), 1),
+            side((sell_ex, sym_sell), 0),
+            *_route_mults(s, pair, buy_ex, sell_ex, costs),
+            costs.buffer_pct,
+        )
+
+        buy_age = book_ages[(buy_ex, sym_buy)]
+        sell_age = book_ages[(sell_ex, sym_sell)]
+
+        if want > route.max_depth_notional:
+            # глубже не загрузить — следующая проверка начнёт с той же ступени
+            require((buy_ex, sym_buy), depths.get((buy_ex, sym_buy), 0))
+            require((sell_ex, sym_sell), depths.get((sell_ex, sym_sell), 0))
             results.append({
                 "status": "rejected",
                 "reason": "insufficient_depth",
                 "pair": pair,
                 "direction": direction,
                 "signal_spread_pct": sig_spread,
+                "buy_book_age_s": buy_age,
+                "sell_book_age_s": sell_age,
             })
             continue
 
-        # -------------------- FEES + BUFFER ------------------------------
+        require((buy_ex, sym_buy), route.asks.levels_for_notional(want))
+        require((sell_ex, sym_sell), route.bids.levels_for_qty(float(route.asks.qty_for_notional(want))))
 
-        fee_buy  = EXCHANGE_TAKER_FEES.get(buy_ex, 0.10)
-        fee_sell = EXCHANGE_TAKER_FEES.get(sell_ex, 0.10)
-
-        effective_buy  = buy_price  * (1 + fee_buy  / 100)
-        effective_sell = sell_price * (1 - fee_sell / 100)
-
-        gross_spread = (effective_sell - effective_buy) / effective_buy * 100
-        net_spread   = gross_spread - SAFETY_FEE_BUFFER_PCT
+        buy_price, sell_price, net_spread = (float(v) for v in route.evaluate(want))
+        max_notional = route.max_notional()
+        curve = route.profit_curve()
 
         # ключевое изменение → решаем по ЧИСТОЙ прибыли
         if net_spread < TARGET_NET_PROFIT_PCT:
@@ -257,6 +496,10 @@ async def process_stage_two_batch(
                 "sell_exchange": sell_ex,
                 "buy_price": buy_price,
                 "sell_price": sell_price,
+                "max_notional_usdt": max_notional,
+                "profit_curve": curve,
+                "buy_book_age_s": buy_age,
+                "sell_book_age_s": sell_age,
             })
             continue
 
@@ -271,8 +514,15 @@ async def process_stage_two_batch(
             "sell_exchange": sell_ex,
             "buy_price": buy_price,
             "sell_price": sell_price,
+            "max_notional_usdt": max_notional,
+            "profit_curve": curve,
+            "buy_book_age_s": buy_age,
+            "sell_book_age_s": sell_age,
         })
 
+    for key, levels in needed.items():
+        tiers.record(*key, levels)
+
     return results
 
 
@@ -291,14 +541,19 @@ async def _demo():
     stage1 = await build_stage_one_snapshot(pairs)
     t2 = time.perf_counter()
 
-    signals = [
-        {
+    signals = []
+    for k, v in stage1.items():
+        a, b = v["best_direction"].split("→")
+        prices = {v["a"]: v["a_prices"], v["b"]: v["b_prices"]}
+        signals.append({
             "pair": k,
             "direction": v["best_direction"],
             "best_spread_pct": v["best_spread_pct"],
-        }
-        for k, v in stage1.items()
-    ]
+            "buy_ask": prices[a]["ask"],
+            "buy_ask_size": prices[a].get("ask_size", 0.0),
+            "sell_bid": prices[b]["bid"],
+            "sell_bid_size": prices[b].get("bid_size", 0.0),
+        })
 
     results = await process_stage_two_batch(signals)
     t3 = time.perf_counter()
@@ -314,6 +569,7 @@ async def _demo():
     print()
     print("confirmed :", len(confirmed))
     print("rejected  :", len(rejected))
+    print("stats     :", stage_two_stats())
 
     if confirmed[:5]:
         print("\nSAMPLE CONFIRMED:")
@@ -321,7 +577,8 @@ async def _demo():
             print(
                 r["pair"],
                 r["direction"],
-                f"{r['exec_spread_pct']:.3f}%"
+                f"{r['exec_spread_pct']:.3f}%",
+                f"max={r['max_notional_usdt']:.0f} USDT",
             )
 
     if rejected[:5]:
@@ -33,6 +33,8 @@ from src.exchanges.kucoin.kucoin_market import (
     fetch_tickers_raw as kucoin_tickers_raw,
 )
 
+from src.exchanges.rate_limit import PRIORITY_BACKGROUND
+
 
 # -------------------------------------------------------------------------
 # helpers
@@ -87,11 +89,11 @@ async def build_pairs_snapshot() -> Dict[str, Dict[str, Any]]:
         gate_raw,
         kucoin_raw,
     ) = await asyncio.gather(
-        fetch_tickers_24h_raw(),       # Binance (есть quoteVolume)
-        fetch_tickers_raw("spot"),     # Bybit (есть turnover24h)
-        okx_tickers_raw(),             # OKX
-        gate_tickers_raw(),            # Gate.io
-        kucoin_tickers_raw(),          # KuCoin
+        fetch_tickers_24h_raw(),                                 # Binance (есть quoteVolume)
+        fetch_tickers_raw("spot", priority=PRIORITY_BACKGROUND), # Bybit (есть turnover24h)
+        okx_tickers_raw(priority=PRIORITY_BACKGROUND),           # OKX
+        gate_tickers_raw(priority=PRIORITY_BACKGROUND),          # Gate.io
+        kucoin_tickers_raw(priority=PRIORITY_BACKGROUND),        # KuCoin
     )
 
     result: Dict[str, Dict[str, Any]] = {}
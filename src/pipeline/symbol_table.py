@@ -0,0 +1,79 @@
+"""
+symbol_table — интернирование пар и бирж в маленькие int
+
+Таблица пар Stage-0 — {"BTC_USDT": {"binance": "BTCUSDT", "bybit": None, …}}:
+тысячи строковых ключей и вложенных dict, многие значения None.
+
+SymbolTable:
+• биржа → индекс столбца (порядок задаётся при создании)
+• пара  → индекс строки; id только добавляются и не переиспользуются,
+  поэтому массивы, привязанные к id (ColumnarQuotes), живут между циклами
+• (биржа, native symbol) → id пары — один dict на биржу вместо вложенных
+"""
+
+from typing import Dict, Any, Sequence
+
+
+class SymbolTable:
+
+    def __init__(self, exchanges: Sequence[str]):
+        self.exchanges: tuple[str, ...] = tuple(exchanges)
+        self._ex_ids = {name: i for i, name in enumerate(self.exchanges)}
+
+        self._keys: list[str] = []
+        self._pair_ids: Dict[str, int] = {}
+
+        # ex id → native symbol → pair id (только пары текущей таблицы)
+        self._native: list[Dict[str, int]] = [{} for _ in self.exchanges]
+
+        self._source: Dict[str, Dict[str, Any]] | None = None
+        self.version = 0
+
+    # ------------------------------------------------------------------
+
+    def exchange_id(self, name: str) -> int:
+        return self._ex_ids[name]
+
+    def pair_id(self, key: str) -> int:
+        pid = self._pair_ids.get(key)
+        if pid is None:
+            pid = self._pair_ids[key] = len(self._keys)
+            self._keys.append(key)
+        return pid
+
+    def pair_key(self, pid: int) -> str:
+        return self._keys[pid]
+
+    def native_index(self, ex_id: int) -> Dict[str, int]:
+        return self._native[ex_id]
+
+    def active_ids(self) -> list[int]:
+        """
+        id пар текущей таблицы Stage-0.
+        """
+        return [self._pair_ids[key] for key in self._source or ()]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    # ------------------------------------------------------------------
+
+    def update(self, pairs: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Новая таблица пар Stage-0. False — та же таблица, ничего не делалось.
+        """
+        if pairs is self._source:
+            return False
+
+        self._source = pairs
+        self._native = [{} for _ in self.exchanges]
+
+        for key, mapping in pairs.items():
+            pid = self.pair_id(key)
+            for name, sym in mapping.items():
+                ex_id = self._ex_ids.get(name)
+                if sym and ex_id is not None:
+                    self._native[ex_id][sym] = pid
+
+        self.version += 1
+        return True
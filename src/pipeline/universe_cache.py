@@ -0,0 +1,96 @@
+"""
+universe_cache — тёплый старт Stage-1 из последней вселенной на диске
+
+После рестарта Stage-1 ждёт, пока Stage-0 опросит 24h-эндпоинты всех бирж,
+и всё это время не видит рынка. Здесь:
+
+• save_universe() — после каждого обновления Stage-0 состояние PairsUniverse
+  (ноги: key, native symbol, тир оборота) пишется в UNIVERSE_CACHE_PATH
+  с меткой времени; запись атомарная (tmp + os.replace)
+• load_universe() — при запуске вселенная берётся с диска, если файл моложе
+  UNIVERSE_CACHE_MAX_AGE_S; Stage-0 затем обновляет её в фоне обычными диффами;
+  нечитаемый или чужой схемы файл — холодный старт
+
+Формат — JSON (orjson, если установлен), ноги списками по биржам:
+
+    {"format": 1, "ts": 1700000000.0, "version": 42,
+     "legs": {"binance": [["BTC_USDT", "BTCUSDT", 2], ...], ...}}
+"""
+
+import json
+import os
+import time
+from typing import Dict, Any
+
+try:
+    import orjson
+except ImportError:  # опциональная зависимость (extra "fast")
+    orjson = None
+
+from src.config import UNIVERSE_CACHE_PATH, UNIVERSE_CACHE_MAX_AGE_S
+
+from src.pipeline.pairs_universe import PairsUniverse
+
+
+FORMAT = 1
+
+
+def _dumps(obj: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _loads(body: bytes) -> Dict[str, Any]:
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def save_universe(universe: PairsUniverse, path: str = UNIVERSE_CACHE_PATH):
+    write_state(universe.state(), path)
+
+
+def write_state(state: Dict[str, Any], path: str = UNIVERSE_CACHE_PATH):
+    """
+    Запись снятого состояния — можно вызывать из потока (asyncio.to_thread).
+    """
+    body = _dumps({"format": FORMAT, "ts": time.time(), **state})
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+
+def load_universe(
+    universe: PairsUniverse,
+    path: str = UNIVERSE_CACHE_PATH,
+    max_age_s: float = UNIVERSE_CACHE_MAX_AGE_S,
+) -> float | None:
+    """
+    Восстанавливает universe с диска. Возвращает возраст снимка в секундах
+    или None — файла нет, он старше max_age_s или не читается.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = _loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"[UniverseCache][WARN] {path}: {type(e).__name__}: {e}")
+        return None
+
+    if not isinstance(data, dict) or data.get("format") != FORMAT:
+        return None
+
+    # файл другой схемы или испорчен — холодный старт, universe не трогаем
+    try:
+        age = time.time() - float(data["ts"])
+        if age > max_age_s:
+            return None
+        universe.restore(data)
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        print(f"[UniverseCache][WARN] {path}: bad snapshot: {type(e).__name__}: {e}")
+        return None
+
+    return age
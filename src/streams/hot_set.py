@@ -0,0 +1,148 @@
+"""
+hot_set — depth-подписки только для «горячих» ног Stage-1
+
+• нога = (exchange, native symbol)
+• ноги кандидатов Stage-1 отмечаются → touch() (в main.py — ноги сигналов
+  каждого батча Stage-2, stage_two_depth_check.signal_legs)
+• нога остаётся подписанной HOT_SET_TTL_S после последней отметки
+• сверх HOT_SET_MAX_SUBSCRIPTIONS вытесняются давно не отмеченные (LRU)
+• get_levels() отдаёт стакан только горячей и синхронизированной ноги,
+  иначе None → Stage-2 идёт в REST
+
+Передаётся в process_stage_two_batch(..., books=hot_set).
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable
+
+from src.config import (
+    HOT_SET_TTL_S,
+    HOT_SET_MAX_SUBSCRIPTIONS,
+    MAX_BOOK_DEPTH_LEVELS,
+)
+
+from src.streams.orderbook_l2 import L2BookManager
+
+
+Leg = tuple[str, str]
+
+
+def legs_from_stage_one(
+    snapshot: Dict[str, Any],
+    pairs: Dict[str, Dict[str, Any]],
+) -> list[Leg]:
+    """
+    Кандидаты Stage-1 → ноги (exchange, native symbol) обеих сторон.
+    """
+    legs = []
+
+    for key, v in snapshot.items():
+        mapping = pairs.get(key) or {}
+        for name in (v["a"], v["b"]):
+            sym = mapping.get(name)
+            if sym:
+                legs.append((name, sym))
+
+    return legs
+
+
+class HotDepthSet:
+
+    def __init__(
+        self,
+        books: L2BookManager,
+        ttl_s: float = HOT_SET_TTL_S,
+        max_legs: int = HOT_SET_MAX_SUBSCRIPTIONS,
+    ):
+        self.books = books
+        self.ttl_s = ttl_s
+        self.max_legs = max_legs
+
+        # leg → время последней отметки; порядок = LRU (старые в начале)
+        self._legs: "OrderedDict[Leg, float]" = OrderedDict()
+
+        self.subscribed = 0
+        self.expired = 0
+        self.evicted = 0
+
+    # ------------------------------------------------------------------
+
+    async def touch(self, legs: Iterable[Leg]):
+        """
+        Отмечает ноги как горячие, подписывает новые,
+        снимает просроченные и вытесняет лишние.
+        """
+        now = time.time()
+        added: list[Leg] = []
+
+        for leg in legs:
+            if leg not in self._legs:
+                added.append(leg)
+            self._legs[leg] = now
+            self._legs.move_to_end(leg)
+
+        dropped: list[Leg] = []
+
+        # TTL — с начала очереди, пока встречаются просроченные
+        while self._legs:
+            leg, seen = next(iter(self._legs.items()))
+            if now - seen <= self.ttl_s:
+                break
+            self._legs.popitem(last=False)
+            dropped.append(leg)
+            self.expired += 1
+
+        # LRU — сверх лимита
+        while len(self._legs) > self.max_legs:
+            leg, _ = self._legs.popitem(last=False)
+            dropped.append(leg)
+            self.evicted += 1
+
+        # добавленная и тут же вытесненная нога не подписывается вовсе
+        added_set, dropped_set = set(added), set(dropped)
+        added = [leg for leg in added if leg not in dropped_set]
+        dropped = [leg for leg in dropped if leg not in added_set]
+
+        for ex, symbols in _by_exchange(dropped).items():
+            await self.books.unsubscribe(ex, symbols)
+
+        for ex, symbols in _by_exchange(added).items():
+            await self.books.subscribe(ex, symbols)
+            self.subscribed += len(symbols)
+
+    # ------------------------------------------------------------------
+    # Stage-2 API
+    # ------------------------------------------------------------------
+
+    def is_hot(self, exchange: str, symbol: str) -> bool:
+        """
+        Нога отмечена не дольше ttl_s назад (снимается она только в touch()).
+        """
+        seen = self._legs.get((exchange, symbol))
+        return seen is not None and time.time() - seen <= self.ttl_s
+
+    def get_levels(
+        self,
+        exchange: str,
+        symbol: str,
+        depth: int = MAX_BOOK_DEPTH_LEVELS,
+    ) -> tuple[list, list] | None:
+        if not self.is_hot(exchange, symbol):
+            return None
+        return self.books.get_levels(exchange, symbol, depth=depth)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hot": len(self._legs),
+            "subscribed": self.subscribed,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+
+def _by_exchange(legs: Iterable[Leg]) -> Dict[str, list[str]]:
+    out: Dict[str, list[str]] = {}
+    for ex, sym in legs:
+        out.setdefault(ex, []).append(sym)
+    return out
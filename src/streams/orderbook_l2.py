@@ -0,0 +1,399 @@
+"""
+orderbook_l2 — локально поддерживаемые L2-стаканы (Stage-2 без REST)
+
+• стакан засевается снимком:
+    Binance / Gate / KuCoin — REST (lastUpdateId / id / sequence),
+    Bybit / OKX — snapshot, который биржа сама шлёт при подписке
+• дальше применяются WS-диффы с проверкой последовательности:
+    Binance  — U / u (первый дифф накрывает lastUpdateId + 1, далее без дыр)
+    Gate     — U / u (та же схема)
+    KuCoin   — sequenceStart / sequenceEnd; у каждого изменения свой sequence,
+               изменения из сообщения, накрывающего снимок, — только новее него
+    Bybit    — u (delta = предыдущий u + 1, u = 1 → новый snapshot)
+    OKX      — prevSeqId == seqId предыдущего + CRC32 checksum топ-25
+• дыра / неверный checksum → стакан сбрасывается и пересинхронизируется
+• Stage-2 читает get_levels() — без сетевой задержки
+
+Уровни храним строками как пришли от биржи (нужно для checksum OKX),
+ключ — float цены.
+"""
+
+import asyncio
+import heapq
+import time
+import zlib
+from typing import Dict, Any, Iterable
+
+from src.config import (
+    L2_SNAPSHOT_DEPTH,
+    L2_MAX_LEVELS,
+    MAX_BOOK_DEPTH_LEVELS,
+)
+
+from src.exchanges.binance.binance_market import fetch_orderbook_raw as ob_binance
+from src.exchanges.gate.gate_market import fetch_orderbook_raw as ob_gate
+from src.exchanges.kucoin.kucoin_market import fetch_orderbook_raw as ob_kucoin
+
+from src.streams.ws_connection import ExchangeStream
+
+
+# пауза перед повторным засевом после неудачи
+_RESEED_DELAY_S = 0.5
+
+
+# -------------------------------------------------------------------------
+# REST snapshot table (только биржи без WS-снимков)
+# -------------------------------------------------------------------------
+
+async def _snapshot_binance(symbol: str) -> dict:
+    return await ob_binance(symbol, limit=L2_SNAPSHOT_DEPTH)
+
+
+async def _snapshot_gate(symbol: str) -> dict:
+    return await ob_gate(symbol, limit=L2_SNAPSHOT_DEPTH, with_id=True)
+
+
+async def _snapshot_kucoin(symbol: str) -> dict:
+    return await ob_kucoin(symbol, limit=L2_SNAPSHOT_DEPTH)
+
+
+SNAPSHOT_FETCHERS = {
+    "binance": _snapshot_binance,
+    "gate":    _snapshot_gate,
+    "kucoin":  _snapshot_kucoin,
+}
+
+
+# -------------------------------------------------------------------------
+# one book
+# -------------------------------------------------------------------------
+
+def _apply_levels(side: Dict[float, tuple], levels: Iterable):
+    for lvl in levels:
+        price, qty = lvl[0], lvl[1]
+        p = float(price)
+        if float(qty) == 0:
+            side.pop(p, None)
+        else:
+            side[p] = (price, qty)
+
+
+def _trim(side: Dict[float, tuple], best_high: bool):
+    """
+    Дальние уровни не нужны Stage-2 — держим не больше L2_MAX_LEVELS.
+    Обрезаем с запасом, чтобы не сортировать на каждом диффе.
+    """
+    if len(side) <= L2_MAX_LEVELS * 3 // 2:
+        return
+
+    pick = heapq.nlargest if best_high else heapq.nsmallest
+    keep = set(pick(L2_MAX_LEVELS, side))
+    for p in [p for p in side if p not in keep]:
+        del side[p]
+
+
+class LocalOrderBook:
+
+    def __init__(self, exchange: str, symbol: str):
+        self.exchange = exchange
+        self.symbol = symbol
+
+        self.bids: Dict[float, tuple] = {}
+        self.asks: Dict[float, tuple] = {}
+
+        self.last_id: int | None = None
+        self.synced = False
+        self.updated_at = 0.0
+
+    def reset(self):
+        self.bids.clear()
+        self.asks.clear()
+        self.last_id = None
+        self.synced = False
+
+    def load_snapshot(self, bids: Iterable, asks: Iterable, last_id: int | None):
+        self.reset()
+        _apply_levels(self.bids, bids)
+        _apply_levels(self.asks, asks)
+
+        self.last_id = last_id
+        self.synced = True
+        self.updated_at = time.time()
+
+    def apply(self, ev: Dict[str, Any]) -> bool:
+        """
+        Применяет дифф. False — последовательность нарушена (нужен resync).
+        """
+        if not self.synced:
+            return False
+
+        prev_id = ev.get("prev_id")
+
+        if prev_id is not None:
+            # OKX: цепочка prevSeqId → seqId
+            if prev_id != self.last_id:
+                return False
+        elif self.last_id is not None:
+            if ev["last_id"] <= self.last_id:
+                return True                      # уже учтено в снимке
+            if ev["first_id"] > self.last_id + 1:
+                return False                     # дыра
+
+        bids, asks = ev["bids"], ev["asks"]
+
+        # KuCoin: уровни [price, size, seq] — учтённые снимком пропускаем
+        if ev.get("level_ids") and self.last_id is not None and ev["first_id"] <= self.last_id:
+            bids = [lvl for lvl in bids if lvl[2] > self.last_id]
+            asks = [lvl for lvl in asks if lvl[2] > self.last_id]
+
+        _apply_levels(self.bids, bids)
+        _apply_levels(self.asks, asks)
+        _trim(self.bids, best_high=True)
+        _trim(self.asks, best_high=False)
+
+        self.last_id = ev["last_id"]
+        self.updated_at = time.time()
+
+        checksum = ev.get("checksum")
+        if checksum is not None and self.checksum() != checksum:
+            return False
+
+        return True
+
+    def top(self, depth: int) -> tuple[list, list]:
+        bids = [list(self.bids[p]) for p in heapq.nlargest(depth, self.bids)]
+        asks = [list(self.asks[p]) for p in heapq.nsmallest(depth, self.asks)]
+        return bids, asks
+
+    def checksum(self, levels: int = 25) -> int:
+        """
+        CRC32 по правилам OKX: bid:size:ask:size … по топ-25, signed int32.
+        """
+        bids, asks = self.top(levels)
+        parts = []
+
+        for i in range(levels):
+            if i < len(bids):
+                parts.append(f"{bids[i][0]}:{bids[i][1]}")
+            if i < len(asks):
+                parts.append(f"{asks[i][0]}:{asks[i][1]}")
+
+        crc = zlib.crc32(":".join(parts).encode())
+        return crc - (1 << 32) if crc >= (1 << 31) else crc
+
+
+# -------------------------------------------------------------------------
+# one exchange depth stream
+# -------------------------------------------------------------------------
+
+class DepthStream(ExchangeStream):
+
+    def __init__(
+        self,
+        exchange: str,
+        symbols: Iterable[str],
+        url: str | None = None,
+    ):
+        super().__init__(exchange, symbols, url=url)
+
+        self.books: Dict[str, LocalOrderBook] = {
+            s: LocalOrderBook(exchange, s) for s in self.symbols
+        }
+
+        # диффы, пришедшие пока грузится REST-снимок
+        self._pending: Dict[str, list] = {}
+        self._seeding: Dict[str, asyncio.Task] = {}
+        # переподписки после resync (ссылки — чтобы задачу не собрал GC)
+        self._resubscribing: set[asyncio.Task] = set()
+
+        self.resyncs = 0
+
+    # ------------------------------------------------------------------
+    # ExchangeStream hooks
+    # ------------------------------------------------------------------
+
+    def _build_subscribe(self, symbols: list[str], unsubscribe: bool = False) -> list:
+        return self.adapter.build_depth_subscribe(symbols, unsubscribe=unsubscribe)
+
+    def _on_message(self, msg):
+        for ev in self.adapter.parse_depth_message(msg):
+            self._on_event(ev)
+
+    def _on_disconnect(self):
+        for task in [*self._seeding.values(), *self._resubscribing]:
+            task.cancel()
+        self._seeding.clear()
+        self._resubscribing.clear()
+        self._pending.clear()
+
+        for book in self.books.values():
+            book.reset()
+
+    def _on_symbols_added(self, symbols: list[str]):
+        for s in symbols:
+            self.books.setdefault(s, LocalOrderBook(self.exchange, s))
+
+    def _on_symbols_removed(self, symbols: list[str]):
+        for s in symbols:
+            self.books.pop(s, None)
+            self._pending.pop(s, None)
+            task = self._seeding.pop(s, None)
+            if task:
+                task.cancel()
+
+    # ------------------------------------------------------------------
+    # sequencing
+    # ------------------------------------------------------------------
+
+    def _on_event(self, ev: Dict[str, Any]):
+        sym = ev["symbol"]
+        book = self.books.get(sym)
+        if book is None:
+            return
+
+        if ev["snapshot"]:
+            book.load_snapshot(ev["bids"], ev["asks"], ev["last_id"])
+            checksum = ev.get("checksum")
+            if checksum is not None and book.checksum() != checksum:
+                self._resync(sym)
+            return
+
+        if not book.synced:
+            if not self.adapter.DEPTH_WS_SNAPSHOTS:
+                self._pending.setdefault(sym, []).append(ev)
+                self._ensure_seeding(sym)
+            return
+
+        if not book.apply(ev):
+            self._resync(sym, ev)
+
+    def _resync(self, sym: str, ev: Dict[str, Any] | None = None):
+        self.resyncs += 1
+        self.books[sym].reset()
+
+        if self.adapter.DEPTH_WS_SNAPSHOTS:
+            task = asyncio.create_task(self.resubscribe([sym]))
+            self._resubscribing.add(task)
+            task.add_done_callback(self._on_resubscribed)
+            return
+
+        # сам дифф с дырой пригодится после нового снимка
+        self._pending[sym] = [ev] if ev else []
+        self._ensure_seeding(sym)
+
+    def _on_resubscribed(self, task: asyncio.Task):
+        self._resubscribing.discard(task)
+        if task.cancelled():
+            return
+        e = task.exception()
+        if e is not None:
+            print(f"[L2:{self.exchange}][WARN] resubscribe: {type(e).__name__}: {e}")
+
+    def _ensure_seeding(self, sym: str):
+        if sym not in self._seeding:
+            self._seeding[sym] = asyncio.create_task(self._seed(sym))
+
+    async def _seed(self, sym: str):
+        try:
+            ob = await SNAPSHOT_FETCHERS[self.exchange](sym)
+            book = self.books.get(sym)
+            if book is None:
+                return
+
+            book.load_snapshot(
+                ob.get("bids") or [],
+                ob.get("asks") or [],
+                self.adapter.rest_snapshot_id(ob),
+            )
+
+            for ev in self._pending.pop(sym, []):
+                if not book.apply(ev):
+                    # снимок старше начала буфера — ждём следующий дифф и грузим заново
+                    book.reset()
+                    await asyncio.sleep(_RESEED_DELAY_S)
+                    break
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            print(f"[L2:{self.exchange}][WARN] snapshot {sym}: {type(e).__name__}: {e}")
+            self._pending.pop(sym, None)
+            await asyncio.sleep(_RESEED_DELAY_S)
+
+        finally:
+            self._seeding.pop(sym, None)
+
+
+# -------------------------------------------------------------------------
+# all exchanges
+# -------------------------------------------------------------------------
+
+class L2BookManager:
+    """
+    Реестр локальных стаканов: по одному DepthStream на биржу.
+    """
+
+    def __init__(self, urls: Dict[str, str] | None = None):
+        self._urls = urls or {}
+        self._streams: Dict[str, tuple[DepthStream, asyncio.Task]] = {}
+
+    async def subscribe(self, exchange: str, symbols: Iterable[str]):
+        entry = self._streams.get(exchange)
+
+        if entry is None:
+            stream = DepthStream(exchange, symbols, url=self._urls.get(exchange))
+            self._streams[exchange] = (stream, asyncio.create_task(stream.run()))
+            return
+
+        stream = entry[0]
+        await stream.set_symbols(stream.symbols + [s for s in symbols if s not in stream.books])
+
+    async def unsubscribe(self, exchange: str, symbols: Iterable[str]):
+        entry = self._streams.get(exchange)
+        if entry is None:
+            return
+
+        drop = set(symbols)
+        stream = entry[0]
+        await stream.set_symbols([s for s in stream.symbols if s not in drop])
+
+    def get_levels(
+        self,
+        exchange: str,
+        symbol: str,
+        depth: int = MAX_BOOK_DEPTH_LEVELS,
+    ) -> tuple[list, list] | None:
+        """
+        (bids, asks) синхронизированного стакана или None.
+        """
+        entry = self._streams.get(exchange)
+        if entry is None:
+            return None
+
+        book = entry[0].books.get(symbol)
+        if book is None or not book.synced:
+            return None
+
+        bids, asks = book.top(depth)
+        if not bids or not asks:
+            return None
+
+        return bids, asks
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        out = {}
+        for name, (stream, _) in self._streams.items():
+            out[name] = {
+                "books": len(stream.books),
+                "synced": sum(1 for b in stream.books.values() if b.synced),
+                "resyncs": stream.resyncs,
+                "connects": stream.connects,
+            }
+        return out
+
+    async def stop(self):
+        for stream, task in self._streams.values():
+            await stream.stop()
+            task.cancel()
+        self._streams.clear()
@@ -0,0 +1,102 @@
+"""
+quote_store — in-memory best bid / ask по биржам
+
+• пополняется WebSocket-стримами (src/streams/ws_quotes.py)
+• хранит котировку в том же формате, что и REST-загрузчики Stage-1:
+    {"bid", "ask", "bid_size", "ask_size"} + "ts" (время получения)
+• Stage-1 читает book(exchange) вместо REST-тикеров
+• слушатели (RouteTracker) получают каждое изменение:
+    on_quote(exchange, symbol, quote) / on_discard(exchange, symbol) / on_clear(exchange)
+"""
+
+import time
+from typing import Dict, Any
+
+
+class QuoteStore:
+
+    def __init__(self):
+        # exchange → native symbol → quote
+        self._books: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # exchange → время последнего обновления
+        self._last_update: Dict[str, float] = {}
+
+        self._listeners: list = []
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    # ------------------------------------------------------------------
+    # запись (стримы)
+    # ------------------------------------------------------------------
+
+    def update(
+        self,
+        exchange: str,
+        symbol: str,
+        bid: float,
+        ask: float,
+        bid_size: float,
+        ask_size: float,
+        ts: float | None = None,
+    ):
+        if ts is None:
+            ts = time.time()
+
+        # новая запись вместо мутации — кандидаты Stage-1 держат ссылки
+        quote = {
+            "bid": bid,
+            "ask": ask,
+            "bid_size": bid_size,
+            "ask_size": ask_size,
+            "ts": ts,
+        }
+        self._books.setdefault(exchange, {})[symbol] = quote
+        self._last_update[exchange] = ts
+
+        for listener in self._listeners:
+            listener.on_quote(exchange, symbol, quote)
+
+    def discard(self, exchange: str, symbol: str):
+        self._books.get(exchange, {}).pop(symbol, None)
+
+        for listener in self._listeners:
+            listener.on_discard(exchange, symbol)
+
+    def clear(self, exchange: str):
+        """
+        Сбрасывает котировки биржи (например, после потери соединения).
+        """
+        self._books.pop(exchange, None)
+        self._last_update.pop(exchange, None)
+
+        for listener in self._listeners:
+            listener.on_clear(exchange)
+
+    # ------------------------------------------------------------------
+    # чтение (Stage-1)
+    # ------------------------------------------------------------------
+
+    def book(self, exchange: str, max_age_s: float | None = None) -> Dict[str, Any]:
+        """
+        Котировки биржи: native symbol → quote.
+        max_age_s — отбросить котировки старше указанного возраста.
+        """
+        book = self._books.get(exchange, {})
+        if max_age_s is None:
+            return dict(book)
+
+        cutoff = time.time() - max_age_s
+        return {s: q for s, q in book.items() if q["ts"] >= cutoff}
+
+    def last_update(self, exchange: str) -> float | None:
+        return self._last_update.get(exchange)
+
+    def exchanges(self) -> list[str]:
+        return list(self._books)
+
+    def __len__(self) -> int:
+        return sum(len(b) for b in self._books.values())
@@ -0,0 +1,219 @@
+"""
+ws_connection — базовое WebSocket-соединение с биржей
+
+• переподключение с экспоненциальной паузой + повторная подписка
+• ping по расписанию биржи, обрыв при тишине дольше WS_IDLE_TIMEOUT_S
+• изменение набора подписок без переподключения
+
+Что подписывать и как разбирать сообщения — решают наследники
+(QuoteStream — top-of-book, DepthStream — L2 диффы).
+"""
+
+import asyncio
+import json
+from typing import Iterable
+
+from src.config import (
+    WS_RECONNECT_MIN_DELAY_S,
+    WS_RECONNECT_MAX_DELAY_S,
+    WS_IDLE_TIMEOUT_S,
+)
+
+from src.exchanges.binance import binance_ws
+from src.exchanges.bybit import bybit_ws
+from src.exchanges.okx import okx_ws
+from src.exchanges.gate import gate_ws
+from src.exchanges.kucoin import kucoin_ws
+
+try:
+    import websockets
+except ImportError:  # опциональная зависимость (extra "streams")
+    websockets = None
+
+
+AVAILABLE = websockets is not None
+
+
+# -------------------------------------------------------------------------
+# adapter table
+# -------------------------------------------------------------------------
+
+WS_ADAPTERS = {
+    "binance": binance_ws,
+    "bybit":   bybit_ws,
+    "okx":     okx_ws,
+    "gate":    gate_ws,
+    "kucoin":  kucoin_ws,
+}
+
+
+def _encode(msg) -> str:
+    return msg if isinstance(msg, str) else json.dumps(msg)
+
+
+# -------------------------------------------------------------------------
+# base stream
+# -------------------------------------------------------------------------
+
+class ExchangeStream:
+
+    def __init__(
+        self,
+        exchange: str,
+        symbols: Iterable[str],
+        url: str | None = None,
+    ):
+        if websockets is None:
+            raise RuntimeError(
+                "пакет websockets не установлен (pip install websockets)"
+            )
+
+        self.exchange = exchange
+        self.adapter = WS_ADAPTERS[exchange]
+        self.symbols: list[str] = list(dict.fromkeys(symbols))
+
+        # url задаётся явно для stand-in сервера, иначе — адрес биржи
+        self._url = url
+        self._ws = None
+        self._stopped = False
+
+        self.connects = 0
+        self.messages = 0
+
+    # ------------------------------------------------------------------
+    # hooks
+    # ------------------------------------------------------------------
+
+    def _build_subscribe(self, symbols: list[str], unsubscribe: bool = False) -> list:
+        raise NotImplementedError
+
+    def _on_message(self, msg):
+        raise NotImplementedError
+
+    def _on_disconnect(self):
+        pass
+
+    def _on_symbols_added(self, symbols: list[str]):
+        pass
+
+    def _on_symbols_removed(self, symbols: list[str]):
+        pass
+
+    # ------------------------------------------------------------------
+
+    async def _send_all(self, messages: list):
+        delay = self.adapter.SUBSCRIBE_DELAY_S
+
+        for i, msg in enumerate(messages):
+            if i and delay:
+                await asyncio.sleep(delay)
+            await self._ws.send(_encode(msg))
+
+    async def _ping_loop(self):
+        interval = self.adapter.PING_INTERVAL_S
+        if not interval:
+            return
+
+        while True:
+            await asyncio.sleep(interval)
+            await self._ws.send(_encode(self.adapter.ping_message()))
+
+    async def _read_loop(self):
+        while True:
+            raw = await asyncio.wait_for(self._ws.recv(), WS_IDLE_TIMEOUT_S)
+
+            if raw == "pong":
+                continue
+
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                continue
+
+            self._on_message(msg)
+            self.messages += 1
+
+    # ------------------------------------------------------------------
+    # public
+    # ------------------------------------------------------------------
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    async def run(self):
+        delay = WS_RECONNECT_MIN_DELAY_S
+
+        while not self._stopped:
+            ping_task = None
+            try:
+                url = self._url or await self.adapter.ws_url()
+
+                async with websockets.connect(url, max_size=None) as ws:
+                    self._ws = ws
+                    self.connects += 1
+
+                    if self.symbols:
+                        await self._send_all(self._build_subscribe(self.symbols))
+                    ping_task = asyncio.create_task(self._ping_loop())
+
+                    delay = WS_RECONNECT_MIN_DELAY_S
+                    await self._read_loop()
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                if not self._stopped:
+                    print(f"[WS:{self.exchange}][WARN] {type(e).__name__}: {e}")
+
+            finally:
+                if ping_task:
+                    ping_task.cancel()
+                self._ws = None
+                self._on_disconnect()
+
+            if self._stopped:
+                break
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WS_RECONNECT_MAX_DELAY_S)
+
+    async def set_symbols(self, symbols: Iterable[str]):
+        """
+        Меняет набор подписок без переподключения.
+        """
+        new = list(dict.fromkeys(symbols))
+        old_set, new_set = set(self.symbols), set(new)
+
+        added = [s for s in new if s not in old_set]
+        removed = [s for s in self.symbols if s not in new_set]
+
+        self.symbols = new
+
+        if added:
+            self._on_symbols_added(added)
+        if removed:
+            self._on_symbols_removed(removed)
+
+        if self._ws is None:
+            return  # подписка уйдёт целиком при следующем подключении
+
+        if removed:
+            await self._send_all(self._build_subscribe(removed, unsubscribe=True))
+        if added:
+            await self._send_all(self._build_subscribe(added))
+
+    async def resubscribe(self, symbols: list[str]):
+        """
+        Отписка + подписка заново (биржа пришлёт свежий snapshot).
+        """
+        if self._ws is None:
+            return
+        await self._send_all(self._build_subscribe(symbols, unsubscribe=True))
+        await self._send_all(self._build_subscribe(symbols))
+
+    async def stop(self):
+        self._stopped = True
+        if self._ws is not None:
+            await self._ws.close()
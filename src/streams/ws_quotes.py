@@ -0,0 +1,109 @@
+"""
+ws_quotes — WebSocket-стримы top-of-book → QuoteStore
+
+• одно соединение на биржу, подписка на bookTicker / ticker каналы
+• переподключение / ping / resubscribe — в ExchangeStream (ws_connection.py)
+• после обрыва котировки биржи удаляются из стора (не торгуем по старым)
+
+Формат сообщений бирж — в src/exchanges/<exchange>/<exchange>_ws.py.
+Для локальной проверки без бирж — src/streams/ws_standin.py.
+"""
+
+import asyncio
+from typing import Dict, Any, Iterable
+
+from src.streams.quote_store import QuoteStore
+from src.streams.ws_connection import ExchangeStream, WS_ADAPTERS
+
+
+# -------------------------------------------------------------------------
+# one exchange stream
+# -------------------------------------------------------------------------
+
+class QuoteStream(ExchangeStream):
+
+    def __init__(
+        self,
+        exchange: str,
+        symbols: Iterable[str],
+        store: QuoteStore,
+        url: str | None = None,
+    ):
+        super().__init__(exchange, symbols, url=url)
+        self.store = store
+
+    def _build_subscribe(self, symbols: list[str], unsubscribe: bool = False) -> list:
+        return self.adapter.build_ticker_subscribe(symbols, unsubscribe=unsubscribe)
+
+    def _on_message(self, msg):
+        for symbol, bid, ask, bid_size, ask_size in self.adapter.parse_ticker_message(msg):
+            self.store.update(self.exchange, symbol, bid, ask, bid_size, ask_size)
+
+    def _on_disconnect(self):
+        # вся биржа: котировки и last_update, слушатели получают on_clear
+        self.store.clear(self.exchange)
+
+    def _on_symbols_removed(self, symbols: list[str]):
+        for s in symbols:
+            self.store.discard(self.exchange, s)
+
+
+# -------------------------------------------------------------------------
+# helpers — Stage-0 snapshot → streams
+# -------------------------------------------------------------------------
+
+def symbols_by_exchange(pairs: Dict[str, Dict[str, Any]]) -> Dict[str, list[str]]:
+    """
+    {"BTC_USDT": {"binance": "BTCUSDT", ...}} → {"binance": ["BTCUSDT", ...]}
+    """
+    out: Dict[str, list[str]] = {name: [] for name in WS_ADAPTERS}
+
+    for mapping in pairs.values():
+        for name in WS_ADAPTERS:
+            sym = mapping.get(name)
+            if sym:
+                out[name].append(sym)
+
+    return out
+
+
+def start_quote_streams(
+    pairs: Dict[str, Dict[str, Any]],
+    store: QuoteStore,
+    urls: Dict[str, str] | None = None,
+) -> Dict[str, tuple[QuoteStream, asyncio.Task]]:
+    """
+    Запускает стрим по каждой бирже, где есть хотя бы один символ.
+    urls — переопределение адресов (stand-in сервер в тестах).
+    """
+    urls = urls or {}
+    streams = {}
+
+    for name, symbols in symbols_by_exchange(pairs).items():
+        if not symbols:
+            continue
+
+        stream = QuoteStream(name, symbols, store, url=urls.get(name))
+        streams[name] = (stream, asyncio.create_task(stream.run()))
+
+    return streams
+
+
+async def update_quote_streams(
+    streams: Dict[str, tuple[QuoteStream, asyncio.Task]],
+    pairs: Dict[str, Dict[str, Any]],
+    store: QuoteStore | None = None,
+    urls: Dict[str, str] | None = None,
+):
+    """
+    Пересобирает подписки после обновления Stage-0.
+    store — запустить стримы бирж, у которых символы появились впервые.
+    """
+    urls = urls or {}
+
+    for name, symbols in symbols_by_exchange(pairs).items():
+        if name in streams:
+            await streams[name][0].set_symbols(symbols)
+        elif store is not None and symbols:
+            stream = QuoteStream(name, symbols, store, url=urls.get(name))
+            streams[name] = (stream, asyncio.create_task(stream.run()))
@@ -0,0 +1,244 @@
+"""
+ws_standin — локальный WebSocket stand-in биржи
+
+• поднимает ws://127.0.0.1:<port> и отдаёт котировки в нативном формате биржи
+• отвечает на ping каждой биржи
+• запоминает полученные подписки (проверка resubscribe)
+• drop_after — рвёт соединение после N сообщений (проверка reconnect)
+• push() — произвольное сообщение всем клиентам (L2-диффы, snapshot OKX
+  с checksum — проверка resync)
+
+Позволяет гонять QuoteStream / Stage-1 в режиме стрима без выхода в сеть.
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Any
+
+try:
+    import websockets
+except ImportError:  # опциональная зависимость (extra "streams")
+    websockets = None
+
+
+# -------------------------------------------------------------------------
+# нативные форматы top-of-book
+# -------------------------------------------------------------------------
+
+def ticker_payload(exchange: str, symbol: str, bid: float, ask: float,
+                   bid_size: float, ask_size: float):
+    if exchange == "binance":
+        return {"u": int(time.time() * 1000), "s": symbol,
+                "b": str(bid), "B": str(bid_size), "a": str(ask), "A": str(ask_size)}
+
+    if exchange == "bybit":
+        return {"topic": f"orderbook.1.{symbol}", "type": "snapshot",
+                "ts": int(time.time() * 1000),
+                "data": {"s": symbol, "b": [[str(bid), str(bid_size)]],
+                         "a": [[str(ask), str(ask_size)]], "u": 1, "seq": 1}}
+
+    if exchange == "okx":
+        return {"arg": {"channel": "tickers", "instId": symbol},
+                "data": [{"instId": symbol, "bidPx": str(bid), "bidSz": str(bid_size),
+                          "askPx": str(ask), "askSz": str(ask_size)}]}
+
+    if exchange == "gate":
+        return {"time": int(time.time()), "channel": "spot.book_ticker", "event": "update",
+                "result": {"s": symbol, "b": str(bid), "B": str(bid_size),
+                           "a": str(ask), "A": str(ask_size)}}
+
+    if exchange == "kucoin":
+        return {"type": "message", "topic": f"/market/ticker:{symbol}",
+                "subject": "trade.ticker",
+                "data": {"bestBid": str(bid), "bestBidSize": str(bid_size),
+                         "bestAsk": str(ask), "bestAskSize": str(ask_size)}}
+
+    raise ValueError(f"unknown exchange: {exchange}")
+
+
+def okx_books_payload(
+    symbol: str,
+    bids: list,
+    asks: list,
+    seq: int,
+    prev_seq: int = -1,
+    snapshot: bool = False,
+    checksum: int | None = None,
+):
+    """
+    Канал books OKX: уровни [[price, size], ...] строками, как у биржи.
+    """
+    return {"arg": {"channel": "books", "instId": symbol},
+            "action": "snapshot" if snapshot else "update",
+            "data": [{"bids": [[p, s, "0", "1"] for p, s in bids],
+                      "asks": [[p, s, "0", "1"] for p, s in asks],
+                      "seqId": seq, "prevSeqId": prev_seq,
+                      "checksum": checksum}]}
+
+
+def _pong_for(raw: str):
+    if raw == "ping":
+        return "pong"
+
+    try:
+        msg = json.loads(raw)
+    except ValueError:
+        return None
+
+    if not isinstance(msg, dict):
+        return None
+    if msg.get("op") == "ping":
+        return json.dumps({"op": "pong"})
+    if msg.get("type") == "ping":
+        return json.dumps({"id": msg.get("id"), "type": "pong"})
+    if msg.get("channel") == "spot.ping":
+        return json.dumps({"channel": "spot.pong"})
+
+    return None
+
+
+# -------------------------------------------------------------------------
+# server
+# -------------------------------------------------------------------------
+
+class StandInExchange:
+
+    def __init__(
+        self,
+        exchange: str,
+        prices: Dict[str, float],
+        interval_s: float = 0.05,
+        drop_after: int | None = None,
+    ):
+        if websockets is None:
+            raise RuntimeError(
+                "пакет websockets не установлен (pip install websockets)"
+            )
+
+        self.exchange = exchange
+        self.prices = dict(prices)          # native symbol → mid price
+        self.interval_s = interval_s
+        self.drop_after = drop_after
+
+        self.subscriptions: list[Any] = []  # все полученные не-ping сообщения
+        self.connections = 0
+        self._clients: set = set()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}"
+
+    async def _reader(self, ws):
+        async for raw in ws:
+            pong = _pong_for(raw)
+            if pong is not None:
+                await ws.send(pong)
+                continue
+            self.subscriptions.append(json.loads(raw))
+
+    async def _handler(self, ws, *_):
+        self.connections += 1
+        self._clients.add(ws)
+        reader = asyncio.create_task(self._reader(ws))
+        sent = 0
+
+        try:
+            while True:
+                for symbol, mid in self.prices.items():
+                    mid *= 1 + random.uniform(-0.0005, 0.0005)
+                    self.prices[symbol] = mid
+
+                    await ws.send(json.dumps(ticker_payload(
+                        self.exchange, symbol,
+                        bid=round(mid * 0.9999, 8), ask=round(mid * 1.0001, 8),
+                        bid_size=1.0, ask_size=1.0,
+                    )))
+                    sent += 1
+
+                    if self.drop_after and sent >= self.drop_after:
+                        await ws.close()
+                        return
+
+                # соединение закрыто — без котировок (только push) send этого не заметит
+                if reader.done():
+                    return
+                await asyncio.sleep(self.interval_s)
+
+        except websockets.ConnectionClosed:
+            pass
+
+        finally:
+            self._clients.discard(ws)
+            reader.cancel()
+
+    async def push(self, payload):
+        """
+        Сообщение всем подключённым клиентам.
+        """
+        raw = payload if isinstance(payload, str) else json.dumps(payload)
+        for ws in list(self._clients):
+            await ws.send(raw)
+
+    async def start(self) -> "StandInExchange":
+        self._server = await websockets.serve(self._handler, "127.0.0.1", 0)
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+# -------------------------------------------------------------------------
+# Demo: stand-in → QuoteStream → QuoteStore → Stage-1
+# -------------------------------------------------------------------------
+
+async def _demo():
+    from src.streams.quote_store import QuoteStore
+    from src.streams.ws_quotes import start_quote_streams
+    from src.pipeline.stage_one_price_snapshot_candidates import build_stage_one_snapshot, EXCHANGES
+    from src.pipeline.route_tracker import RouteTracker
+
+    pairs = {
+        "BTC_USDT": {"binance": "BTCUSDT", "bybit": None, "okx": "BTC-USDT", "gate": None, "kucoin": None},
+        "ETH_USDT": {"binance": "ETHUSDT", "bybit": None, "okx": "ETH-USDT", "gate": None, "kucoin": None},
+    }
+
+    binance = await StandInExchange(
+        "binance", {"BTCUSDT": 60_000.0, "ETHUSDT": 3_000.0}, drop_after=60,
+    ).start()
+    okx = await StandInExchange(
+        "okx", {"BTC-USDT": 60_600.0, "ETH-USDT": 3_000.0},
+    ).start()
+
+    store = QuoteStore()
+    tracker = RouteTracker(EXCHANGES)
+    store.add_listener(tracker)
+    streams = start_quote_streams(pairs, store, urls={"binance": binance.url, "okx": okx.url})
+
+    await asyncio.sleep(1)
+
+    snapshot = await build_stage_one_snapshot(pairs, quote_store=store, route_tracker=tracker)
+    for k, v in snapshot.items():
+        print(f"{k:<12} {v['best_direction']} {v['best_spread_pct']}%")
+
+    # stand-in рвёт соединение → стрим переподключается и подписывается заново
+    await asyncio.sleep(4)
+
+    print(f"[demo] binance connections={binance.connections} "
+          f"subscriptions={len(binance.subscriptions)} "
+          f"quotes={len(store.book('binance'))}")
+
+    for stream, task in streams.values():
+        await stream.stop()
+        task.cancel()
+
+    await binance.stop()
+    await okx.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
@@ -7,13 +7,12 @@ import hashlib
 import asyncio
 import urllib.parse
 
-import httpx
-
 from src.config import (
     BINANCE_BASE_REST_URL,
     BINANCE_COIN_INFO_ENDPOINT,
     BINANCE_FEES_ENDPOINT,
 )
+from src.exchanges.rate_limit import limited_request
 
 # ----------------------------------------------------------------------
 # Настройки доступа (берём из ENV)
@@ -71,10 +70,12 @@ async def _signed_get(endpoint: str, params: dict | None = None) -> dict:
         "X-MBX-APIKEY": BINANCE_API_KEY,
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=signed_params, headers=headers, timeout=10.0)
-        resp.raise_for_status()
-        return resp.json()
+    resp = await limited_request(
+        "binance", endpoint, url,
+        params=signed_params, headers=headers, timeout=10.0,
+    )
+    resp.raise_for_status()
+    return resp.json()
 
 
 # ----------------------------------------------------------------------
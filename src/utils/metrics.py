@@ -0,0 +1,105 @@
+"""
+metrics — время циклов воркеров
+
+• CycleMetrics.cycle() — контекст вокруг одного цикла (успех / ошибка)
+• скользящее окно последних длительностей → p50 / p95 / max
+• report() раз в METRICS_REPORT_INTERVAL_S печатает сводку
+• Distribution — такое же окно для любых величин (размер батча, задержки)
+
+Используется воркерами main.py (через src/utils/runtime.py).
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any
+
+from src.config import METRICS_WINDOW, METRICS_REPORT_INTERVAL_S
+
+
+def _pct(sorted_vals: list[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(int(q * len(sorted_vals)), len(sorted_vals) - 1)
+    return sorted_vals[idx]
+
+
+class Distribution:
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self._values: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value: float):
+        self._values.append(value)
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        vals = sorted(self._values)
+        return {
+            "count": self.count,
+            "p50": round(_pct(vals, 0.50), 1),
+            "p95": round(_pct(vals, 0.95), 1),
+            "max": round(vals[-1], 1) if vals else 0.0,
+        }
+
+    def format(self) -> str:
+        s = self.summary()
+        return f"p50={s['p50']} p95={s['p95']} max={s['max']}"
+
+
+class CycleMetrics:
+
+    def __init__(self, name: str, window: int = METRICS_WINDOW):
+        self.name = name
+        self._durations: deque[float] = deque(maxlen=window)
+
+        self.cycles = 0
+        self.errors = 0
+        self.last_ms = 0.0
+
+        self._reported_at = time.monotonic()
+
+    @contextmanager
+    def cycle(self):
+        t0 = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.errors += 1
+            raise
+        finally:
+            self.record(time.perf_counter() - t0)
+
+    def record(self, seconds: float):
+        self.last_ms = seconds * 1000
+        self._durations.append(self.last_ms)
+        self.cycles += 1
+
+    def summary(self) -> Dict[str, Any]:
+        vals = sorted(self._durations)
+        return {
+            "cycles": self.cycles,
+            "errors": self.errors,
+            "last_ms": round(self.last_ms, 1),
+            "p50_ms": round(_pct(vals, 0.50), 1),
+            "p95_ms": round(_pct(vals, 0.95), 1),
+            "max_ms": round(vals[-1], 1) if vals else 0.0,
+        }
+
+    def report(self, force: bool = False) -> bool:
+        """
+        True — сводка напечатана (можно допечатать свои метрики).
+        """
+        now = time.monotonic()
+        if not force and now - self._reported_at < METRICS_REPORT_INTERVAL_S:
+            return False
+        self._reported_at = now
+
+        s = self.summary()
+        print(
+            f"[{self.name}][METRICS] cycles={s['cycles']} errors={s['errors']} "
+            f"last={s['last_ms']}ms p50={s['p50_ms']}ms p95={s['p95_ms']}ms "
+            f"max={s['max_ms']}ms"
+        )
+        return True
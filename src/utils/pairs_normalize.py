@@ -1,12 +1,20 @@
 """
 PairsNormalize — формирование унифицированного списка пар
 (возвращает dict для межпроцессного обмена).
+
+ticker_cache — общий со Stage-1 снимок тикеров (src/exchanges/ticker_cache.py):
+Bybit / OKX / Gate / KuCoin берутся из него, если снимок не старше max_age_s,
+отдельный запрос делается только при промахе.
+
+fetch_leg_volumes — ноги с оборотом без порога (для PairsUniverse, src/pipeline/pairs_universe.py),
+filter_pairs — таблица пар по порогу MIN_24H_VOLUME_USDT.
+Разбор ног — построчный или колоночный (pandas), см. STAGE0_NORMALIZER.
 """
 
 import asyncio
 from typing import Dict, Any
 
-from src.config import MIN_24H_VOLUME_USDT
+from src.config import MIN_24H_VOLUME_USDT, TICKER_CACHE_STAGE0_MAX_AGE_S, STAGE0_NORMALIZER
 
 from src.exchanges.binance.binance_market import fetch_tickers_24h_raw
 from src.exchanges.bybit.bybit_market import fetch_tickers_raw
@@ -14,6 +22,9 @@ from src.exchanges.bybit.bybit_market import fetch_tickers_raw
 from src.exchanges.okx.okx_market import fetch_tickers_raw as okx_fetch_tickers_raw
 from src.exchanges.gate.gate_market import fetch_tickers_raw as gate_fetch_tickers_raw
 from src.exchanges.kucoin.kucoin_market import fetch_tickers_raw as kucoin_fetch_tickers_raw
+from src.exchanges.rate_limit import PRIORITY_BACKGROUND
+from src.exchanges.ticker_cache import TickerCache
+from src.exchanges.decoders import TICKER_DECODERS
 
 
 # ----------------------------------------------------------------------
@@ -37,124 +48,141 @@ def _normalize_to_usdt_key(symbol: str) -> str | None:
     return f"{s[:-4]}_USDT"
 
 
+async def _cached_tickers_raw(
+    ticker_cache: TickerCache,
+    exchange: str,
+    max_age_s: float,
+) -> list:
+    _, body = await ticker_cache.get(exchange, max_age_s, priority=PRIORITY_BACKGROUND)
+    return TICKER_DECODERS[exchange](body)
+
+
 # ----------------------------------------------------------------------
-# Build normalized pairs table
+# Leg volumes
 # ----------------------------------------------------------------------
 
-async def build_normalized_pairs() -> Dict[str, Dict[str, Any]]:
-    print("\n[PairsNormalize] fetching 24h tickers...")
+# exchange → (поле символа, поля 24h-оборота в USDT по приоритету)
+VOLUME_FIELDS = {
+    "binance": ("symbol", ("quoteVolume",)),
+    "bybit":   ("symbol", ("turnover24h",)),
+    "okx":     ("instId", ("volCcy24h", "vol24h")),
+    "gate":    ("currency_pair", ("quote_volume",)),
+    "kucoin":  ("symbol", ("volValue",)),
+}
 
-    (
-        binance_raw,
-        bybit_raw,
-        okx_raw,
-        gate_raw,
-        kucoin_raw,
-    ) = await asyncio.gather(
-        fetch_tickers_24h_raw(),
-        fetch_tickers_raw("spot"),
+EXCHANGES = tuple(VOLUME_FIELDS)
+
+# key → exchange → (native symbol, 24h-оборот USDT)
+LegVolumes = Dict[str, Dict[str, tuple[str, float]]]
 
-        okx_fetch_tickers_raw(),
-        gate_fetch_tickers_raw(),
-        kucoin_fetch_tickers_raw(),
+
+async def fetch_all_tickers(
+    ticker_cache: TickerCache | None = None,
+    max_age_s: float = TICKER_CACHE_STAGE0_MAX_AGE_S,
+) -> list[list]:
+    """
+    Сырые 24h-тикеры всех бирж в порядке EXCHANGES.
+    """
+    if ticker_cache is not None:
+        shared = [
+            _cached_tickers_raw(ticker_cache, ex, max_age_s)
+            for ex in ("bybit", "okx", "gate", "kucoin")
+        ]
+    else:
+        shared = [
+            fetch_tickers_raw("spot", priority=PRIORITY_BACKGROUND),
+            okx_fetch_tickers_raw(priority=PRIORITY_BACKGROUND),
+            gate_fetch_tickers_raw(priority=PRIORITY_BACKGROUND),
+            kucoin_fetch_tickers_raw(priority=PRIORITY_BACKGROUND),
+        ]
+
+    return await asyncio.gather(
+        fetch_tickers_24h_raw(),
+        *shared,
     )
 
+
+def leg_volumes(raws: list[list]) -> LegVolumes:
+    """
+    Все USDT-ноги всех бирж с 24h-оборотом, без порога по объёму.
+    raws — сырые тикеры в порядке EXCHANGES (fetch_all_tickers).
+    """
+    legs: LegVolumes = {}
+
+    for name, raw in zip(EXCHANGES, raws):
+        sym_field, vol_fields = VOLUME_FIELDS[name]
+
+        for item in raw:
+            symbol = item.get(sym_field)
+            key = _normalize_to_usdt_key(symbol)
+            if not key:
+                continue
+
+            volume = 0.0
+            for field in vol_fields:
+                if item.get(field):
+                    volume = float(item[field])
+                    break
+
+            # несколько символов на один ключ — остаётся самый ликвидный
+            by_ex = legs.setdefault(key, {})
+            if name not in by_ex or volume > by_ex[name][1]:
+                by_ex[name] = (symbol, volume)
+
+    return legs
+
+
+async def fetch_leg_volumes(
+    ticker_cache: TickerCache | None = None,
+    max_age_s: float = TICKER_CACHE_STAGE0_MAX_AGE_S,
+) -> LegVolumes:
+    raws = await fetch_all_tickers(ticker_cache, max_age_s)
+    if STAGE0_NORMALIZER == "columnar":
+        # pandas импортируется только на этом пути
+        from src.utils.pairs_normalize_pandas import leg_volumes_pandas
+        return leg_volumes_pandas(raws)
+    return leg_volumes(raws)
+
+
+def filter_pairs(
+    legs: LegVolumes,
+    min_volume: float = MIN_24H_VOLUME_USDT,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Таблица пар: ноги с оборотом не ниже min_volume, отсутствующие — None.
+    """
     result: Dict[str, Dict[str, Any]] = {}
 
-    # ------------------------------------------------------------------
-    # Binance
-    # ------------------------------------------------------------------
-    for item in binance_raw:
-        volume = float(item.get("quoteVolume", 0) or 0)
-        if volume < MIN_24H_VOLUME_USDT:
-            continue
-
-        symbol = item.get("symbol")
-        key = _normalize_to_usdt_key(symbol)
-        if not key:
-            continue
-
-        entry = result.setdefault(
-            key,
-            {"binance": None, "bybit": None, "okx": None, "gate": None, "kucoin": None},
-        )
-        entry["binance"] = symbol
-
-    # ------------------------------------------------------------------
-    # Bybit
-    # ------------------------------------------------------------------
-    for item in bybit_raw:
-        volume = float(item.get("turnover24h", 0) or 0)
-        if volume < MIN_24H_VOLUME_USDT:
-            continue
-
-        symbol = item.get("symbol")
-        key = _normalize_to_usdt_key(symbol)
-        if not key:
-            continue
-
-        entry = result.setdefault(
-            key,
-            {"binance": None, "bybit": None, "okx": None, "gate": None, "kucoin": None},
-        )
-        entry["bybit"] = symbol
-
-    # ------------------------------------------------------------------
-    # OKX  (instId = BTC-USDT, volume field: volCcy24h or vol24h)
-    # ------------------------------------------------------------------
-    for item in okx_raw:
-        volume = float(item.get("volCcy24h") or item.get("vol24h") or 0)
-        if volume < MIN_24H_VOLUME_USDT:
-            continue
-
-        symbol = item.get("instId")
-        key = _normalize_to_usdt_key(symbol)
-        if not key:
-            continue
-
-        entry = result.setdefault(
-            key,
-            {"binance": None, "bybit": None, "okx": None, "gate": None, "kucoin": None},
-        )
-        entry["okx"] = symbol
-
-    # ------------------------------------------------------------------
-    # Gate.io  (currency_pair = BTC_USDT, volume field: quote_volume)
-    # ------------------------------------------------------------------
-    for item in gate_raw:
-        volume = float(item.get("quote_volume", 0) or 0)
-        if volume < MIN_24H_VOLUME_USDT:
-            continue
-
-        symbol = item.get("currency_pair")
-        key = _normalize_to_usdt_key(symbol)
-        if not key:
-            continue
-
-        entry = result.setdefault(
-            key,
-            {"binance": None, "bybit": None, "okx": None, "gate": None, "kucoin": None},
-        )
-        entry["gate"] = symbol
-
-    # ------------------------------------------------------------------
-    # KuCoin  (symbol = BTC-USDT, volume field: volValue)
-    # ------------------------------------------------------------------
-    for item in kucoin_raw:
-        volume = float(item.get("volValue", 0) or 0)
-        if volume < MIN_24H_VOLUME_USDT:
-            continue
-
-        symbol = item.get("symbol")
-        key = _normalize_to_usdt_key(symbol)
-        if not key:
-            continue
-
-        entry = result.setdefault(
-            key,
-            {"binance": None, "bybit": None, "okx": None, "gate": None, "kucoin": None},
-        )
-        entry["kucoin"] = symbol
+    for key, by_ex in legs.items():
+        for name, (symbol, volume) in by_ex.items():
+            if volume < min_volume:
+                continue
+
+            entry = result.setdefault(key, dict.fromkeys(EXCHANGES))
+            entry[name] = symbol
+
+    return result
+
+
+def normalize_pairs(raws: list[list]) -> Dict[str, Dict[str, Any]]:
+    """
+    Сырые тикеры → таблица пар (построчный путь; колоночный —
+    src/utils/pairs_normalize_pandas.py, результат тот же).
+    """
+    return filter_pairs(leg_volumes(raws))
+
+
+# ----------------------------------------------------------------------
+# Build normalized pairs table
+# ----------------------------------------------------------------------
+
+async def build_normalized_pairs(
+    ticker_cache: TickerCache | None = None,
+    max_age_s: float = TICKER_CACHE_STAGE0_MAX_AGE_S,
+) -> Dict[str, Dict[str, Any]]:
+    print("\n[PairsNormalize] fetching 24h tickers...")
+
+    result = normalize_pairs(await fetch_all_tickers(ticker_cache, max_age_s))
 
     print(f"[PairsNormalize] total pairs: {len(result)}")
     return result
@@ -0,0 +1,85 @@
+"""
+runtime — долгоживущий event loop воркер-процесса
+
+• один loop на весь процесс: пулы HTTP, лимитеры и стримы живут между циклами
+• uvloop — опционально (extra "uvloop"), EVENT_LOOP_BACKEND в config
+• прогрев HTTP-сессий при старте, закрытие при выходе
+
+    run_worker("Stage1Producer", stage1_producer(shared, queue))
+"""
+
+import asyncio
+import traceback
+from typing import Callable, Coroutine, Any
+
+from src.config import EVENT_LOOP_BACKEND, HTTP_WARMUP_ON_START
+from src.exchanges.http_session import warmup_sessions, close_sessions
+
+try:
+    import uvloop
+except ImportError:  # опциональная зависимость (extra "uvloop")
+    uvloop = None
+
+
+def loop_factory() -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """
+    Фабрика loop по EVENT_LOOP_BACKEND: "auto" | "uvloop" | "asyncio".
+    None — стандартный asyncio.
+    """
+    if EVENT_LOOP_BACKEND == "asyncio":
+        return None
+
+    if uvloop is None:
+        if EVENT_LOOP_BACKEND == "uvloop":
+            print("[Runtime][WARN] uvloop не установлен — используется asyncio")
+        return None
+
+    return uvloop.new_event_loop
+
+
+async def _main(name: str, coro: Coroutine[Any, Any, Any]):
+    if HTTP_WARMUP_ON_START:
+        try:
+            await warmup_sessions()
+        except Exception:
+            print(f"[{name}][WARN] HTTP warmup failed")
+            traceback.print_exc()
+
+    try:
+        await coro
+    finally:
+        await close_sessions()
+
+
+def _cancel_pending(loop: asyncio.AbstractEventLoop):
+    tasks = [t for t in asyncio.all_tasks(loop) if not t.done()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+
+def run_worker(name: str, coro: Coroutine[Any, Any, Any]):
+    """
+    Запускает корутину воркера в одном event loop до её завершения.
+    Loop создаётся вручную (asyncio.Runner с loop_factory — только 3.11+).
+    """
+    factory = loop_factory()
+    backend = "uvloop" if factory else "asyncio"
+    print(f"[{name}] event loop: {backend}")
+
+    loop = factory() if factory else asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(_main(name, coro))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            _cancel_pending(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+            print(f"[{name}] stopped")
@@ -0,0 +1,140 @@
+"""
+decoders: msgspec, orjson и json.loads дают одинаковый результат.
+
+Тела — урезанные записи ответов бирж (плюс пограничные строки: пустые цены,
+null, отсутствующие объёмы, символы вне вселенной).
+"""
+
+import json
+
+import pytest
+
+from src.exchanges import decoders
+
+
+def _body(data) -> bytes:
+    return json.dumps(data).encode()
+
+
+TICKERS = {
+    "binance": _body([
+        {"symbol": "BTCUSDT", "bidPrice": "67012.01000000", "bidQty": "1.20471000",
+         "askPrice": "67012.02000000", "askQty": "3.01520000"},
+        {"symbol": "ETHUSDT", "bidPrice": "3521.40000000", "bidQty": "0.00000000",
+         "askPrice": "3521.41000000", "askQty": "12.50000000"},
+        {"symbol": "DOGEUSDT", "bidPrice": "0.16012000", "bidQty": "91000.00000000",
+         "askPrice": "0.16013000", "askQty": "12000.00000000"},
+    ]),
+    "bybit": _body({"retCode": 0, "retMsg": "OK", "result": {"category": "spot", "list": [
+        {"symbol": "BTCUSDT", "bid1Price": "67011.9", "bid1Size": "0.512", "ask1Price": "67012",
+         "ask1Size": "0.087", "lastPrice": "67011.9", "turnover24h": "912000000.1"},
+        {"symbol": "ETHUSDT", "bid1Price": "3521.3", "ask1Price": "3521.35"},
+        {"symbol": "NEWUSDT", "bid1Price": "", "bid1Size": "", "ask1Price": "", "ask1Size": ""},
+        {"symbol": "DOGEUSDT", "bid1Price": "0.16011", "bid1Size": "", "ask1Price": "0.16012",
+         "ask1Size": "5000"},
+    ]}, "time": 1718000000000}),
+    "okx": _body({"code": "0", "msg": "", "data": [
+        {"instType": "SPOT", "instId": "BTC-USDT", "last": "67012", "bidPx": "67011.9",
+         "bidSz": "0.3", "askPx": "67012", "askSz": "1.1", "ts": "1718000000000"},
+        {"instType": "SPOT", "instId": "ETH-USDT", "bidPx": "3521.3", "bidSz": "",
+         "askPx": "3521.4", "askSz": "2"},
+        {"instType": "SPOT", "instId": "DEAD-USDT", "bidPx": "", "bidSz": "", "askPx": "", "askSz": ""},
+    ]}),
+    "gate": _body([
+        {"currency_pair": "BTC_USDT", "last": "67012.1", "lowest_ask": "67012.2",
+         "highest_bid": "67012.1", "lowest_size": "0.25", "highest_size": "0.9"},
+        {"currency_pair": "ETH_USDT", "lowest_ask": "3521.5", "highest_bid": "3521.4"},
+        {"currency_pair": "HALT_USDT", "lowest_ask": None, "highest_bid": None},
+        {"currency_pair": "DOGE_USDT", "lowest_ask": "0.16014", "highest_bid": "0.16013",
+         "lowest_size": None, "highest_size": "700"},
+    ]),
+    "kucoin": _body({"code": "200000", "data": {"time": 1718000000000, "ticker": [
+        {"symbol": "BTC-USDT", "buy": "67011.8", "sell": "67011.9", "bestBidSize": "0.02",
+         "bestAskSize": "0.31", "vol": "1520.3"},
+        {"symbol": "ETH-USDT", "buy": "3521.2", "sell": "3521.3", "bestBidSize": None,
+         "bestAskSize": "4"},
+        {"symbol": "DEAD-USDT", "buy": None, "sell": None},
+    ]}}),
+}
+
+ORDERBOOKS = {
+    "binance": _body({"lastUpdateId": 1027024, "bids": [["67012.01", "1.2"], ["67012.00", "0.004"]],
+                      "asks": [["67012.02", "3.0"], ["67012.50", "0.1"]]}),
+    "bybit": _body({"retCode": 0, "result": {"s": "BTCUSDT", "b": [["67011.9", "0.5"]],
+                                             "a": [["67012", "0.08"], ["67012.1", "2"]], "ts": 1}}),
+    "okx": _body({"code": "0", "data": [{"bids": [["67011.9", "0.3", "0", "2"]],
+                                         "asks": [["67012", "1.1", "0", "5"]], "ts": "1"}]}),
+    "gate": _body({"id": 123, "current": 1, "update": 1, "bids": [["67012.1", "0.9"]],
+                   "asks": [["67012.2", "0.25"], ["67013", "1"]]}),
+    "kucoin": _body({"code": "200000", "data": {"sequence": "1", "time": 1,
+                                                "bids": [["67011.8", "0.02"]],
+                                                "asks": [["67011.9", "0.31"]]}}),
+}
+
+EMPTY_ORDERBOOKS = {
+    "binance": _body({"bids": [], "asks": []}),
+    "bybit": _body({"retCode": 0, "result": None}),
+    "okx": _body({"code": "0", "data": []}),
+    "gate": _body({"bids": [], "asks": []}),
+    "kucoin": _body({"code": "200000", "data": None}),
+}
+
+UNIVERSE = {"BTCUSDT", "BTC-USDT", "BTC_USDT", "DOGEUSDT", "DOGE_USDT"}
+
+
+def _backend(monkeypatch, name: str) -> None:
+    if name == "msgspec":
+        pytest.importorskip("msgspec")
+        assert decoders.msgspec is not None
+        return
+
+    monkeypatch.setattr(decoders, "msgspec", None)
+    if name == "orjson":
+        orjson = pytest.importorskip("orjson")
+        monkeypatch.setattr(decoders, "_loads", orjson.loads)
+    else:
+        monkeypatch.setattr(decoders, "_loads", json.loads)
+
+
+def _decode_all() -> dict:
+    out = {}
+    for ex, body in TICKERS.items():
+        out["quotes", ex] = decoders.QUOTE_DECODERS[ex](body)
+        out["quotes_universe", ex] = decoders.QUOTE_DECODERS[ex](body, UNIVERSE)
+        if ex in decoders.TICKER_DECODERS:
+            out["tickers", ex] = decoders.TICKER_DECODERS[ex](body)
+    for ex, body in ORDERBOOKS.items():
+        out["orderbook", ex] = decoders.ORDERBOOK_DECODERS[ex](body)
+        out["orderbook_empty", ex] = decoders.ORDERBOOK_DECODERS[ex](EMPTY_ORDERBOOKS[ex])
+    return out
+
+
+@pytest.fixture(scope="module")
+def reference() -> dict:
+    with pytest.MonkeyPatch.context() as mp:
+        _backend(mp, "json")
+        return _decode_all()
+
+
+@pytest.mark.parametrize("backend", ["msgspec", "orjson", "json"])
+def test_backends_decode_identically(monkeypatch, reference, backend):
+    _backend(monkeypatch, backend)
+    assert _decode_all() == reference
+
+
+def test_reference_values(reference):
+    assert reference["quotes", "binance"]["BTCUSDT"] == {
+        "bid": 67012.01, "ask": 67012.02, "bid_size": 1.20471, "ask_size": 3.0152,
+    }
+    # строки без цен отбрасываются, пустые объёмы → 0
+    assert set(reference["quotes", "bybit"]) == {"BTCUSDT", "ETHUSDT", "DOGEUSDT"}
+    assert reference["quotes", "bybit"]["ETHUSDT"]["bid_size"] == 0.0
+    assert set(reference["quotes", "okx"]) == {"BTC-USDT", "ETH-USDT"}
+    assert set(reference["quotes", "gate"]) == {"BTC_USDT", "ETH_USDT", "DOGE_USDT"}
+    assert set(reference["quotes", "kucoin"]) == {"BTC-USDT", "ETH-USDT"}
+
+    assert set(reference["quotes_universe", "binance"]) == {"BTCUSDT", "DOGEUSDT"}
+    assert set(reference["quotes_universe", "okx"]) == {"BTC-USDT"}
+
+    assert reference["orderbook", "okx"] == ([[67011.9, 0.3]], [[67012.0, 1.1]])
+    assert all(ob == ([], []) for (kind, _), ob in reference.items() if kind == "orderbook_empty")
@@ -0,0 +1,152 @@
+"""
+depth_engine: накопленные суммы + searchsorted против прохода по уровням.
+"""
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from src.pipeline.depth_engine import DepthSide, DepthRoute
+
+
+def _book(rnd: random.Random, best: float, step: float, n: int) -> list:
+    return [[best + step * i, rnd.choice((0.1, 0.5, 1.0, 2.5))] for i in range(n)]
+
+
+def _walk_qty(levels: list, notional: float) -> float | None:
+    """
+    Эталон: уровни по очереди, последний — частично. None — глубины не хватает.
+    """
+    left, qty = notional, 0.0
+    for price, size in levels:
+        take = min(left, price * size)
+        qty += take / price
+        left -= take
+        if left <= 1e-9:
+            return qty
+    return None
+
+
+def _walk_notional(levels: list, qty: float) -> float | None:
+    left, notional = qty, 0.0
+    for price, size in levels:
+        take = min(left, size)
+        notional += take * price
+        left -= take
+        if left <= 1e-12:
+            return notional
+    return None
+
+
+def _walk_net(asks, bids, x, buy_mult, sell_mult, buffer_pct) -> float | None:
+    q = _walk_qty(asks, x)
+    proceeds = None if q is None else _walk_notional(bids, q)
+    if proceeds is None:
+        return None
+    return (proceeds * sell_mult - x * buy_mult) / (x * buy_mult) * 100 - buffer_pct
+
+
+# -------------------------------------------------------------------------
+# fill
+# -------------------------------------------------------------------------
+
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorised_fill_matches_level_walk(seed):
+    rnd = random.Random(seed)
+    levels = _book(rnd, 100.0, 0.05, 20)
+    side = DepthSide(levels, max_levels=len(levels))
+    total = sum(p * q for p, q in levels)
+
+    # случайные объёмы и ровно границы уровней
+    edges = list(np.cumsum([p * q for p, q in levels]))
+    notionals = [rnd.uniform(0, total) for _ in range(50)] + edges
+
+    got = side.qty_for_notional(notionals)
+    for x, q in zip(notionals, got):
+        assert q == pytest.approx(_walk_qty(levels, x), rel=1e-9)
+        assert side.vwap(x) == pytest.approx(x / _walk_qty(levels, x), rel=1e-9)
+
+    qtys = [rnd.uniform(0, side.total_qty) for _ in range(50)]
+    for q, n in zip(qtys, side.notional_for_qty(qtys)):
+        assert n == pytest.approx(_walk_notional(levels, q), rel=1e-9)
+
+
+def test_levels_beyond_max_are_ignored():
+    levels = [[100.0 + i, 1.0] for i in range(5)]
+    assert DepthSide(levels, max_levels=3).total_qty == 3.0
+
+
+def test_string_levels_and_extra_fields():
+    # OKX: [price, size, "0", orders]
+    side = DepthSide([["100", "1", "0", "3"], ["101", "2", "0", "1"]])
+    assert side.total_qty == 3.0
+    assert side.total_notional == 302.0
+
+
+# -------------------------------------------------------------------------
+# max_notional
+# -------------------------------------------------------------------------
+
+@pytest.mark.parametrize("seed", range(40))
+def test_max_notional_matches_brute_force(seed):
+    rnd = random.Random(seed)
+    asks = _book(rnd, 100.0, rnd.choice((0.1, 0.2, 0.4)), rnd.randint(1, 4))
+    bids = _book(rnd, 100.6, -rnd.choice((0.1, 0.2, 0.4)), rnd.randint(1, 4))
+    buy_mult, sell_mult, buffer_pct = 1.001, 0.999, 0.05
+    # разные пороги: весь стакан, корень внутри, ни при каком объёме
+    target = rnd.choice((0.0, 0.2, 0.4))
+
+    route = DepthRoute.from_mults(DepthSide(asks), DepthSide(bids), buy_mult, sell_mult, buffer_pct)
+    got = route.max_notional(target)
+
+    limit = route.max_depth_notional
+    grid = np.linspace(limit / 20_000, limit, 20_000)
+    ok = [x for x in grid if _walk_net(asks, bids, x, buy_mult, sell_mult, buffer_pct) >= target]
+    brute = max(ok) if ok else 0.0
+
+    step = grid[1] - grid[0]
+    assert brute - 1e-6 <= got <= brute + step + 1e-6
+    if got > 0:
+        assert _walk_net(asks, bids, got, buy_mult, sell_mult, buffer_pct) == pytest.approx(
+            target, abs=1e-6,
+        ) or got == pytest.approx(limit)
+
+
+# -------------------------------------------------------------------------
+# edge cases
+# -------------------------------------------------------------------------
+
+def test_empty_side():
+    route = DepthRoute(DepthSide([]), DepthSide([[101.0, 1.0]]), 0.1, 0.1)
+    assert route.max_depth_notional == 0.0
+    assert route.max_notional(0.1) == 0.0
+    assert route.profit_curve([10.0]) == []
+    assert DepthSide([]).vwap(10.0) is None
+
+
+def test_insufficient_depth_is_nan():
+    side = DepthSide([[100.0, 1.0], [101.0, 1.0]])
+    assert side.vwap(500.0) is None
+    assert math.isnan(float(side.qty_for_notional(500.0)))
+    assert math.isnan(float(side.notional_for_qty(2.5)))
+
+    route = DepthRoute(side, DepthSide([[105.0, 0.5]]), 0.0, 0.0, 0.0)
+    # продать можно только 0.5 — глубина маршрута по бидам
+    assert route.max_depth_notional == pytest.approx(50.0)
+    _, _, net = route.evaluate([40.0, 150.0])
+    assert net[0] == pytest.approx(5.0)
+    assert math.isnan(net[1])
+
+
+def test_crossed_book_fills_whole_depth():
+    # бид выше всех асков — прибыль на всей глубине
+    route = DepthRoute(DepthSide([[100.0, 1.0], [100.5, 1.0]]), DepthSide([[102.0, 5.0]]), 0.1, 0.1, 0.0)
+    assert route.max_notional(0.5) == pytest.approx(route.max_depth_notional)
+    assert route.max_depth_notional == pytest.approx(200.5)
+
+
+def test_unprofitable_route_is_zero():
+    route = DepthRoute(DepthSide([[100.0, 1.0]]), DepthSide([[99.0, 1.0]]), 0.1, 0.1, 0.0)
+    assert route.max_notional(0.0) == 0.0
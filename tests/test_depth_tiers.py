@@ -0,0 +1,117 @@
+"""
+Ступени глубины Stage-2: догрузка только при нехватке объёма, верхняя — последняя.
+"""
+
+import asyncio
+
+import pytest
+
+from src.config import MIN_EXECUTION_NOTIONAL_USDT
+from src.pipeline import stage_two_depth_check
+from src.pipeline.depth_tiers import DepthTiers
+from src.pipeline.route_costs import RouteCostMatrix
+from src.pipeline.stage_two_depth_check import process_stage_two_batch
+
+
+TIERS = {"binance": (5, 20, 100), "okx": (5, 20, 100)}
+SIGNAL = {"pair": "BTC_USDT", "direction": "binance→okx", "best_spread_pct": 1.0}
+COSTS = RouteCostMatrix(fees={}, buffer_pct=0.0)
+
+# глубокая сторона продажи: на любой ступени хватает
+DEEP_QTY = MIN_EXECUTION_NOTIONAL_USDT
+
+
+class _Exchange:
+    """
+    REST-стаканы по limit: покупка на binance (asks), продажа на okx (bids).
+    """
+
+    def __init__(self, ask_qty: float, levels: int = 500):
+        self.ask_qty = ask_qty
+        self.levels = levels
+        self.calls: list[tuple[str, int]] = []
+
+    async def __call__(self, exchange: str, symbol: str, limit: int | None = None):
+        self.calls.append((exchange, limit))
+        n = min(limit, self.levels)
+        if exchange == "binance":
+            asks = [[100.0 + i * 0.001, self.ask_qty] for i in range(n)]
+            bids = [[99.9, 1.0]]
+        else:
+            asks = [[102.1, 1.0]]
+            bids = [[102.0 - i * 0.001, DEEP_QTY] for i in range(n)]
+        return bids, asks
+
+    def depths(self, exchange: str) -> list[int]:
+        return [limit for ex, limit in self.calls if ex == exchange]
+
+
+def _run(monkeypatch, exchange: _Exchange, tiers: DepthTiers) -> dict:
+    monkeypatch.setattr(stage_two_depth_check, "_fetch_ob_safe", exchange)
+    (res,) = asyncio.run(process_stage_two_batch([dict(SIGNAL)], depth_tiers=tiers, costs=COSTS))
+    return res
+
+
+def _qty_per_level(levels: int) -> float:
+    # levels уровней по ~100 USDT покрывают ровно MIN_EXECUTION_NOTIONAL_USDT
+    return MIN_EXECUTION_NOTIONAL_USDT / levels / 100.0 * 1.01
+
+
+def test_shallow_tier_that_covers_target_stops(monkeypatch):
+    tiers = DepthTiers(TIERS)
+    exchange = _Exchange(ask_qty=_qty_per_level(5))
+
+    res = _run(monkeypatch, exchange, tiers)
+
+    assert res["status"] == "confirmed"
+    assert exchange.depths("binance") == [5]
+    assert exchange.depths("okx") == [5]
+    assert tiers.escalations == 0
+
+
+def test_insufficient_depth_escalates_short_leg_only(monkeypatch):
+    tiers = DepthTiers(TIERS)
+    exchange = _Exchange(ask_qty=_qty_per_level(20))
+
+    res = _run(monkeypatch, exchange, tiers)
+
+    assert res["status"] == "confirmed"
+    assert exchange.depths("binance") == [5, 20]
+    assert exchange.depths("okx") == [5]
+    assert tiers.escalations == 1
+    # следующая проверка ноги начинается с хватившей ступени
+    assert tiers.depth("binance", "BTCUSDT") == 20
+    assert tiers.depth("okx", "BTC-USDT") == 5
+
+
+def test_top_tier_is_final(monkeypatch):
+    tiers = DepthTiers(TIERS)
+    exchange = _Exchange(ask_qty=_qty_per_level(1000))
+
+    res = _run(monkeypatch, exchange, tiers)
+
+    assert res["status"] == "rejected"
+    assert res["reason"] == "insufficient_depth"
+    assert exchange.depths("binance") == [5, 20, 100]
+    assert tiers.escalations == 2
+    assert tiers.depth("binance", "BTCUSDT") == 100
+
+
+def test_short_book_does_not_escalate(monkeypatch):
+    # биржа отдала меньше уровней, чем просили — глубже нет
+    tiers = DepthTiers(TIERS)
+    exchange = _Exchange(ask_qty=_qty_per_level(1000), levels=3)
+
+    res = _run(monkeypatch, exchange, tiers)
+
+    assert res["reason"] == "insufficient_depth"
+    assert exchange.depths("binance") == [5]
+    assert tiers.escalations == 0
+
+
+@pytest.mark.parametrize("levels, tier", [(1, 5), (5, 5), (6, 20), (100, 100), (400, 100)])
+def test_record_picks_smallest_covering_tier(levels, tier):
+    tiers = DepthTiers(TIERS)
+    tiers.record("binance", "X", levels)
+    assert tiers.depth("binance", "X") == tier
+    assert tiers.deeper("binance", 100) is None
@@ -0,0 +1,38 @@
+"""
+http_session: смена event loop не оставляет старый клиент открытым.
+"""
+
+import asyncio
+
+from src.exchanges import http_session
+
+
+async def _get():
+    client = http_session.get_client("binance")
+    # даём отработать задаче закрытия заменённого клиента
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    return client
+
+
+def test_client_from_dead_loop_is_closed_on_replace():
+    first = asyncio.run(_get())
+    second = asyncio.run(_get())
+    try:
+        assert second is not first
+        assert first.is_closed
+        assert not second.is_closed
+    finally:
+        asyncio.run(http_session.close_sessions())
+        http_session._clients.clear()
+
+
+def test_same_loop_reuses_client():
+    async def _twice():
+        a, b = http_session.get_client("okx"), http_session.get_client("okx")
+        await http_session.close_sessions()
+        return a, b
+
+    a, b = asyncio.run(_twice())
+    assert a is b
+    assert a.is_closed
@@ -0,0 +1,148 @@
+"""
+OrderbookCache: single-flight, TTL, LRU и отмена ожидающего.
+"""
+
+import asyncio
+
+import pytest
+
+from src.exchanges import orderbook_cache
+from src.exchanges.orderbook_cache import OrderbookCache
+
+
+BOOK = ([[100.0, 1.0]] * 5, [[101.0, 1.0]] * 5)
+
+
+class _Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(orderbook_cache, "time", clock)
+    return clock
+
+
+class _Fetcher:
+
+    def __init__(self, book=BOOK):
+        self.book = book
+        self.calls = []
+        self.release = asyncio.Event()
+        self.cancelled = False
+
+    async def __call__(self, exchange: str, symbol: str, depth: int):
+        self.calls.append((exchange, symbol, depth))
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.book
+
+
+def test_concurrent_gets_share_one_fetch(clock):
+    async def _run():
+        cache = OrderbookCache(ttl_s={"binance": 1.0})
+        fetch = _Fetcher()
+
+        waiters = [asyncio.create_task(cache.get("binance", "BTCUSDT", fetch, 5)) for _ in range(10)]
+        await asyncio.sleep(0)
+        fetch.release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert len(fetch.calls) == 1
+        assert all(book == BOOK for book, _ in results)
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["coalesced"] == 9
+
+    asyncio.run(_run())
+
+
+def test_expired_entry_refetches(clock):
+    async def _run():
+        cache = OrderbookCache(ttl_s={"binance": 1.0})
+        fetch = _Fetcher()
+        fetch.release.set()
+
+        await cache.get("binance", "BTCUSDT", fetch, 5)
+        clock.now += 0.5
+        _, age = await cache.get("binance", "BTCUSDT", fetch, 5)
+        assert age == pytest.approx(0.5)
+        assert len(fetch.calls) == 1
+
+        clock.now += 1.0
+        await cache.get("binance", "BTCUSDT", fetch, 5)
+        assert len(fetch.calls) == 2
+        assert cache.hits == 1
+
+    asyncio.run(_run())
+
+
+def test_lru_evicts_oldest_and_empty_is_not_cached(clock):
+    async def _run():
+        cache = OrderbookCache(ttl_s={}, max_entries=2, default_ttl_s=10.0)
+        fetch = _Fetcher()
+        fetch.release.set()
+
+        for sym in ("A", "B"):
+            await cache.get("okx", sym, fetch, 5)
+        await cache.get("okx", "A", fetch, 5)             # A — свежее B
+        await cache.get("okx", "C", fetch, 5)
+        assert len(cache) == 2
+
+        await cache.get("okx", "A", fetch, 5)
+        assert len(fetch.calls) == 3                       # A остался
+        await cache.get("okx", "B", fetch, 5)
+        assert len(fetch.calls) == 4                       # B вытеснен
+
+        empty = _Fetcher(([], []))
+        empty.release.set()
+        await cache.get("okx", "D", empty, 5)
+        await cache.get("okx", "D", empty, 5)
+        assert len(empty.calls) == 2
+
+    asyncio.run(_run())
+
+
+def test_deeper_request_refetches(clock):
+    async def _run():
+        cache = OrderbookCache(ttl_s={"gate": 10.0})
+        fetch = _Fetcher()
+        fetch.release.set()
+
+        await cache.get("gate", "X", fetch, 5)
+        await cache.get("gate", "X", fetch, 5)
+        await cache.get("gate", "X", fetch, 20)            # глубже кэша
+        assert [c[2] for c in fetch.calls] == [5, 20]
+
+    asyncio.run(_run())
+
+
+def test_cancelled_waiter_does_not_cancel_shared_fetch(clock):
+    async def _run():
+        cache = OrderbookCache(ttl_s={"binance": 1.0})
+        fetch = _Fetcher()
+
+        first = asyncio.create_task(cache.get("binance", "BTCUSDT", fetch, 5))
+        second = asyncio.create_task(cache.get("binance", "BTCUSDT", fetch, 5))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        fetch.release.set()
+
+        book, _ = await second
+        assert book == BOOK
+        assert first.cancelled()
+        assert not fetch.cancelled
+        assert len(fetch.calls) == 1
+        assert len(cache) == 1
+
+    asyncio.run(_run())
@@ -0,0 +1,60 @@
+"""
+LocalOrderBook: последовательности диффов бирж после снимка.
+"""
+
+from src.exchanges.kucoin import kucoin_ws
+from src.streams.orderbook_l2 import LocalOrderBook
+
+
+def _kucoin(start: int, end: int, bids=(), asks=()) -> dict:
+    msg = {
+        "type": "message",
+        "topic": "/market/level2:BTC-USDT",
+        "subject": "trade.l2update",
+        "data": {
+            "symbol": "BTC-USDT",
+            "sequenceStart": start,
+            "sequenceEnd": end,
+            "changes": {"bids": [list(b) for b in bids], "asks": [list(a) for a in asks]},
+        },
+    }
+    (ev,) = kucoin_ws.parse_depth_message(msg)
+    return ev
+
+
+def _book() -> LocalOrderBook:
+    book = LocalOrderBook("kucoin", "BTC-USDT")
+    book.load_snapshot([["100", "1"], ["99", "2"]], [["101", "1"]], last_id=100)
+    return book
+
+
+def test_kucoin_straddling_message_skips_changes_in_snapshot():
+    book = _book()
+
+    # сообщение 99..101: изменения 99 и 100 уже учтены снимком
+    ev = _kucoin(99, 101, bids=[("100", "5", "99"), ("99", "0", "100"), ("98", "3", "101")])
+    assert book.apply(ev)
+
+    assert book.bids[100.0] == ("100", "1")
+    assert book.bids[99.0] == ("99", "2")
+    assert book.bids[98.0] == ("98", "3")
+    assert book.last_id == 101
+
+
+def test_kucoin_following_message_applies_all_changes():
+    book = _book()
+
+    assert book.apply(_kucoin(101, 102, bids=[("100", "0", "101")], asks=[("101", "4", "102")]))
+    assert 100.0 not in book.bids
+    assert book.asks[101.0] == ("101", "4")
+
+
+def test_kucoin_gap_requests_resync():
+    book = _book()
+    assert not book.apply(_kucoin(103, 104, bids=[("98", "1", "103")]))
+
+
+def test_kucoin_old_message_is_ignored():
+    book = _book()
+    assert book.apply(_kucoin(95, 100, bids=[("100", "9", "100")]))
+    assert book.bids[100.0] == ("100", "1")
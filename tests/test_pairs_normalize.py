@@ -0,0 +1,91 @@
+"""
+Stage-0: колоночный (pandas) разбор тикеров против построчного.
+"""
+
+import asyncio
+import random
+
+from src.utils import pairs_normalize
+from src.utils.pairs_normalize import EXCHANGES, VOLUME_FIELDS, normalize_pairs, leg_volumes
+from src.utils.pairs_normalize_pandas import normalize_pairs_pandas, leg_volumes_pandas
+
+
+def _symbol(exchange: str, base: str, quote: str) -> str:
+    if exchange in ("okx", "kucoin"):
+        return f"{base}-{quote}"
+    if exchange == "gate":
+        return f"{base}_{quote}"
+    return f"{base}{quote}"
+
+
+def _raws(n: int = 400, seed: int = 5) -> list[list]:
+    """
+    Тикеры всех бирж: не-USDT символы, пустые / нулевые обороты, дубли ключей,
+    у OKX — запасное поле оборота.
+    """
+    rnd = random.Random(seed)
+    raws = []
+
+    for name in EXCHANGES:
+        sym_field, vol_fields = VOLUME_FIELDS[name]
+        rows = []
+        for i in range(n):
+            quote = "USDT" if rnd.random() < 0.8 else "BTC"
+            base = f"C{i - 1}" if i and rnd.random() < 0.05 else f"C{i}"
+            row = {sym_field: _symbol(name, base, quote), "last": "1.0"}
+            for field in vol_fields:
+                if rnd.random() < 0.8:
+                    row[field] = rnd.choice(("", "0", f"{rnd.uniform(0, 3e6):.2f}"))
+            rows.append(row)
+        # символ без поля оборота и пустой символ
+        rows.append({sym_field: _symbol(name, "NOVOL", "USDT")})
+        rows.append({sym_field: ""})
+        raws.append(rows)
+
+    return raws
+
+
+def test_pair_table_matches_loop():
+    raws = _raws()
+    ref = normalize_pairs(raws)
+    assert ref
+    assert normalize_pairs_pandas(raws) == ref
+
+
+def test_leg_volumes_match_loop():
+    raws = _raws()
+    ref = leg_volumes(raws)
+    assert leg_volumes_pandas(raws) == ref
+    # ноги без порога — в том числе нулевые
+    assert ref["NOVOL_USDT"]["binance"] == ("NOVOLUSDT", 0.0)
+
+
+def test_most_liquid_symbol_wins_per_key():
+    raws = [[] for _ in EXCHANGES]
+    raws[0] = [
+        {"symbol": "ABCUSDT", "quoteVolume": "500000"},
+        {"symbol": "ABC_USDT", "quoteVolume": "900000"},
+        {"symbol": "ABC-USDT", "quoteVolume": "900000"},
+    ]
+    assert leg_volumes_pandas(raws) == leg_volumes(raws) == {
+        "ABC_USDT": {"binance": ("ABC_USDT", 900000.0)},
+    }
+
+
+def test_stage0_switch_uses_columnar_path(monkeypatch):
+    raws = _raws(50)
+    calls = []
+
+    async def _fetch(*args):
+        return raws
+
+    def _columnar(r):
+        calls.append(r)
+        return leg_volumes_pandas(r)
+
+    monkeypatch.setattr(pairs_normalize, "fetch_all_tickers", _fetch)
+    monkeypatch.setattr(pairs_normalize, "STAGE0_NORMALIZER", "columnar")
+    monkeypatch.setattr("src.utils.pairs_normalize_pandas.leg_volumes_pandas", _columnar)
+
+    assert asyncio.run(pairs_normalize.fetch_leg_volumes()) == leg_volumes(raws)
+    assert calls == [raws]
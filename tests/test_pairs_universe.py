@@ -0,0 +1,140 @@
+"""
+PairsUniverse: диффы, версии и гистерезис оборота.
+"""
+
+from src.pipeline.pairs_universe import PairsUniverse, follow
+
+
+EXCHANGES = ("binance", "okx")
+TIERS = (100.0, 1_000.0)        # вход 100, выход ниже 80
+
+
+def _universe() -> PairsUniverse:
+    return PairsUniverse(EXCHANGES, tiers=TIERS, exit_ratio=0.8, history=4)
+
+
+def _legs(bn: float | None = None, okx: float | None = None, key: str = "BTC_USDT") -> dict:
+    by_ex = {}
+    if bn is not None:
+        by_ex["binance"] = ("BTCUSDT", bn)
+    if okx is not None:
+        by_ex["okx"] = ("BTC-USDT", okx)
+    return {key: by_ex}
+
+
+def test_diff_added_removed_and_version():
+    u = _universe()
+
+    diff = u.update(_legs(bn=150.0, okx=150.0))
+    assert diff["version"] == 1 and diff["base"] == 0
+    assert sorted(diff["added"]) == [("BTC_USDT", "binance", "BTCUSDT"), ("BTC_USDT", "okx", "BTC-USDT")]
+    assert u.pairs == {"BTC_USDT": {"binance": "BTCUSDT", "okx": "BTC-USDT"}}
+
+    diff = u.update(_legs(bn=150.0))
+    assert diff["removed"] == [("BTC_USDT", "okx", "BTC-USDT")]
+    assert u.pairs["BTC_USDT"]["okx"] is None
+    assert u.version == 2
+
+    # последняя нога ушла — пара удаляется из таблицы
+    u.update({})
+    assert u.pairs == {}
+    assert u.version == 3
+
+
+def test_version_only_moves_on_real_change():
+    u = _universe()
+    u.update(_legs(bn=150.0, okx=150.0))
+    pairs = u.pairs
+
+    # обороты меняются, но ноги и тиры те же
+    assert u.update(_legs(bn=170.0, okx=400.0)) is None
+    assert u.version == 1
+    assert u.pairs is pairs
+
+    # только тир — таблица та же, версия растёт
+    diff = u.update(_legs(bn=5_000.0, okx=400.0))
+    assert diff["tiers"] == [("BTC_USDT", "binance", 1)]
+    assert not diff["added"] and not diff["removed"]
+    assert u.pairs is pairs
+    assert u.version == 2
+
+
+def test_leg_below_admit_threshold_does_not_flap():
+    u = _universe()
+
+    # чуть ниже порога входа — не входит ни разу
+    assert u.update(_legs(bn=99.0, okx=150.0))["added"] == [("BTC_USDT", "okx", "BTC-USDT")]
+    assert u.update(_legs(bn=99.5, okx=150.0)) is None
+    assert u.pairs["BTC_USDT"]["binance"] is None
+
+    # вошла — колебания между порогом выхода и входа её не выбивают
+    u.update(_legs(bn=101.0, okx=150.0))
+    version = u.version
+    assert u.update(_legs(bn=85.0, okx=150.0)) is None
+    assert u.update(_legs(bn=99.0, okx=150.0)) is None
+    assert u.version == version
+    assert u.pairs["BTC_USDT"]["binance"] == "BTCUSDT"
+
+    # ниже порога выхода — выходит
+    assert u.update(_legs(bn=79.0, okx=150.0))["removed"] == [("BTC_USDT", "binance", "BTCUSDT")]
+
+
+def test_tier_hysteresis():
+    u = _universe()
+    u.update(_legs(bn=1_500.0))
+    assert u.tier("BTC_USDT", "binance") == 1
+
+    assert u.update(_legs(bn=900.0)) is None           # выше 800 — тир держится
+    assert u.update(_legs(bn=700.0))["tiers"] == [("BTC_USDT", "binance", 0)]
+
+
+def test_symbol_change_replaces_leg():
+    u = _universe()
+    u.update(_legs(bn=150.0))
+    diff = u.update({"BTC_USDT": {"binance": ("BTC_USDT_NEW", 150.0)}})
+    assert diff["removed"] == [("BTC_USDT", "binance", "BTCUSDT")]
+    assert diff["added"] == [("BTC_USDT", "binance", "BTC_USDT_NEW")]
+
+
+class _Consumer:
+
+    def __init__(self):
+        self.calls = []
+
+    def set_pairs(self, pairs):
+        self.calls.append(("set", dict(pairs)))
+
+    def apply_diff(self, diff, pairs):
+        self.calls.append(("diff", diff["version"]))
+
+
+def test_follow_uses_diffs_then_falls_back_to_snapshot():
+    u = _universe()
+    consumer = _Consumer()
+
+    version = follow(u, consumer, 0)
+    assert consumer.calls == []
+
+    u.update(_legs(bn=150.0))
+    u.update(_legs(bn=150.0, okx=150.0))
+    version = follow(u, consumer, version)
+    assert consumer.calls == [("diff", 1), ("diff", 2)]
+
+    # история (4 диффа) не покрывает отставшего — полный снимок
+    for n in range(6):
+        u.update(_legs(bn=150.0, okx=150.0, key=f"C{n}_USDT"))
+    consumer.calls.clear()
+    assert follow(u, consumer, version) == u.version
+    assert [c[0] for c in consumer.calls] == ["set"]
+
+
+def test_state_restore_round_trip():
+    u = _universe()
+    u.update(_legs(bn=1_500.0, okx=150.0))
+
+    other = _universe()
+    other.restore(u.state())
+    assert other.pairs == u.pairs
+    assert other.version == u.version
+    assert other.tier("BTC_USDT", "binance") == 1
+    assert other.diffs_since(0) is None
@@ -0,0 +1,143 @@
+"""
+rate_limit: вес эндпоинтов, приоритеты очереди, синхронизация по заголовкам.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.config import (
+    RATE_LIMIT_HEADROOM,
+    BINANCE_TICKERS_ENDPOINT,
+    BINANCE_ORDERBOOK_ENDPOINT,
+    BINANCE_FEES_ENDPOINT,
+    BYBIT_TICKERS_ENDPOINT,
+)
+from src.exchanges import rate_limit
+from src.exchanges.rate_limit import (
+    ExchangeRateLimiter,
+    TokenBucket,
+    PRIORITY_STAGE2,
+    PRIORITY_STAGE1,
+    PRIORITY_BACKGROUND,
+    binance_depth_weight,
+    get_limiter,
+    remaining_budget,
+    set_process_share,
+)
+
+
+class _Clock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def _fresh_limiters():
+    set_process_share(1.0)
+    yield
+    set_process_share(1.0)
+
+
+def _full(limiter: ExchangeRateLimiter, bucket: str) -> float:
+    return limiter.buckets[bucket].capacity
+
+
+def test_endpoint_weights_are_charged_to_their_bucket(clock):
+    lim = ExchangeRateLimiter("binance")
+    ip, sapi = _full(lim, "ip"), _full(lim, "sapi")
+
+    async def _run():
+        await lim.acquire(BINANCE_TICKERS_ENDPOINT, PRIORITY_STAGE1)
+        await lim.acquire(BINANCE_ORDERBOOK_ENDPOINT, PRIORITY_STAGE2, binance_depth_weight(500))
+        await lim.acquire(BINANCE_FEES_ENDPOINT, PRIORITY_BACKGROUND)
+        await lim.acquire("/unknown", PRIORITY_BACKGROUND)       # первый бакет, вес 1
+
+    asyncio.run(_run())
+
+    assert lim.buckets["ip"].remaining == ip - 80 - 25 - 1
+    assert lim.buckets["sapi"].remaining == sapi - 1
+    assert lim.requests == 4
+
+    # пополнение по времени, не выше ёмкости
+    clock.now += 1.0
+    assert lim.buckets["ip"].remaining == ip - 106 + lim.buckets["ip"].rate
+    clock.now += 3600.0
+    assert lim.buckets["ip"].remaining == ip
+
+
+def test_waiters_are_served_by_priority():
+    # ёмкость — один запрос, пополнение ~ раз в 10 мс
+    bucket = TokenBucket(1.0 / RATE_LIMIT_HEADROOM, 100.0 / RATE_LIMIT_HEADROOM)
+    order = []
+
+    async def _req(name: str, priority: int):
+        await bucket.acquire(1.0, priority)
+        order.append(name)
+
+    async def _run():
+        await bucket.acquire(1.0)                                 # бюджет исчерпан
+        await asyncio.gather(
+            _req("background", PRIORITY_BACKGROUND),
+            _req("stage1", PRIORITY_STAGE1),
+            _req("stage2", PRIORITY_STAGE2),
+            _req("stage2b", PRIORITY_STAGE2),
+        )
+
+    asyncio.run(_run())
+
+    assert order == ["stage2", "stage2b", "stage1", "background"]
+    assert bucket.throttled == 4
+
+
+def test_usage_headers_resync_budget(clock):
+    lim = ExchangeRateLimiter("binance")
+
+    # биржа: использовано 5000 из 6000 — локально остаётся не больше 1000 * HEADROOM
+    lim.observe(BINANCE_TICKERS_ENDPOINT, httpx.Response(200, headers={"X-MBX-USED-WEIGHT-1M": "5000"}))
+    assert lim.buckets["ip"].remaining == pytest.approx(1000 * RATE_LIMIT_HEADROOM)
+
+    # отчёт с большим остатком бюджет не поднимает
+    lim.observe(BINANCE_TICKERS_ENDPOINT, httpx.Response(200, headers={"X-MBX-USED-WEIGHT-1M": "10"}))
+    assert lim.buckets["ip"].remaining == pytest.approx(1000 * RATE_LIMIT_HEADROOM)
+
+    bybit = ExchangeRateLimiter("bybit")
+    bybit.observe(BYBIT_TICKERS_ENDPOINT, httpx.Response(200, headers={"X-Bapi-Limit-Status": "7"}))
+    assert bybit.buckets["ip"].remaining == pytest.approx(7 * RATE_LIMIT_HEADROOM)
+
+    # мусор в заголовке игнорируется
+    bybit.observe(BYBIT_TICKERS_ENDPOINT, httpx.Response(200, headers={"X-Bapi-Limit-Status": "n/a"}))
+    assert bybit.buckets["ip"].remaining == pytest.approx(7 * RATE_LIMIT_HEADROOM)
+
+
+def test_429_blocks_bucket_until_retry_after(clock):
+    lim = ExchangeRateLimiter("binance")
+    lim.observe(BINANCE_TICKERS_ENDPOINT, httpx.Response(429, headers={"Retry-After": "2"}))
+
+    assert lim.rejected == 1
+    assert lim.buckets["ip"].remaining == 0.0
+    clock.now += 1.0
+    assert lim.buckets["ip"].remaining == 0.0             # ещё заблокирован
+    clock.now += 2.0
+    assert lim.buckets["ip"].remaining > 0.0
+
+
+def test_process_share_splits_exchange_budget(clock):
+    set_process_share(0.5)
+    lim = get_limiter("binance")
+
+    assert lim.buckets["ip"].capacity == pytest.approx(6000 * RATE_LIMIT_HEADROOM * 0.5)
+    assert lim.buckets["ip"].rate == pytest.approx(100.0 * RATE_LIMIT_HEADROOM * 0.5)
+    assert remaining_budget()["binance"]["share"] == 0.5
@@ -0,0 +1,79 @@
+"""
+RouteCostMatrix: Stage-1 и Stage-2 считают чистый спред по одним комиссиям.
+"""
+
+import asyncio
+
+import pytest
+
+from src.ipc.records import encode_signal, decode_signal
+from src.pipeline.route_costs import RouteCostMatrix, binance_fee_overrides
+from src.pipeline.stage_two_depth_check import process_stage_two_batch
+
+
+PAIR = "BTC_USDT"
+
+
+def _costs() -> RouteCostMatrix:
+    return RouteCostMatrix(
+        fees={"binance": 0.10, "okx": 0.08},
+        buffer_pct=0.05,
+        overrides=binance_fee_overrides([{"symbol": "BTCUSDT", "takerCommission": "0.0002"}]),
+    )
+
+
+def _signal(costs: RouteCostMatrix | None = None) -> dict:
+    sig = {
+        "pair": PAIR,
+        "direction": "binance→okx",
+        "best_spread_pct": 1.0,
+        # L1 с большим объёмом — быстрый путь Stage-2, без стаканов
+        "buy_ask": 100.0,
+        "buy_ask_size": 1_000.0,
+        "sell_bid": 101.0,
+        "sell_bid_size": 1_000.0,
+    }
+    if costs is not None:
+        mults = costs.pair_mults(PAIR)
+        sig["buy_mult"] = costs.buy_mult("binance", mults)
+        sig["sell_mult"] = costs.sell_mult("okx", mults)
+    return sig
+
+
+def test_pair_override_applies_to_its_leg_only():
+    costs = _costs()
+    assert costs.pair_mults(PAIR)[0]["binance"] == pytest.approx(1.0002)
+    assert costs.buy_mult("binance") == pytest.approx(1.001)
+    assert costs.pair_mults("ETH_USDT") is None
+
+
+def test_update_rebuilds_only_on_change():
+    costs = _costs()
+    version = costs.version
+    assert not costs.update(fees=dict(costs.fees))
+    assert costs.version == version
+    assert costs.update(buffer_pct=0.1)
+    assert costs.version == version + 1
+
+
+@pytest.mark.parametrize("in_signal", [True, False])
+def test_stage_two_matches_stage_one_net(in_signal):
+    costs = _costs()
+    stage1 = costs.route_net_pct("binance", "okx", 100.0, 101.0, PAIR)
+
+    # множители — из сигнала (как в main.py) или из матрицы Stage-2
+    sig = _signal(costs if in_signal else None)
+    (res,) = asyncio.run(process_stage_two_batch([sig], costs=costs))
+
+    assert res["status"] == "confirmed"
+    assert res["source"] == "l1"
+    assert res["exec_spread_pct"] == pytest.approx(stage1, abs=1e-12)
+
+
+def test_signal_carries_leg_mults():
+    costs = _costs()
+    sig = dict(_signal(costs), buy_exchange="binance", sell_exchange="okx", spread_pct=1.0)
+
+    out = decode_signal(encode_signal(sig))
+    assert out["buy_mult"] == sig["buy_mult"]
+    assert out["sell_mult"] == sig["sell_mult"]
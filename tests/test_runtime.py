@@ -0,0 +1,41 @@
+"""
+run_worker: один loop на воркер, при выходе — отмена фоновых задач и закрытие.
+"""
+
+import asyncio
+
+from src.utils import runtime
+
+
+def test_run_worker_runs_and_cleans_up(monkeypatch):
+    monkeypatch.setattr(runtime, "HTTP_WARMUP_ON_START", False)
+    monkeypatch.setattr(runtime, "loop_factory", lambda: None)
+    seen = {}
+
+    async def _background():
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            seen["cancelled"] = True
+            raise
+
+    async def _gen():
+        try:
+            yield 1
+            yield 2
+        finally:
+            seen["agen_closed"] = True
+
+    async def _worker():
+        seen["loop"] = asyncio.get_running_loop()
+        asyncio.get_running_loop().create_task(_background())
+        agen = _gen()
+        await agen.__anext__()
+        seen["agen"] = agen
+        await asyncio.sleep(0)
+
+    runtime.run_worker("Test", _worker())
+
+    assert seen["loop"].is_closed()
+    assert seen["cancelled"]
+    assert seen["agen_closed"]
@@ -0,0 +1,117 @@
+"""
+SignalMailbox: последний сигнал на пару, drop-oldest, seqlock (один процесс).
+"""
+
+import threading
+
+import pytest
+
+from src.ipc.signal_mailbox import SignalMailbox
+
+
+def _sig(pair: str, spread: float) -> dict:
+    return {
+        "pair": pair,
+        "buy_exchange": "binance",
+        "sell_exchange": "okx",
+        "spread_pct": spread,
+        "ts": 1_700_000_000.0 + spread,
+    }
+
+
+@pytest.fixture
+def mailbox():
+    box = SignalMailbox.create(capacity=4)
+    reader = SignalMailbox.attach(box.name)
+    yield box, reader
+    reader.close()
+    box.close()
+
+
+def _drain(reader: SignalMailbox) -> list[tuple[str, float]]:
+    out = []
+    while (sig := reader.get_nowait()) is not None:
+        out.append((sig["pair"], sig["spread_pct"]))
+    return out
+
+
+def test_same_pair_keeps_one_slot_with_newest(mailbox):
+    box, reader = mailbox
+
+    assert box.put(_sig("BTC_USDT", 1.0))
+    assert not box.put(_sig("BTC_USDT", 2.0))        # заменил непрочитанный
+    assert not box.put(_sig("BTC_USDT", 3.0))
+
+    assert len(reader) == 1
+    assert _drain(reader) == [("BTC_USDT", 3.0)]
+    assert box.stats() == {"depth": 0, "puts": 3, "coalesced": 2, "dropped": 0}
+
+    # прочитанная пара снова попадает в очередь при обновлении
+    assert box.put(_sig("BTC_USDT", 4.0))
+    assert _drain(reader) == [("BTC_USDT", 4.0)]
+
+
+def test_overflow_drops_oldest_and_counts_it(mailbox):
+    box, reader = mailbox
+
+    for n, pair in enumerate(("A_USDT", "B_USDT", "C_USDT", "D_USDT")):
+        box.put(_sig(pair, float(n)))
+    box.put(_sig("A_USDT", 10.0))                     # A — снова самая свежая
+
+    # новая пара занимает слот самой давно обновлённой (B), её сигнал теряется
+    assert not box.put(_sig("E_USDT", 5.0))
+
+    assert box.stats()["dropped"] == 1
+    assert box.stats()["coalesced"] == 1
+    got = dict(_drain(reader))
+    assert got == {"A_USDT": 10.0, "C_USDT": 2.0, "D_USDT": 3.0, "E_USDT": 5.0}
+
+
+def test_eviction_of_read_pair_is_not_a_drop(mailbox):
+    box, reader = mailbox
+
+    for n, pair in enumerate(("A_USDT", "B_USDT", "C_USDT", "D_USDT")):
+        box.put(_sig(pair, float(n)))
+    _drain(reader)
+
+    assert box.put(_sig("E_USDT", 5.0))
+    assert box.stats()["dropped"] == 0
+    assert _drain(reader) == [("E_USDT", 5.0)]
+
+
+def test_reader_retries_while_slot_is_being_written(mailbox):
+    box, reader = mailbox
+    box.put(_sig("BTC_USDT", 1.0))
+
+    # писатель «на середине» записи: seq нечётный, запись недописана
+    i = box._slots[b"BTC_USDT"]
+    box._seq[i] += 1
+    box._records[i]["spread_pct"] = 2.0
+
+    def _finish():
+        box._records[i]["spread_pct"] = 3.0
+        box._seq[i] += 1
+
+    done = threading.Timer(0.05, _finish)
+    done.start()
+    try:
+        sig = reader.get_nowait()
+    finally:
+        done.join()
+
+    assert sig["spread_pct"] == 3.0
+    assert reader.get_nowait() is None
+
+
+def test_restarted_writer_reuses_slots(mailbox):
+    box, reader = mailbox
+    box.put(_sig("BTC_USDT", 1.0))
+    box.put(_sig("ETH_USDT", 2.0))
+
+    writer = SignalMailbox.attach(box.name)
+    try:
+        assert not writer.put(_sig("BTC_USDT", 3.0))  # тот же слот, непрочитан
+    finally:
+        writer.close()
+
+    assert dict(_drain(reader)) == {"BTC_USDT": 3.0, "ETH_USDT": 2.0}
@@ -0,0 +1,132 @@
+"""
+Движки Stage-1 против эталонного цикла _candidates_python на одних книгах.
+
+NumPy и столбцы — точное равенство; tracker и инкрементальный движок — по
+набору пар и чистому спреду (при равных спредах маршрут может отличаться).
+"""
+
+import random
+
+import pytest
+
+from src.pipeline.route_costs import RouteCostMatrix, NO_COSTS
+from src.pipeline.stage_one_price_snapshot_candidates import _candidates_python
+from src.pipeline.spread_matrix import candidates_numpy
+from src.pipeline.columnar_quotes import candidates_columnar
+from src.pipeline.route_tracker import candidates_tracker
+from src.pipeline.stage_one_incremental import IncrementalStageOne
+
+
+N_PAIRS = 300
+EXCHANGES = ["binance", "bybit", "okx", "gate", "kucoin"]
+MAX_AGE_S = 5.0
+MIN_PCT = 0.1
+
+
+def _quote(rnd: random.Random, mid: float) -> dict:
+    # цены на сетке — чтобы встречались равные спреды
+    bid = round(mid * (1 + rnd.randint(-10, 10) * 0.001), 6)
+    return {"bid": bid, "ask": round(bid * 1.0005, 6), "bid_size": 1.0, "ask_size": 1.0}
+
+
+def _market(seed: int = 7):
+    """
+    pairs, книги по биржам и mid каждой пары; ~30% ног отсутствуют.
+    """
+    rnd = random.Random(seed)
+    books = {name: {} for name in EXCHANGES}
+    pairs, mids = {}, {}
+
+    for p in range(N_PAIRS):
+        key = f"C{p}_USDT"
+        mids[key] = rnd.choice((0.01, 1.0, 100.0))
+        mapping = {}
+        for name in EXCHANGES:
+            if rnd.random() > 0.7:
+                mapping[name] = None
+                continue
+            sym = f"C{p}-{name}"
+            mapping[name] = sym
+            books[name][sym] = _quote(rnd, mids[key])
+        pairs[key] = mapping
+
+    return pairs, books, mids
+
+
+def _costs(pairs) -> RouteCostMatrix:
+    rnd = random.Random(11)
+    fees = {name: rnd.choice((0.02, 0.05, 0.075, 0.1)) for name in EXCHANGES}
+    overrides = {
+        (rnd.choice(EXCHANGES), key): rnd.choice((0.0, 0.01, 0.2))
+        for key in rnd.sample(sorted(pairs), len(pairs) // 10)
+    }
+    return RouteCostMatrix(fees=fees, buffer_pct=0.05, overrides=overrides)
+
+
+def _net(candidates: dict) -> dict:
+    return {key: c["net_spread_pct"] for key, c in candidates.items()}
+
+
+@pytest.fixture(params=["no_costs", "costs"])
+def market(request):
+    pairs, books, mids = _market()
+    costs = NO_COSTS if request.param == "no_costs" else _costs(pairs)
+    return pairs, books, mids, costs
+
+
+def test_fixture_has_routes(market):
+    pairs, books, _, costs = market
+    exchanges = [(name, books[name], 0.0) for name in EXCHANGES]
+    assert len(_candidates_python(pairs, exchanges, 0.0, MAX_AGE_S, MIN_PCT, costs)) > 10
+
+
+@pytest.mark.parametrize("engine", [candidates_numpy, candidates_columnar])
+def test_vector_engines_match_loop_exactly(market, engine):
+    pairs, books, _, costs = market
+    # одна биржа устарела — её ноги выпадают у всех движков
+    exchanges = [(name, books[name], 0.0 if name == "gate" else 4.0) for name in EXCHANGES]
+    args = (pairs, exchanges, 6.0, MAX_AGE_S, MIN_PCT, costs)
+
+    assert engine(*args) == _candidates_python(*args)
+
+
+def test_tracker_matches_loop_net_spread(market):
+    pairs, books, _, costs = market
+    exchanges = [(name, books[name], 0.0 if name == "gate" else 4.0) for name in EXCHANGES]
+    args = (pairs, exchanges, 6.0, MAX_AGE_S, MIN_PCT, costs)
+
+    assert _net(candidates_tracker(*args)) == _net(_candidates_python(*args))
+
+
+def test_incremental_open_set_matches_snapshot(market):
+    pairs, books, mids, costs = market
+    rnd = random.Random(3)
+    engine = IncrementalStageOne(EXCHANGES, min_pct=MIN_PCT, max_age_s=MAX_AGE_S, costs=costs)
+    engine.set_pairs(pairs)
+
+    # (книга, время опроса) — как их видел бы полный снимок
+    seen = {name: (dict(books[name]), 0.0) for name in EXCHANGES}
+    engine.feed_books([(name, book, ts) for name, (book, ts) in seen.items()])
+    engine.evaluate(now=0.0)
+
+    for now in (2.0, 4.0, 6.0, 8.0):
+        for name in EXCHANGES:
+            # gate перестаёт отвечать — его ноги стареют и выпадают
+            if name == "gate" and now > 2.0:
+                continue
+            book = dict(seen[name][0])
+            for sym in rnd.sample(sorted(book), len(book) // 5):
+                key = sym.split("-")[0] + "_USDT"
+                if rnd.random() < 0.1:
+                    del book[sym]
+                else:
+                    book[sym] = _quote(rnd, mids[key])
+            seen[name] = (book, now)
+
+        fed = [(name, book, ts) for name, (book, ts) in seen.items() if ts == now]
+        engine.feed_books(fed)
+        engine.evaluate(now=now)
+
+        snapshot = [(name, book, ts) for name, (book, ts) in seen.items()]
+        ref = _candidates_python(pairs, snapshot, now, MAX_AGE_S, MIN_PCT, costs)
+        assert _net(engine.open_signals) == _net(ref), f"now={now}"
@@ -0,0 +1,113 @@
+"""
+IncrementalStageOne: события opened / updated / closed на REST-опросах.
+"""
+
+from src.pipeline.route_costs import NO_COSTS
+from src.pipeline.stage_one_incremental import IncrementalStageOne, OPENED, UPDATED, CLOSED
+
+
+EXCHANGES = ["binance", "okx"]
+PAIRS = {"BTC_USDT": {"binance": "BTCUSDT", "okx": "BTC-USDT"}}
+MAX_AGE_S = 5.0
+
+
+def _books(ts: float, bn_ask: float = 100.0, okx_bid: float = 101.0, size: float = 1.0):
+    # маршрут binance → okx: 1% «грязного» спреда
+    return [
+        ("binance", {"BTCUSDT": {"bid": bn_ask - 0.01, "ask": bn_ask, "bid_size": size, "ask_size": size}}, ts),
+        ("okx", {"BTC-USDT": {"bid": okx_bid, "ask": okx_bid + 0.01, "bid_size": size, "ask_size": size}}, ts),
+    ]
+
+
+def _engine() -> IncrementalStageOne:
+    engine = IncrementalStageOne(EXCHANGES, min_pct=0.5, max_age_s=MAX_AGE_S, costs=NO_COSTS)
+    engine.set_pairs(PAIRS)
+    return engine
+
+
+def _kinds(events) -> list[str]:
+    return [ev["event"] for ev in events]
+
+
+def test_opens_and_stays_quiet_on_identical_quotes():
+    engine = _engine()
+
+    engine.feed_books(_books(0.0))
+    events = engine.evaluate(now=0.0)
+    assert _kinds(events) == [OPENED]
+    assert events[0]["candidate"]["best_direction"] == "binance→okx"
+
+    engine.feed_books(_books(1.0))
+    assert engine.evaluate(now=1.0) == []
+    assert "BTC_USDT" in engine.open_signals
+
+
+def test_stale_leg_recovers_with_identical_quotes():
+    engine = _engine()
+
+    engine.feed_books(_books(0.0))
+    assert _kinds(engine.evaluate(now=0.0)) == [OPENED]
+
+    # опрос пропал дольше max_age_s — сигнал закрывается, ноги снимаются
+    assert _kinds(engine.evaluate(now=10.0)) == [CLOSED]
+    assert not engine.open_signals
+
+    # биржи вернулись с теми же ценами — сигнал открывается снова
+    engine.feed_books(_books(11.0))
+    events = engine.evaluate(now=11.0)
+    assert _kinds(events) == [OPENED]
+    assert events[0]["candidate"]["a_age_s"] == 0.0
+
+    engine.feed_books(_books(12.0))
+    assert engine.evaluate(now=12.0) == []
+    assert "BTC_USDT" in engine.open_signals
+
+
+def test_stream_listener_recovers_stale_leg():
+    engine = _engine()
+
+    for ex, book, ts in _books(0.0):
+        for sym, quote in book.items():
+            engine.on_quote(ex, sym, dict(quote, ts=ts))
+    assert _kinds(engine.evaluate(now=0.0)) == [OPENED]
+    assert _kinds(engine.evaluate(now=10.0)) == [CLOSED]
+
+    for ex, book, ts in _books(11.0):
+        for sym, quote in book.items():
+            engine.on_quote(ex, sym, dict(quote, ts=ts))
+    assert _kinds(engine.evaluate(now=11.0)) == [OPENED]
+
+
+def test_size_only_change_emits_update():
+    engine = _engine()
+
+    engine.feed_books(_books(0.0, size=1000.0))
+    assert _kinds(engine.evaluate(now=0.0)) == [OPENED]
+
+    # цены те же, объёмы L1 почти исчезли — Stage-2 должен увидеть новые объёмы
+    engine.feed_books(_books(1.0, size=0.0001))
+    events = engine.evaluate(now=1.0)
+    assert _kinds(events) == [UPDATED]
+    cand = events[0]["candidate"]
+    assert cand["a_prices"]["ask_size"] == 0.0001
+    assert cand["b_prices"]["bid_size"] == 0.0001
+    assert engine.open_signals["BTC_USDT"] is cand
+
+    # без изменений — без событий
+    engine.feed_books(_books(2.0, size=0.0001))
+    assert engine.evaluate(now=2.0) == []
+
+
+def test_size_change_off_route_side_is_silent():
+    engine = _engine()
+
+    engine.feed_books(_books(0.0))
+    assert _kinds(engine.evaluate(now=0.0)) == [OPENED]
+
+    # маршрут binance→okx: bid binance и ask okx в исполнение не входят
+    books = _books(1.0)
+    books[0][1]["BTCUSDT"]["bid_size"] = 5.0
+    books[1][1]["BTC-USDT"]["ask_size"] = 5.0
+    engine.feed_books(books)
+    assert engine.evaluate(now=1.0) == []
+    assert engine.open_signals["BTC_USDT"]["a_prices"]["bid_size"] == 5.0
@@ -0,0 +1,332 @@
+"""
+Стримы против локального stand-in биржи (src/streams/ws_standin.py):
+переподключение, resync L2-стаканов, hot-set, Stage-1 в режиме "ws".
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.exchanges.binance import binance_ws
+from src.exchanges.okx import okx_ws
+from src.pipeline.route_costs import NO_COSTS
+from src.pipeline.stage_one_incremental import IncrementalStageOne, OPENED
+from src.pipeline.stage_one_price_snapshot_candidates import EXCHANGES, build_stage_one_events
+from src.streams import ws_connection, hot_set
+from src.streams.hot_set import HotDepthSet
+from src.streams.orderbook_l2 import DepthStream, LocalOrderBook
+from src.streams.quote_store import QuoteStore
+from src.streams.ws_quotes import QuoteStream, update_quote_streams
+from src.streams.ws_standin import StandInExchange, okx_books_payload
+
+pytest.importorskip("websockets")
+
+
+BIDS = [("100.0", "1.5"), ("99.9", "2")]
+ASKS = [("100.1", "1"), ("100.2", "3")]
+
+
+@pytest.fixture(autouse=True)
+def fast_reconnect(monkeypatch):
+    monkeypatch.setattr(ws_connection, "WS_RECONNECT_MIN_DELAY_S", 0.05)
+
+
+async def _wait(cond, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        await asyncio.sleep(0.01)
+
+
+def _checksum(bids, asks) -> int:
+    book = LocalOrderBook("okx", "-")
+    book.load_snapshot(bids, asks, 0)
+    return book.checksum()
+
+
+async def _stop(stream, task):
+    await stream.stop()
+    task.cancel()
+
+
+# -------------------------------------------------------------------------
+# reconnect
+# -------------------------------------------------------------------------
+
+def test_quote_stream_reconnects_and_resubscribes():
+    async def scenario():
+        server = await StandInExchange(
+            "binance", {"BTCUSDT": 60_000.0}, interval_s=0.01, drop_after=5,
+        ).start()
+        store = QuoteStore()
+        stream = QuoteStream("binance", ["BTCUSDT"], store, url=server.url)
+        task = asyncio.create_task(stream.run())
+        try:
+            await _wait(lambda: server.connections >= 2 and len(server.subscriptions) >= 2)
+            await _wait(lambda: "BTCUSDT" in store.book("binance"))
+        finally:
+            await _stop(stream, task)
+            await server.stop()
+
+        subscribe = binance_ws.build_ticker_subscribe(["BTCUSDT"])[0]
+        assert server.subscriptions[:2] == [subscribe, subscribe]
+        assert stream.connects >= 2
+
+    asyncio.run(scenario())
+
+
+class _ClearListener:
+
+    def __init__(self):
+        self.events = []
+
+    def on_quote(self, exchange, symbol, quote):
+        pass
+
+    def on_discard(self, exchange, symbol):
+        self.events.append(("discard", exchange, symbol))
+
+    def on_clear(self, exchange):
+        self.events.append(("clear", exchange))
+
+
+def test_quote_stream_disconnect_clears_exchange():
+    store = QuoteStore()
+    store.update("binance", "BTCUSDT", 1.0, 1.1, 1.0, 1.0)
+    store.update("okx", "BTC-USDT", 1.0, 1.1, 1.0, 1.0)
+    listener = _ClearListener()
+    store.add_listener(listener)
+
+    QuoteStream("binance", ["BTCUSDT"], store)._on_disconnect()
+
+    assert store.book("binance") == {}
+    assert store.last_update("binance") is None
+    assert store.last_update("okx") is not None
+    assert listener.events == [("clear", "binance")]
+
+
+# -------------------------------------------------------------------------
+# L2 resync (OKX: snapshot по подписке, цепочка seqId, checksum)
+# -------------------------------------------------------------------------
+
+async def _okx_depth(scenario):
+    server = await StandInExchange("okx", {}).start()
+    stream = DepthStream("okx", ["BTC-USDT"], url=server.url)
+    task = asyncio.create_task(stream.run())
+    try:
+        await _wait(lambda: len(server.subscriptions) == 1)
+        await scenario(server, stream, stream.books["BTC-USDT"])
+    finally:
+        await _stop(stream, task)
+        await server.stop()
+
+
+def _resubscribed(server) -> bool:
+    unsub = okx_ws.build_depth_subscribe(["BTC-USDT"], unsubscribe=True)[0]
+    sub = okx_ws.build_depth_subscribe(["BTC-USDT"])[0]
+    return server.subscriptions[1:3] == [unsub, sub]
+
+
+def test_okx_sequence_gap_triggers_resync():
+    async def scenario(server, stream, book):
+        await server.push(okx_books_payload(
+            "BTC-USDT", BIDS, ASKS, seq=10, snapshot=True, checksum=_checksum(BIDS, ASKS),
+        ))
+        await _wait(lambda: book.synced)
+
+        # prevSeqId не совпадает с последним seqId — дыра
+        await server.push(okx_books_payload("BTC-USDT", [("99.8", "1")], [], seq=12, prev_seq=11))
+        await _wait(lambda: stream.resyncs == 1)
+        assert not book.synced
+        await _wait(lambda: _resubscribed(server))
+        await _wait(lambda: not stream._resubscribing)
+
+        # после переподписки биржа шлёт новый snapshot
+        await server.push(okx_books_payload(
+            "BTC-USDT", BIDS, ASKS, seq=20, snapshot=True, checksum=_checksum(BIDS, ASKS),
+        ))
+        await _wait(lambda: book.synced)
+
+    asyncio.run(_okx_depth(scenario))
+
+
+def test_okx_checksum_mismatch_triggers_resync():
+    async def scenario(server, stream, book):
+        await server.push(okx_books_payload(
+            "BTC-USDT", BIDS, ASKS, seq=10, snapshot=True, checksum=_checksum(BIDS, ASKS),
+        ))
+        await _wait(lambda: book.synced)
+
+        # цепочка цела, checksum — нет
+        await server.push(okx_books_payload(
+            "BTC-USDT", [("99.95", "1")], [], seq=11, prev_seq=10, checksum=12345,
+        ))
+        await _wait(lambda: stream.resyncs == 1)
+        assert not book.synced
+        await _wait(lambda: _resubscribed(server))
+
+    asyncio.run(_okx_depth(scenario))
+
+
+def test_okx_valid_update_applies():
+    async def scenario(server, stream, book):
+        await server.push(okx_books_payload(
+            "BTC-USDT", BIDS, ASKS, seq=10, snapshot=True, checksum=_checksum(BIDS, ASKS),
+        ))
+        await _wait(lambda: book.synced)
+
+        bids = [("100.05", "4")] + BIDS
+        await server.push(okx_books_payload(
+            "BTC-USDT", [("100.05", "4")], [], seq=11, prev_seq=10, checksum=_checksum(bids, ASKS),
+        ))
+        await _wait(lambda: book.last_id == 11)
+        assert stream.resyncs == 0
+        assert book.top(1)[0] == [["100.05", "4"]]
+
+    asyncio.run(_okx_depth(scenario))
+
+
+# -------------------------------------------------------------------------
+# hot set
+# -------------------------------------------------------------------------
+
+class _Books:
+    """
+    L2BookManager для проверки подписок: всё подписанное «синхронизировано».
+    """
+
+    def __init__(self):
+        self.subscribed: set = set()
+
+    async def subscribe(self, exchange, symbols):
+        self.subscribed.update((exchange, s) for s in symbols)
+
+    async def unsubscribe(self, exchange, symbols):
+        self.subscribed.difference_update((exchange, s) for s in symbols)
+
+    def get_levels(self, exchange, symbol, depth=10):
+        if (exchange, symbol) in self.subscribed:
+            return [["1", "1"]], [["2", "1"]]
+        return None
+
+
+class _Clock:
+
+    def __init__(self):
+        self.now = 1_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = _Clock()
+    monkeypatch.setattr(hot_set.time, "time", c.time)
+    return c
+
+
+def test_hot_set_ttl_expiry(clock):
+    books = _Books()
+    hot = HotDepthSet(books, ttl_s=10.0, max_legs=10)
+
+    async def scenario():
+        await hot.touch([("okx", "A"), ("okx", "B")])
+        clock.now += 6
+        await hot.touch([("okx", "B")])
+        clock.now += 6
+        await hot.touch([])
+
+    asyncio.run(scenario())
+
+    assert books.subscribed == {("okx", "B")}
+    assert not hot.is_hot("okx", "A")
+    assert hot.stats()["expired"] == 1
+
+
+def test_hot_set_expired_leg_not_served_before_purge(clock):
+    books = _Books()
+    hot = HotDepthSet(books, ttl_s=10.0, max_legs=10)
+
+    asyncio.run(hot.touch([("okx", "A")]))
+    assert hot.get_levels("okx", "A") is not None
+
+    # touch() ещё не вызывался — нога подписана, но уже просрочена
+    clock.now += 11
+    assert ("okx", "A") in books.subscribed
+    assert hot.get_levels("okx", "A") is None
+
+
+@pytest.mark.parametrize("enabled, available, expect", [
+    (False, True, None),
+    (True, False, None),
+    (True, True, HotDepthSet),
+])
+def test_hot_set_falls_back_to_rest_without_websockets(monkeypatch, capsys, enabled, available, expect):
+    import main
+
+    monkeypatch.setattr(main, "STAGE2_L2_HOT_SET", enabled)
+    monkeypatch.setattr(ws_connection, "AVAILABLE", available)
+
+    hot = main._hot_depth_set()
+
+    assert hot is None if expect is None else isinstance(hot, expect)
+    warnings = [l for l in capsys.readouterr().out.splitlines() if "[WARN]" in l]
+    assert len(warnings) == (1 if enabled and not available else 0)
+
+
+def test_hot_set_lru_eviction(clock):
+    books = _Books()
+    hot = HotDepthSet(books, ttl_s=100.0, max_legs=2)
+
+    async def scenario():
+        await hot.touch([("okx", "A")])
+        clock.now += 1
+        await hot.touch([("okx", "B")])
+        clock.now += 1
+        await hot.touch([("okx", "A")])           # A снова свежая
+        clock.now += 1
+        await hot.touch([("okx", "C")])           # вытесняется B
+
+    asyncio.run(scenario())
+
+    assert books.subscribed == {("okx", "A"), ("okx", "C")}
+    assert hot.get_levels("okx", "B") is None
+    assert hot.get_levels("okx", "C") is not None
+    assert hot.stats()["evicted"] == 1
+
+
+# -------------------------------------------------------------------------
+# Stage-1 на стримах (STAGE1_SOURCE="ws")
+# -------------------------------------------------------------------------
+
+def test_stage_one_events_from_streams():
+    pairs = {"BTC_USDT": {"binance": "BTCUSDT", "bybit": None, "okx": "BTC-USDT",
+                          "gate": None, "kucoin": None}}
+
+    async def scenario():
+        binance = await StandInExchange("binance", {"BTCUSDT": 60_000.0}, interval_s=0.01).start()
+        okx = await StandInExchange("okx", {"BTC-USDT": 60_600.0}, interval_s=0.01).start()
+
+        store = QuoteStore()
+        incremental = IncrementalStageOne(EXCHANGES, min_pct=0.5, costs=NO_COSTS)
+        store.add_listener(incremental)
+        incremental.set_pairs(pairs, store=store)
+
+        streams = {}
+        await update_quote_streams(streams, pairs, store, urls={"binance": binance.url, "okx": okx.url})
+        try:
+            await _wait(lambda: len(store) == 2)
+            return await build_stage_one_events(pairs, incremental, quote_store=store)
+        finally:
+            for stream, task in streams.values():
+                await _stop(stream, task)
+            await binance.stop()
+            await okx.stop()
+
+    events = asyncio.run(scenario())
+
+    assert [ev["event"] for ev in events] == [OPENED]
+    assert events[0]["candidate"]["best_direction"] == "binance→okx"
@@ -0,0 +1,78 @@
+"""
+universe_cache: тёплый старт с диска и откат на холодный при плохом файле.
+"""
+
+import json
+import time
+
+import pytest
+
+from src.pipeline.pairs_universe import PairsUniverse
+from src.pipeline.universe_cache import FORMAT, save_universe, load_universe
+
+
+EXCHANGES = ("binance", "okx")
+
+
+def _universe() -> PairsUniverse:
+    return PairsUniverse(EXCHANGES, tiers=(100.0, 1_000.0))
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "cache" / "universe.json")
+    u = _universe()
+    u.update({
+        "BTC_USDT": {"binance": ("BTCUSDT", 5_000.0), "okx": ("BTC-USDT", 150.0)},
+        "ETH_USDT": {"okx": ("ETH-USDT", 200.0)},
+    })
+    save_universe(u, path)
+
+    warm = _universe()
+    age = load_universe(warm, path, max_age_s=60.0)
+
+    assert age is not None and 0 <= age < 60.0
+    assert warm.pairs == u.pairs
+    assert warm.version == u.version
+    assert warm.tier("BTC_USDT", "binance") == 1
+    assert not (tmp_path / "cache" / "universe.json.tmp").exists()
+
+
+def _write(path, data):
+    path.write_bytes(data if isinstance(data, bytes) else json.dumps(data).encode())
+
+
+def _valid(**over) -> dict:
+    return {
+        "format": FORMAT,
+        "ts": time.time(),
+        "version": 3,
+        "legs": {"binance": [["BTC_USDT", "BTCUSDT", 0]]},
+        **over,
+    }
+
+
+@pytest.mark.parametrize("data", [
+    _valid(ts=time.time() - 3600),                                     # устарел
+    _valid(format=FORMAT + 1),                                         # другая схема
+    b'{"format": 1, "ts": 17',                                         # обрезан
+    b"\xff\xfe not json",
+    b"[1, 2, 3]",                                                      # не объект
+    {"format": FORMAT, "version": 1, "legs": {}},                      # нет ts
+    _valid(ts="yesterday"),
+    _valid(legs={"binance": [["BTC_USDT", "BTCUSDT"]]}),               # не та запись ноги
+    _valid(legs=[["BTC_USDT"]]),
+    {k: v for k, v in _valid().items() if k != "version"},
+], ids=["stale", "schema", "truncated", "binary", "not_object", "no_ts", "bad_ts",
+        "bad_leg", "bad_legs", "no_version"])
+def test_bad_cache_falls_back_to_cold_start(tmp_path, data):
+    path = tmp_path / "universe.json"
+    _write(path, data)
+
+    u = _universe()
+    assert load_universe(u, str(path), max_age_s=60.0) is None
+    assert u.pairs == {}
+    assert u.version == 0
+
+
+def test_missing_file_is_cold_start(tmp_path):
+    assert load_universe(_universe(), str(tmp_path / "nope.json")) is None